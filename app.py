@@ -1,6 +1,23 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+import threading
+import time
+from modules.task_scheduler import get_scheduler, PRIORITY_LOW
+from modules.instrumentation import configure_from_environment
+
+# SQLAlchemy, the database file and the thumbnail store are loaded by warm_caches() on a worker
+# once the window is up, so nothing here is paid for before the first paint.
+
+
+def warm_caches(app):
+    """Open the database (running any migrations) and the thumbnail store off the Tk thread."""
+    start = time.perf_counter()
+    app.library_indexer()
+    from modules.thumbnails import get_thumbnail_engine
+    get_thumbnail_engine()
+    print(f"Warmed the library caches in {time.perf_counter() - start:.2f}s.")
+
 
 class VideoTutorialApp:
     def __init__(self, root):
@@ -41,6 +58,25 @@ class VideoTutorialApp:
         # Store video metadata
         self.video_metadata = {}
 
+        # Library index shared with the rest of the app, opened in the background after the first paint
+        self.db = None
+        self.indexer = None
+        self._library_lock = threading.Lock()
+        self.root.after_idle(self.warm_up)
+
+    def warm_up(self):
+        get_scheduler(self.root).submit(warm_caches, self, priority=PRIORITY_LOW)
+
+    def library_indexer(self):
+        """Return the library indexer, opening the database on first use (from any thread)."""
+        with self._library_lock:
+            if self.indexer is None:
+                from database.database import Database
+                from modules.library_index import LibraryIndexer
+                self.db = Database()
+                self.indexer = LibraryIndexer(self.db)
+            return self.indexer
+
     def upload_folder(self):
         folder_path = filedialog.askdirectory()
         if folder_path:
@@ -53,13 +89,15 @@ class VideoTutorialApp:
         # Clear the current list
         self.video_listbox.delete(0, tk.END)
 
-        # Supported video file extensions
-        video_extensions = ('.mp4', '.mkv', '.avi', '.mov', '.wmv')
+        # Scan the folder for video files in the background (unchanged directories are not re-listed)
+        get_scheduler(self.root).submit(
+            lambda: self.library_indexer().list_videos(folder_path), priority=PRIORITY_LOW,
+            callback=self.show_video_list,
+        )
 
-        # Scan the folder for video files
-        for filename in os.listdir(folder_path):
-            if filename.endswith(video_extensions):
-                self.video_listbox.insert(tk.END, filename)
+    def show_video_list(self, video_paths):
+        for video_path in video_paths:
+            self.video_listbox.insert(tk.END, os.path.basename(video_path))
 
     def add_metadata(self):
         selected_video = self.video_listbox.curselection()
@@ -116,6 +154,8 @@ class VideoTutorialApp:
         print(self.video_metadata)  # For debugging; can be removed later
 
 if __name__ == "__main__":
+    # MUSIC_APP_METRICS=metrics.jsonl / MUSIC_APP_PROFILE=cprofile|sample turn on instrumentation
+    configure_from_environment()
     root = tk.Tk()
     app = VideoTutorialApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""Compare Database.add_video (one commit per row) with Database.add_videos (batched executemany).
+
+Usage: python benchmarks/bench_bulk_insert.py --rows 100000 --per-row-sample 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_videos  # noqa: E402
+from database.database import Database  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--per-row-sample", type=int, default=2000,
+                        help="rows inserted through add_video; the full-size time is extrapolated")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        per_row_db = Database(f"sqlite:///{os.path.join(root, 'per_row.db')}", echo=False)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # add_video prints once per row
+            for file_name, metadata in synthetic_videos(args.per_row_sample):
+                per_row_db.add_video(file_name, metadata)
+            per_row_rate = args.per_row_sample / (time.perf_counter() - start)
+            per_row_db.close()
+
+        bulk_db = Database(f"sqlite:///{os.path.join(root, 'bulk.db')}", echo=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = bulk_db.add_videos(synthetic_videos(args.rows), batch_size=args.batch_size)
+            bulk_db.close()
+
+    print(f"add_video:  {per_row_rate:,.0f} rows/sec "
+          f"(~{args.rows / per_row_rate:.1f}s for {args.rows:,} rows, extrapolated)")
+    print(f"add_videos: {result.rows_per_sec:,.0f} rows/sec ({result.seconds:.2f}s for {result.rows:,} rows)")
+    print(f"speedup:    {result.rows_per_sec / per_row_rate:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
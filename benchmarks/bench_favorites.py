@@ -0,0 +1,83 @@
+"""Compare the old per-row favorites path with the set-based, batched favorites service.
+
+Usage: python benchmarks/bench_favorites.py --videos 20000 --favorites 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_videos  # noqa: E402
+from database.database import Database  # noqa: E402
+from modules.favorites import FavoritesDatabase, Favorite  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def per_row(favorites, video_ids, all_ids):
+    """The previous code paths: one commit per add, one SELECT per favorite's video and per membership check."""
+    session = favorites.Session()
+    add_time, _ = timed(lambda: [
+        (session.add(Favorite(video_id=video_id)), session.commit()) for video_id in video_ids
+    ])
+    session.close()
+
+    session = favorites.Session()  # Fresh identity map, as for a new page load
+    list_time, videos = timed(lambda: [favorite.video for favorite in session.query(Favorite).all()])
+    check_time, _ = timed(lambda: [
+        session.query(Favorite).filter_by(video_id=video_id).first() is not None for video_id in all_ids
+    ])
+    session.close()
+    return add_time, list_time, check_time, len(videos)
+
+
+def service(favorites, video_ids, all_ids):
+    add_time, _ = timed(lambda: favorites.add_many(video_ids))
+    favorites.session.expire_all()
+    list_time, videos = timed(favorites.get_favorite_videos)
+    favorites._favorite_ids = None  # Include the one-off load of the membership set
+    check_time, _ = timed(lambda: [favorites.is_favorite(video_id) for video_id in all_ids])
+    return add_time, list_time, check_time, len(videos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=20000)
+    parser.add_argument("--favorites", type=int, default=2000)
+    parser.add_argument("--checks", type=int, default=5000, help="is-favorite checks, as when rendering cards")
+    args = parser.parse_args()
+
+    favorite_ids = list(range(1, args.videos + 1, max(1, args.videos // args.favorites)))[:args.favorites]
+    checked_ids = list(range(1, min(args.videos, args.checks) + 1))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        for label, run in (("per-row", per_row), ("service", service)):
+            db_url = f"sqlite:///{os.path.join(root, label + '.db')}"
+            with contextlib.redirect_stdout(io.StringIO()):
+                db = Database(db_url, echo=False)
+                db.add_videos(synthetic_videos(args.videos))
+                favorites = FavoritesDatabase(db_url, echo=False)
+            results[label] = run(favorites, favorite_ids, checked_ids)
+            favorites.session.close()
+            db.close()
+
+    for label, (add_time, list_time, check_time, listed) in results.items():
+        print(f"{label:8} add {len(favorite_ids)}: {add_time * 1000:8.1f} ms   "
+              f"list {listed}: {list_time * 1000:7.1f} ms   "
+              f"{len(checked_ids)} checks: {check_time * 1000:7.1f} ms")
+    old, new = results["per-row"], results["service"]
+    print(f"speedup  add {old[0] / new[0]:.0f}x   list {old[1] / new[1]:.0f}x   checks {old[2] / new[2]:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Per-video cost of the old cv2 frame grab versus keyframe capture of a thumbnail and an 8-frame strip.
+
+Usage: python benchmarks/bench_frame_capture.py --duration 120 --size 1920x1080 --runs 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.frame_capture import get_grabber, strip_timestamps, THUMBNAIL_TIMESTAMP  # noqa: E402
+
+
+def make_clip(root, duration, size, gop):
+    """Encode a test clip with a keyframe every `gop` frames, like typical camera/export output."""
+    path = os.path.join(root, "clip.mp4")
+    subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", f"testsrc=duration={duration}:size={size}:rate=30",
+         "-c:v", "libx264", "-g", str(gop), "-pix_fmt", "yuv420p", path],
+        check=True,
+    )
+    return path
+
+
+def cv2_frame_100(path):
+    """The previous capture: seek to frame 100 and convert the full-resolution frame."""
+    import cv2
+    from PIL import Image
+
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 100)
+    ret, frame = cap.read()
+    cap.release()
+    return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).resize((200, 150)) if ret else None
+
+
+def time_runs(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+        if result is None:
+            return None
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=int, default=120)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--gop", type=int, default=250)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = make_clip(root, args.duration, args.size, args.gop)
+        cases = [
+            ("keyframe thumbnail", lambda: get_grabber("thumbnail").grab(path, [THUMBNAIL_TIMESTAMP])),
+            ("keyframe strip x8", lambda: get_grabber("strip").grab(path, strip_timestamps(args.duration))),
+        ]
+        try:
+            import cv2  # noqa: F401
+            cases.insert(0, ("cv2 frame 100", lambda: cv2_frame_100(path)))
+        except ImportError:
+            print("cv2 not installed; skipping the old capture path")
+
+        for label, fn in cases:
+            median = time_runs(fn, args.runs)
+            if median is None:
+                print(f"{label}: capture failed")
+            else:
+                print(f"{label}: {median * 1000:.1f} ms median over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Per-row memory and construction time of ORM Video objects versus Core-built VideoRecords.
+
+Usage: python benchmarks/bench_records.py --rows 100000
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select  # noqa: E402
+
+from benchmarks.synthetic import synthetic_videos  # noqa: E402
+from database.database import Database, Video, VideoRecord  # noqa: E402
+
+
+def load_orm(db):
+    with db.session_scope() as session:
+        return session.query(Video).order_by(Video.id).all()
+
+
+def load_records(db):
+    with db.engine.connect() as connection:
+        return list(map(VideoRecord._make, connection.execute(select(*VideoRecord.columns()).order_by(Video.id))))
+
+
+def measure(label, load, db, rows):
+    """Time the load, then report the memory still held by the loaded rows."""
+    gc.collect()
+    start = time.perf_counter()
+    loaded = load(db)
+    seconds = time.perf_counter() - start
+    del loaded
+    gc.collect()
+
+    tracemalloc.start()
+    loaded = load(db)
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:12} {seconds / rows * 1e6:6.2f} us/row   {held / rows:7.0f} bytes/row")
+    return seconds, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(f"sqlite:///{os.path.join(root, 'records.db')}")
+            db.add_videos(synthetic_videos(args.rows))
+
+        orm_seconds, orm_bytes = measure("ORM Video", load_orm, db, args.rows)
+        record_seconds, record_bytes = measure("VideoRecord", load_records, db, args.rows)
+    print(f"VideoRecord: {orm_seconds / record_seconds:.1f}x faster, {orm_bytes / record_bytes:.1f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
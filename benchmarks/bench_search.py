@@ -0,0 +1,69 @@
+"""Latency of Database.search (FTS5) on a large synthetic library.
+
+Usage: python benchmarks/bench_search.py --rows 200000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_videos  # noqa: E402
+from database.database import Database  # noqa: E402
+
+SYLLABLES = ("ka", "lo", "mi", "ra", "ten", "vor", "shu", "del", "pa", "rin", "gos", "tha", "ne", "bry", "cal", "dun")
+
+
+def vocabulary(rng, size):
+    """Pseudo-words with a realistic spread, so each term matches a small slice of the library."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def time_queries(label, run, queries, repeat=5):
+    timings = []
+    for query in queries:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<12} median {statistics.median(timings):6.2f} ms   p95 {p95:6.2f} ms   max {timings[-1]:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    words = vocabulary(rng, 20000)
+    artists = [word.title() for word in rng.sample(words, 2000)]
+
+    with tempfile.TemporaryDirectory() as root:
+        db = Database(f"sqlite:///{os.path.join(root, 'search.db')}", echo=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = db.add_videos(synthetic_videos(args.rows, rng=rng, words=words, artists=artists))
+        print(f"Loaded {result.rows:,} rows in {result.seconds:.1f}s (FTS triggers included)")
+
+        ranked = [f"{rng.choice(words)} {rng.choice(artists)}" for _ in range(20)] + rng.sample(words, 20)
+        prefixes = [word[:4] for word in rng.sample(words, 20)]
+        typed = [word[:n] for word in rng.sample(words, 5) for n in range(1, len(word) + 1)]
+
+        time_queries("ranked", lambda q: db.search(q, limit=50), ranked)
+        time_queries("prefix", lambda q: db.search(q, limit=50, prefix=True), prefixes)
+        time_queries("as-you-type", lambda q: db.search_as_you_type(q, limit=10), typed)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
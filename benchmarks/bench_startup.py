@@ -0,0 +1,115 @@
+"""Cold-start cost of the application: import time per module and time to the first painted window.
+
+Usage: python benchmarks/bench_startup.py --runs 5 --target-ms 500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Time from process start to the first painted window that counts as a fast cold start
+FIRST_PAINT_TARGET_MS = 500
+
+# Modules whose import cost is reported; the GUI views are imported on demand by the app
+MODULES = ("app", "modules.video_display", "modules.folder_upload")
+
+# Heavy third-party packages that must not be imported before the window paints
+DEFERRED_PACKAGES = ("sqlalchemy", "cv2", "ffmpeg", "PIL", "customtkinter")
+
+# Runs in the child: build the app window and report once Tk has mapped and drawn it
+FIRST_PAINT_SCRIPT = """
+import sys, tkinter as tk
+import app
+root = tk.Tk()
+window = app.VideoTutorialApp(root)
+def painted(event):
+    if event.widget is root:
+        root.update_idletasks()
+        heavy = [name for name in {deferred!r} if name in sys.modules]
+        print("painted", ",".join(heavy), flush=True)
+        root.after(0, root.destroy)
+root.bind("<Map>", painted)
+root.mainloop()
+"""
+
+
+def import_times(module):
+    """Run `python -X importtime -c 'import module'`.
+
+    Returns (total us, [(cumulative us, name)] for the module's direct imports), or (None, error).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            # A module is reported after everything it imported
+            if name.strip() == module:
+                return int(cumulative), children
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+    return 0, children
+
+
+def first_paint_ms():
+    """Spawn the app and time process start to its first mapped window; returns (ms, heavy modules loaded)."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", FIRST_PAINT_SCRIPT.format(deferred=DEFERRED_PACKAGES)],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    line = process.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, stderr = process.communicate()
+    if not line.startswith("painted"):
+        raise RuntimeError(stderr.strip().splitlines()[-1] if stderr.strip() else "no window was painted")
+    fields = line.split()
+    return elapsed, fields[1].split(",") if len(fields) > 1 else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports listed per module")
+    parser.add_argument("--target-ms", type=float, default=FIRST_PAINT_TARGET_MS)
+    args = parser.parse_args()
+
+    for module in MODULES:
+        total, rows = import_times(module)
+        if total is None:
+            print(f"import {module}: failed ({rows})")
+            continue
+        print(f"import {module}: {total / 1000:.1f} ms")
+        for cumulative, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+    try:
+        runs = [first_paint_ms() for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(f"First paint: skipped ({e})")
+        return
+    median = statistics.median(ms for ms, _ in runs)
+    heavy = sorted({name for _, loaded in runs for name in loaded})
+    verdict = "OK" if median <= args.target_ms else "SLOW"
+    print(f"First paint: median {median:.0f} ms over {len(runs)} runs (target {args.target_ms:.0f} ms) {verdict}")
+    if heavy:
+        print(f"Imported before the first paint: {', '.join(heavy)}")
+    if verdict != "OK":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
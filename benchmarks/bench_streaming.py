@@ -0,0 +1,49 @@
+"""Peak memory and time of a full pass over the library: get_all_videos() versus iter_videos().
+
+Usage: python benchmarks/bench_streaming.py --rows 200000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_videos  # noqa: E402
+from database.database import Database  # noqa: E402
+
+
+def measure(label, full_pass):
+    """Run one pass with tracemalloc on and report its peak allocation."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = full_pass()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:32} {rows:>9,} rows in {seconds:6.2f}s, peak {peak / 2**20:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(f"sqlite:///{os.path.join(root, 'stream.db')}")
+            db.add_videos(synthetic_videos(args.rows))
+
+        measure("get_all_videos()", lambda: len(db.get_all_videos()))
+        measure("iter_videos()", lambda: sum(1 for _ in db.iter_videos(batch_size=args.batch_size)))
+        measure("iter_videos(file_name only)",
+                lambda: sum(1 for _ in db.iter_videos(columns=["file_name"], batch_size=args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
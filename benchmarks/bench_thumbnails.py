@@ -0,0 +1,76 @@
+"""Cold/warm timings for the thumbnail engine on a synthetic video library.
+
+Usage: python benchmarks/bench_thumbnails.py --videos 2000 --workers 8
+"""
+import argparse
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.task_scheduler import TaskScheduler  # noqa: E402
+from modules.thumbnails import ThumbnailEngine  # noqa: E402
+
+
+def make_library(root, count, folders=20):
+    """Encode one tiny clip with ffmpeg and copy it into `count` files spread over nested folders."""
+    source = os.path.join(root, "source.mp4")
+    subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=duration=2:size=320x240:rate=15",
+         "-pix_fmt", "yuv420p", source],
+        check=True,
+    )
+    paths = []
+    for i in range(count):
+        # Same base name in every folder, which used to collide in temp_thumbnails/
+        folder = os.path.join(root, "library", f"artist_{i % folders}", f"album_{i // folders}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, "lesson.mp4")
+        shutil.copyfile(source, path)
+        paths.append(path)
+    return paths
+
+
+def run_pass(engine, paths):
+    """Submit every path and wait until all thumbnails have streamed back."""
+    results = queue.Queue()
+    start = time.perf_counter()
+    engine.submit_many(paths, results)
+    first_result = None
+    produced = 0
+    for _ in paths:
+        _, thumbnail_path = results.get()
+        if first_result is None:
+            first_result = time.perf_counter() - start
+        produced += thumbnail_path is not None
+    return time.perf_counter() - start, first_result, produced
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = make_library(root, args.videos)
+        scheduler = TaskScheduler(max_workers=args.workers)
+        engine = ThumbnailEngine(os.path.join(root, "thumbnails"), scheduler=scheduler)
+        try:
+            for label in ("cold", "warm"):
+                total, first, produced = run_pass(engine, paths)
+                print(
+                    f"{label}: {produced}/{len(paths)} thumbnails in {total:.2f}s "
+                    f"({len(paths) / total:.0f} videos/s, first result after {first * 1000:.1f} ms)"
+                )
+        finally:
+            scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
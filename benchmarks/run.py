@@ -0,0 +1,257 @@
+"""Time the application's entry points on a synthetic library and save the results as JSON.
+
+Usage: python benchmarks/run.py --videos 2000 --repeat 5 [--encode] [--compare benchmarks/results/<file>.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate_library, index_library  # noqa: E402
+
+# Where results are saved, one file per run named after the time and commit
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Ratio against a compared run beyond which a benchmark is flagged
+REGRESSION_THRESHOLD = 1.2
+
+# Seconds display_videos may take to build its grid before the benchmark gives up
+DISPLAY_TIMEOUT = 60
+
+BENCHMARKS = {}
+
+
+class Skipped(Exception):
+    """Raised by a benchmark that cannot run here (missing package, binary or display) or never finishes."""
+
+
+def benchmark(name):
+    """Register `fn(context)` as a benchmark; it returns a callable timed once per repeat."""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+@benchmark("LibraryIndexer.scan (cold)")
+def bench_scan_cold(context):
+    from database.database import Database
+    from modules.library_index import LibraryIndexer
+
+    def run():
+        db_path = os.path.join(context.scratch, f"cold_{time.perf_counter_ns()}.db")
+        LibraryIndexer(Database(f"sqlite:///{db_path}")).scan(context.library.library_dir)
+    return run
+
+
+@benchmark("fetch_videos_from_folder")
+def bench_fetch_videos_from_folder(context):
+    try:
+        from modules import video_display
+    except ImportError as e:
+        raise Skipped(e)
+    video_display.VIDEO_FOLDER = context.library.library_dir
+    return lambda: video_display.fetch_videos_from_folder(context.db)
+
+
+@benchmark("generate_thumbnail")
+def bench_generate_thumbnail(context):
+    if not context.library.encoded:
+        raise Skipped("needs --encode")
+    try:
+        import ffmpeg  # noqa: F401
+    except ImportError as e:
+        raise Skipped(e)
+    from modules.thumbnails import generate_thumbnail
+
+    paths = context.library.paths[:context.args.thumbnails]
+
+    def run():
+        output_dir = tempfile.mkdtemp(dir=context.scratch)
+        for index, path in enumerate(paths):
+            if generate_thumbnail(path, os.path.join(output_dir, f"{index}.jpg")) is None:
+                raise Skipped("ffmpeg could not generate a thumbnail")
+    return run
+
+
+@benchmark("Database.add_video")
+def bench_add_video(context):
+    metadata = {"name": "Added", "artist": "Artist", "title": "Title", "category": "Blues", "chord": "E"}
+
+    def run():
+        batch = time.perf_counter_ns()
+        for index in range(context.args.inserts):
+            context.db.add_video(os.path.join(context.scratch, f"added_{batch}_{index}.mp4"), metadata)
+    return run
+
+
+@benchmark("Database.fetch_videos_by_category")
+def bench_fetch_videos_by_category(context):
+    return lambda: (context.db.fetch_videos_by_category("Blues"), context.db.fetch_videos_by_category("All"))
+
+
+@benchmark("FavoritesDatabase.get_favorite_videos")
+def bench_get_favorite_videos(context):
+    from modules.favorites import FavoritesDatabase
+
+    favorites = FavoritesDatabase(context.library.db_url)
+    video_ids = [video_id for (video_id,) in context.db.iter_videos(columns=["id"])]
+    favorites.add_many(video_ids[::10])
+    return favorites.get_favorite_videos
+
+
+@benchmark("display_videos (headless Tk)")
+def bench_display_videos(context):
+    import tkinter as tk
+
+    try:
+        from modules import video_display
+        import customtkinter  # noqa: F401
+        root = tk.Tk()
+    except (ImportError, tk.TclError) as e:
+        raise Skipped(e)
+    root.withdraw()
+    video_display.VIDEO_FOLDER = context.library.library_dir
+    context.cleanup.append(root.destroy)
+
+    def run():
+        frame = tk.Frame(root, width=900, height=700)
+        frame.pack()
+        video_display.display_videos(frame, context.db)
+        # The grid is built by a scheduler callback delivered through the Tk event loop
+        deadline = time.perf_counter() + DISPLAY_TIMEOUT
+        while getattr(frame, "video_grid", None) is None:
+            if time.perf_counter() > deadline:
+                frame.destroy()
+                raise Skipped(f"no video grid after {DISPLAY_TIMEOUT}s")
+            root.update()
+            time.sleep(0.001)
+        root.update_idletasks()
+        frame.destroy()
+    return run
+
+
+class Context:
+    def __init__(self, args, scratch, library, db):
+        self.args = args
+        self.scratch = scratch
+        self.library = library
+        self.db = db
+        self.cleanup = []
+
+
+def git_revision():
+    """Return (commit hash, whether the work tree has uncommitted changes), or (None, None) outside git."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.stdout.strip(), bool(status.stdout.strip())
+
+
+def run_benchmarks(context, names, repeat):
+    results = {}
+    for name in names:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                run = BENCHMARKS[name](context)
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    run()
+                    timings.append(time.perf_counter() - start)
+        except Skipped as e:
+            results[name] = {"status": "skipped", "reason": str(e)}
+            print(f"{name:42} skipped ({e})")
+            continue
+        results[name] = {
+            "status": "ok", "runs": timings,
+            "min": min(timings), "median": statistics.median(timings), "max": max(timings),
+        }
+        print(f"{name:42} median {results[name]['median'] * 1000:9.2f} ms   min {min(timings) * 1000:9.2f} ms")
+    return results
+
+
+def compare(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """Print each benchmark's median against a saved run; returns the names that regressed."""
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"\nCompared with {baseline.get('commit') or baseline_path}:")
+    regressed = []
+    for name, result in results.items():
+        previous = baseline["results"].get(name, {})
+        if result["status"] != "ok" or previous.get("status") != "ok":
+            continue
+        ratio = result["median"] / previous["median"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:42} {ratio:6.2f}x{flag}")
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--encode", action="store_true", help="encode real clips (needed for generate_thumbnail)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--inserts", type=int, default=100, help="videos added per add_video run")
+    parser.add_argument("--thumbnails", type=int, default=10, help="thumbnails per generate_thumbnail run")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--output", help=f"result file (default: a new file in {RESULTS_DIR})")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="median ratio flagged as a regression (exit status 1)")
+    args = parser.parse_args()
+
+    commit, dirty = git_revision()
+    with tempfile.TemporaryDirectory() as scratch:
+        start = time.perf_counter()
+        library = generate_library(scratch, args.videos, args.depth, args.fanout, args.encode, args.seed)
+        db = index_library(library)
+        print(f"Generated and indexed {args.videos} videos in {time.perf_counter() - start:.2f}s\n")
+
+        context = Context(args, scratch, library, db)
+        try:
+            results = run_benchmarks(context, args.only or list(BENCHMARKS), args.repeat)
+        finally:
+            for cleanup in context.cleanup:
+                cleanup()
+            from database.session import dispose_engines
+            dispose_engines()
+
+    report = {
+        "commit": commit, "dirty": dirty, "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(), "platform": platform.platform(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "threshold")},
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{(commit or 'nogit')[:10]}{'-dirty' if dirty else ''}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
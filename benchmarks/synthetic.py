@@ -0,0 +1,155 @@
+"""Generate a synthetic video library (nested folders, random metadata) and a SQLite file indexing it.
+
+Usage: python benchmarks/synthetic.py /tmp/library --videos 5000 --encode
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Values random metadata is drawn from
+ARTISTS = [f"Artist {i}" for i in range(250)]
+CATEGORIES = ["Blues", "Rock", "Jazz", "Folk", "Classical", "Metal", "Funk", "Country", "Pop", "Latin", "Soul", "Reggae"]
+CHORDS = ["A", "Am", "B", "Bm", "C", "Cmaj7", "D", "Dm", "E", "Em", "F", "G", "G7"]
+EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov")
+
+# Distinct clips encoded with --encode; every video is a copy of one of them
+ENCODED_VARIANTS = 4
+
+# Size range (bytes) of stub files when clips are not encoded
+STUB_SIZE_RANGE = (1024, 64 * 1024)
+
+SyntheticLibrary = namedtuple("SyntheticLibrary", "root library_dir db_url paths metadata encoded")
+
+
+def encode_clip(path, seconds, size="160x120", rate=10):
+    """Encode a tiny test clip with the ffmpeg binary, or OpenCV when ffmpeg is not installed."""
+    if shutil.which("ffmpeg"):
+        subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-y", "-f", "lavfi",
+             "-i", f"testsrc=duration={seconds}:size={size}:rate={rate}", "-pix_fmt", "yuv420p", path],
+            check=True,
+        )
+        return
+    import cv2
+    import numpy as np
+
+    width, height = map(int, size.split("x"))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), rate, (width, height))
+    for frame_number in range(seconds * rate):
+        frame = np.full((height, width, 3), (frame_number * 7) % 256, dtype=np.uint8)
+        writer.write(frame)
+    writer.release()
+
+
+def random_metadata(rng, index):
+    return {
+        "name": f"Lesson {index}",
+        "artist": rng.choice(ARTISTS),
+        "title": f"Tutorial {index}",
+        "category": rng.choice(CATEGORIES),
+        "chord": rng.choice(CHORDS),
+    }
+
+
+def synthetic_videos(count, prefix="/library", rng=None, words=None, artists=ARTISTS):
+    """Yield (file_name, metadata) for `count` videos that exist only as database rows.
+
+    Without `rng` every value follows from the index (100 folders, 250 artists), so runs repeat
+    exactly at no cost. With `rng` and a `words` vocabulary, names and titles are random words and
+    videos are filed under their artist, giving the search benchmark realistic text to match.
+    """
+    for i in range(count):
+        if rng is None:
+            folder = f"{prefix}/folder_{i % 100}"
+            metadata = {
+                "name": f"Lesson {i}", "artist": artists[i % len(artists)], "title": f"Song {i}",
+                "category": CATEGORIES[i % len(CATEGORIES)], "chord": CHORDS[i % len(CHORDS)],
+            }
+        else:
+            artist = rng.choice(artists)
+            folder = f"{prefix}/{artist}"
+            metadata = {
+                "name": " ".join(rng.sample(words, 3)), "artist": artist, "title": f"{rng.choice(words).title()} {i}",
+                "category": rng.choice(CATEGORIES), "chord": rng.choice(CHORDS),
+            }
+        metadata.update(directory=folder, file_size=1000 + i, file_mtime=i)
+        yield f"{folder}/video_{i}.mp4", metadata
+
+
+def generate_library(root, videos=1000, depth=3, fanout=5, encode=False, seed=0):
+    """Create `videos` files spread over a `fanout`-ary folder tree `depth` levels deep under `root`.
+
+    Files are small random stubs unless `encode` is set, in which case ENCODED_VARIANTS real clips
+    are encoded once and copied. Nothing is indexed yet; see index_library().
+    """
+    rng = random.Random(seed)
+    library_dir = os.path.join(root, "library")
+    folders = [library_dir]
+    for _ in range(depth):
+        folders = [os.path.join(folder, f"folder_{i}") for folder in folders for i in range(fanout)]
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+
+    sources = []
+    if encode:
+        for variant in range(ENCODED_VARIANTS):
+            source = os.path.join(root, f"clip_{variant}.mp4")
+            encode_clip(source, seconds=2 + variant)
+            sources.append(source)
+
+    paths, metadata = [], {}
+    for index in range(videos):
+        folder = folders[index % len(folders)]
+        if encode:
+            path = os.path.join(folder, f"lesson_{index}.mp4")
+            shutil.copyfile(sources[index % len(sources)], path)
+        else:
+            path = os.path.join(folder, f"lesson_{index}{rng.choice(EXTENSIONS)}")
+            with open(path, "wb") as stub:
+                stub.write(rng.randbytes(rng.randint(*STUB_SIZE_RANGE)))
+        paths.append(path)
+        metadata[path] = random_metadata(rng, index)
+
+    db_url = f"sqlite:///{os.path.join(root, 'library.db')}"
+    return SyntheticLibrary(root, library_dir, db_url, paths, metadata, encode)
+
+
+def index_library(library, quiet=True):
+    """Index the library into its SQLite file and fill in the random metadata; returns the Database."""
+    from database.database import Database
+    from modules.library_index import LibraryIndexer
+
+    output = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        db = Database(library.db_url)
+        LibraryIndexer(db).scan(library.library_dir)
+        ids = {file_name: video_id for video_id, file_name in db.iter_videos(columns=["id", "file_name"])}
+        db.update_videos((ids[path], metadata) for path, metadata in library.metadata.items())
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="directory to create the library and library.db in")
+    parser.add_argument("--videos", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--encode", action="store_true", help="encode real clips instead of stub files")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    library = generate_library(args.root, args.videos, args.depth, args.fanout, args.encode, args.seed)
+    index_library(library)
+    print(f"Created {len(library.paths)} videos under {library.library_dir}, indexed in {library.db_url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Headless library indexing: scan, deduplicate, probe and thumbnail a folder without opening a window.
+
+Usage: python cli.py index <folder> [--workers N] [--full] [--no-probe] [--no-thumbnails] [--duplicates]
+
+Writes to the same database and thumbnail store the GUI reads, so a library indexed here (e.g. from
+a cron job) opens warm in the app. The thumbnail store serialises writers with a file lock, so this
+can run while the app is open; where that lock is unavailable (no fcntl), thumbnails are skipped.
+"""
+import argparse
+import os
+import queue
+import sys
+import time
+
+from database.session import DEFAULT_DB_URL, dispose_engines
+from modules.instrumentation import enable_instrumentation
+from modules.task_scheduler import THREAD_WORKERS, TaskScheduler, PRIORITY_NORMAL
+from modules.thumbnails import THUMBNAIL_DIR
+
+# Seconds between progress updates on a terminal, and between log lines otherwise
+PROGRESS_INTERVAL = 0.2
+PROGRESS_LOG_INTERVAL = 5
+
+
+class Progress:
+    """A one-line progress display (stage, done/total, rate, ETA) on stderr.
+
+    On a terminal the line is redrawn in place; when output goes to a file or a cron log, a plain
+    line is written every PROGRESS_LOG_INTERVAL seconds instead.
+    """
+
+    def __init__(self, stage, stream=sys.stderr):
+        self.stage = stage
+        self.stream = stream
+        self.interactive = stream.isatty()
+        self.interval = PROGRESS_INTERVAL if self.interactive else PROGRESS_LOG_INTERVAL
+        self.start = time.perf_counter()
+        self._last_update = 0.0
+        self._last_line = None
+
+    def __call__(self, done, total):
+        now = time.perf_counter()
+        if done < total and now - self._last_update < self.interval:
+            return
+        self._last_update = now
+        elapsed = now - self.start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate and done < total else 0
+        line = (
+            f"[{self.stage}] {done}/{total} ({100 * done / total if total else 100:5.1f}%) "
+            f"{rate:7.1f}/s  ETA {int(eta) // 60}:{int(eta) % 60:02d}"
+        )
+        if self.interactive:
+            self.stream.write("\r" + line.ljust(len(self._last_line or "")))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+        self._last_line = line
+
+    def finish(self):
+        if self.interactive and self._last_line is not None:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def generate_thumbnails(db, directory, workers, thumbnail_dir):
+    """Generate missing thumbnails for every indexed video under `directory`; returns (generated, failed)."""
+    from modules.thumbnail_store import ThumbnailStore
+    from modules.thumbnails import ThumbnailEngine
+
+    if not ThumbnailStore.locks_across_processes:
+        # Without the store's file lock, this process and a running app could claim the same slot
+        raise RuntimeError("the thumbnail store cannot be locked against the app on this platform")
+
+    scheduler = TaskScheduler(max_workers=workers)
+    engine = ThumbnailEngine(thumbnail_dir, scheduler)
+    try:
+        paths = [row.file_name for row in db.iter_videos(directory=directory, columns=["file_name"])]
+        missing = [path for path in paths if engine.lookup(path) is None]
+        results = queue.Queue()
+        engine.submit_many(missing, results, priority=PRIORITY_NORMAL)
+        progress = Progress("thumbnails")
+        failed = 0
+        for done in range(1, len(missing) + 1):
+            _, key = results.get()
+            failed += key is None
+            progress(done, len(missing))
+        progress.finish()
+        return len(missing) - failed, failed
+    finally:
+        scheduler.shutdown()
+        engine.store.close()
+
+
+def index(args):
+    from database.database import Database
+    from modules.dedup import DedupEngine
+    from modules.library_index import LibraryIndexer
+    from modules.media_probe import probe_library
+
+    directory = os.path.abspath(args.folder)
+    if not os.path.isdir(directory):
+        print(f"Not a directory: {directory}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    db = Database(args.db)
+    try:
+        result = LibraryIndexer(db).scan(directory, full=args.full)
+
+        progress = Progress("fingerprints")
+        groups = DedupEngine(db, max_workers=args.workers).run(directory, progress=progress)
+        progress.finish()
+        if args.duplicates:
+            DedupEngine(db).report(groups)
+
+        if not args.no_probe:
+            progress = Progress("probe")
+            try:
+                probe_library(db, directory, max_workers=args.workers, progress=progress)
+            except (ImportError, FileNotFoundError) as e:
+                print(f"Skipped probing, ffprobe is unavailable: {e}", file=sys.stderr)
+            progress.finish()
+
+        if not args.no_thumbnails:
+            try:
+                generated, failed = generate_thumbnails(db, directory, args.workers, args.thumbnail_dir)
+                print(f"Generated {generated} thumbnails ({failed} failed).")
+            except RuntimeError as e:
+                print(f"Skipped thumbnails, {e}", file=sys.stderr)
+
+        total = db.count_videos(directory=directory)
+        print(
+            f"Indexed {total} videos in {directory} (+{result.added} ~{result.updated} -{result.removed}) "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
+        return 0
+    finally:
+        db.close()
+        dispose_engines()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=DEFAULT_DB_URL, help="database URL (default: %(default)s)")
+    parser.add_argument("--metrics", help="append instrumentation snapshots to this JSON-lines file")
+    parser.add_argument("--profile", choices=("cprofile", "sample"), help="profile the run")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="scan, deduplicate, probe and thumbnail a folder tree")
+    index_parser.add_argument("folder")
+    index_parser.add_argument("--workers", type=int, default=THREAD_WORKERS,
+                              help="parallel hash/ffprobe/thumbnail jobs (default: %(default)s)")
+    index_parser.add_argument("--full", action="store_true", help="re-list unchanged directories too")
+    index_parser.add_argument("--no-probe", action="store_true", help="skip reading duration/resolution")
+    index_parser.add_argument("--no-thumbnails", action="store_true", help="skip thumbnail generation")
+    index_parser.add_argument("--duplicates", action="store_true", help="list groups of duplicate files")
+    index_parser.add_argument("--thumbnail-dir", default=THUMBNAIL_DIR, help="default: %(default)s")
+    index_parser.set_defaults(handler=index)
+
+    args = parser.parse_args(argv)
+    if args.metrics or args.profile:
+        enable_instrumentation(args.metrics, args.profile)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
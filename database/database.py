@@ -1,43 +1,95 @@
 import os
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import re
+import time
+from collections import namedtuple
+from sqlalchemy import and_, or_, insert, update, delete, select, bindparam, func, case
 from sqlalchemy.sql import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from database.models import Video, VideoRecord, Favorite, WatchProgress
+from database.migrations import FACET_COLUMNS, TOTAL_FACET, TOTAL_VALUE
+from database.util import chunks
+from database.session import DEFAULT_DB_URL, get_engine, get_session_factory, get_scoped_session, session_scope
 
 # Define the paths for schema and database files
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Path to database folder
 SCHEMA_PATH = os.path.join(BASE_DIR, "schema.sql")     # Path to schema.sql file
 DB_PATH = os.path.join(BASE_DIR, "music_tracker.db")   # Path to SQLite database
 
-# Define the base class for declarative models
-Base = declarative_base()
+# Number of rows written per transaction by the bulk ingest methods
+BULK_BATCH_SIZE = 5000
 
-# Define the Video model that corresponds to the "videos" table in the database
-class Video(Base):
-    __tablename__ = 'videos'
+# Largest number of matches search_as_you_type will rank by relevance
+AS_YOU_TYPE_RANK_LIMIT = 2000
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    file_name = Column(String, nullable=False)
-    name = Column(String)
-    artist = Column(String)
-    title = Column(String)
-    category = Column(String)
-    chord = Column(String)
-    status = Column(String, default="unread")  # Add default status column
+# Rows fetched from the cursor at a time by the streaming iter_* methods
+STREAM_BATCH_SIZE = 1000
 
-    def __repr__(self):
-        return f"<Video(id={self.id}, name={self.name}, artist={self.artist}, status={self.status})>"
+class BulkResult(namedtuple("BulkResult", "rows seconds")):
+    """Outcome of a bulk ingest call."""
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else float("inf")
+
+# Columns the bulk methods accept in a metadata dict
+VIDEO_COLUMNS = tuple(column.name for column in Video.__table__.columns if column.name != "id")
+
+def _video_row(file_name, metadata):
+    """Build a full insert row for the videos table from a file name and metadata dict."""
+    row = {column: metadata.get(column) for column in VIDEO_COLUMNS}
+    row["file_name"] = file_name
+    row["status"] = metadata.get("status") or "unread"
+    return row
+
+def build_match_query(query, prefix=False, as_you_type=False):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word is quoted so user input can never inject FTS syntax. With `prefix` every word
+    matches as a prefix; with `as_you_type` only the last (possibly unfinished) word does.
+    """
+    words = re.findall(r"\w+", query or "")
+    terms = [f'"{word}"' for word in words]
+    if prefix:
+        terms = [f"{term}*" for term in terms]
+    elif as_you_type and terms:
+        terms[-1] = f"{terms[-1]}*"
+    return " ".join(terms)
+
+def filter_video_query(query, selected_category="All", directory=None, recursive=True):
+    """Restrict a videos query to a category and/or a folder tree."""
+    if selected_category and selected_category != "All":
+        query = query.filter(Video.category == selected_category)
+    if directory:
+        directory = os.path.abspath(directory)
+        if recursive:
+            prefix = directory.rstrip(os.sep) + os.sep
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query = query.filter(or_(Video.directory == directory, Video.directory.like(f"{escaped}%", escape="\\")))
+        else:
+            query = query.filter(Video.directory == directory)
+    return query
+
+def delete_video_dependents(session, video_ids):
+    """Delete the favorites and watch progress of videos about to be deleted (a list or SELECT of ids).
+
+    SQLite does not enforce ON DELETE CASCADE here and bulk deletes skip the ORM cascade, so every
+    path that deletes videos calls this first, in the same transaction.
+    """
+    for table in (Favorite.__table__, WatchProgress.__table__):
+        session.execute(delete(table).where(table.c.video_id.in_(video_ids)))
 
 class Database:
-    def __init__(self, db_url='sqlite:///music_tracker.db'):
-        """Initialize the database and ensure schema is applied."""
-        # Create an SQLite database engine
-        self.engine = create_engine(db_url, echo=True)
-        # Create tables in the database
-        Base.metadata.create_all(self.engine)
-        # Create a session maker to interact with the database
-        self.Session = sessionmaker(bind=self.engine)
-        self.session = self.Session()
+    def __init__(self, db_url=DEFAULT_DB_URL, echo=False):
+        """Attach to the shared engine for `db_url`; the schema is created and upgraded once per process."""
+        self.db_url = db_url
+        self.engine = get_engine(db_url, echo=echo)
+        self.Session = get_session_factory(db_url)
+        # Thread-local session for callers that want one; the methods below use session_scope()
+        self.session = get_scoped_session(db_url)
+
+    def session_scope(self):
+        """Context manager for one unit of work in a fresh session (commit, or roll back on error)."""
+        return session_scope(self.db_url)
 
     def initialize_database(self):
         """Read the schema.sql file and initialize the database."""
@@ -57,18 +109,18 @@ class Database:
             print(f"Error initializing the database: {e}")
 
     def add_video(self, file_name, metadata):
-        """Insert a new video record."""
-        try:
-            new_video = Video(
-                file_name=file_name,
-                name=metadata["name"],
-                artist=metadata["artist"],
-                title=metadata["title"],
-                category=metadata["category"],
-                chord=metadata["chord"]
-            )
-            self.session.add(new_video)
-            self.session.commit()
+        """Insert a new video record, or update its metadata if the file is already indexed."""
+        try:
+            with self.session_scope() as session:
+                video = session.query(Video).filter_by(file_name=file_name).first()
+                if video is None:
+                    video = Video(file_name=file_name)
+                    session.add(video)
+                video.name = metadata["name"]
+                video.artist = metadata["artist"]
+                video.title = metadata["title"]
+                video.category = metadata["category"]
+                video.chord = metadata["chord"]
             print(f"Video '{file_name}' added successfully.")
         except Exception as e:
             print(f"Error adding video: {e}")
@@ -76,17 +128,44 @@ class Database:
     def get_all_videos(self):
         """Retrieve all video records."""
         try:
-            return self.session.query(Video).all()
+            with self.session_scope() as session:
+                return session.query(Video).all()
         except Exception as e:
             print(f"Error fetching videos: {e}")
             return None
 
+    def iter_videos(self, selected_category="All", directory=None, columns=None, batch_size=STREAM_BATCH_SIZE):
+        """Stream videos as lightweight rows instead of building a list of ORM objects.
+
+        Yields Core rows (tuples with attribute access, e.g. `row.file_name`) of `columns` (names
+        from the videos table; all of them by default), in id order. Rows are fetched from the
+        cursor `batch_size` at a time, so memory stays flat however large the library is. The
+        connection is held until the generator is exhausted or closed.
+        """
+        table = Video.__table__
+        selected = [table.c[name] for name in columns] if columns else list(table.c)
+        query = filter_video_query(select(*selected), selected_category, directory).order_by(table.c.id)
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            for partition in result.partitions():
+                yield from partition
+
+    def iter_records(self, selected_category="All", directory=None, batch_size=STREAM_BATCH_SIZE):
+        """Stream VideoRecords in id order, `batch_size` rows per cursor fetch."""
+        fields = VideoRecord._fields
+        return map(VideoRecord._make, self.iter_videos(selected_category, directory, fields, batch_size))
+
+    def iter_video_batches(self, selected_category="All", directory=None, columns=None, batch_size=STREAM_BATCH_SIZE):
+        """Like iter_videos, but yields lists of up to `batch_size` rows (handy for batched writes)."""
+        return chunks(self.iter_videos(selected_category, directory, columns, batch_size), batch_size)
+
     def fetch_videos_by_category(self, selected_category):
         """Fetch videos by category from the database."""
         try:
-            if selected_category == "All" or not selected_category:
-                return self.session.query(Video).all()  # Fetch all videos if "All" is selected
-            return self.session.query(Video).filter(Video.category == selected_category).all()  # Filter by category
+            with self.session_scope() as session:
+                if selected_category == "All" or not selected_category:
+                    return session.query(Video).all()  # Fetch all videos if "All" is selected
+                return session.query(Video).filter(Video.category == selected_category).all()  # Filter by category
         except Exception as e:
             print(f"Error fetching videos by category: {e}")
             return None
@@ -94,14 +173,15 @@ class Database:
     def update_video(self, video_id, updated_metadata):
         """Update an existing video record."""
         try:
-            video = self.session.query(Video).filter_by(id=video_id).first()
+            with self.session_scope() as session:
+                video = session.get(Video, video_id)
+                if video:
+                    video.name = updated_metadata["name"]
+                    video.artist = updated_metadata["artist"]
+                    video.title = updated_metadata["title"]
+                    video.category = updated_metadata["category"]
+                    video.chord = updated_metadata["chord"]
             if video:
-                video.name = updated_metadata["name"]
-                video.artist = updated_metadata["artist"]
-                video.title = updated_metadata["title"]
-                video.category = updated_metadata["category"]
-                video.chord = updated_metadata["chord"]
-                self.session.commit()
                 print(f"Video with ID {video_id} updated successfully.")
             else:
                 print(f"Video with ID {video_id} not found.")
@@ -111,10 +191,12 @@ class Database:
     def delete_video(self, video_id):
         """Delete a video record."""
         try:
-            video = self.session.query(Video).filter_by(id=video_id).first()
+            with self.session_scope() as session:
+                video = session.get(Video, video_id)
+                if video:
+                    delete_video_dependents(session, [video_id])
+                    session.delete(video)
             if video:
-                self.session.delete(video)
-                self.session.commit()
                 print(f"Video with ID {video_id} deleted successfully.")
             else:
                 print(f"Video with ID {video_id} not found.")
@@ -122,39 +204,377 @@ class Database:
             print(f"Error deleting video: {e}")
 
     def close(self):
-        """Close the database session."""
-        if self.session:
-            self.session.close()
-            print("Database session closed.")
+        """Release this thread's session; the shared engine stays up for the rest of the app."""
+        self.session.remove()
+        print("Database session closed.")
 
     def fetch_videos(self, selected_category="All"):
         """Fetch videos and filter them by category if necessary."""
-        session = self.Session()
-        if selected_category == "All" or not selected_category:
-            videos = session.query(Video).all()  # Fetch all videos if "All" is selected
-        else:
-            videos = session.query(Video).filter(Video.category == selected_category).all()  # Filter by category
-        session.close()
-        return videos
+        return self.fetch_videos_by_category(selected_category) or []
 
     def get_video_by_filename(self, filename):
         """Fetch a video record by its filename."""
         try:
-            video = self.session.query(Video).filter_by(file_name=filename).first()
-            return video
+            with self.session_scope() as session:
+                return session.query(Video).filter_by(file_name=filename).first()
         except Exception as e:
             print(f"Error fetching video by filename: {e}")
             return None
 
     def update_video_status(self, filename, status):
-        """Update the status of a video (e.g., read/unread)."""
+        """Update the status of a video (e.g., read/unread); returns True if the video was found.
+
+        Runs in its own session, so it can be called from a background thread.
+        """
         try:
-            video = self.get_video_by_filename(filename)
-            if video:
-                video.status = status  # Update the status field
-                self.session.commit()   # Commit the changes to the database
-                print(f"Video '{filename}' status updated to {status}.")
-            else:
-                print(f"Video with filename '{filename}' not found.")
+            with self.session_scope() as session:
+                updated = session.query(Video).filter_by(file_name=filename).update({Video.status: status})
         except Exception as e:
             print(f"Error updating video status: {e}")
+            raise
+        if updated:
+            print(f"Video '{filename}' status updated to {status}.")
+        else:
+            print(f"Video with filename '{filename}' not found.")
+        return bool(updated)
+
+    def fetch_statuses(self):
+        """Return {file_name: status} for every video with a single query."""
+        try:
+            with self.engine.connect() as connection:
+                return dict(connection.execute(select(Video.file_name, Video.status)).all())
+        except Exception as e:
+            print(f"Error fetching video statuses: {e}")
+            return {}
+
+    def update_video_statuses(self, statuses):
+        """Write many {file_name: status} changes in one transaction; returns the number of rows updated."""
+        table = Video.__table__
+        statement = update(table).where(table.c.file_name == bindparam("_file_name")).values(status=bindparam("_status"))
+        params = [{"_file_name": file_name, "_status": status} for file_name, status in statuses.items()]
+        if not params:
+            return 0
+        with self.engine.begin() as connection:
+            return connection.execute(statement, params).rowcount
+
+    def facet_counts(self, facet="category", limit=None):
+        """Return [(value, count)] for one facet, most common first, read from the facet_counts summary."""
+        return self.fetch_facets((facet,), limit).get(facet, [])
+
+    def fetch_facets(self, facets=FACET_COLUMNS, limit=None):
+        """Return {facet: [(value, count)]} for several facets with one query on the facet_counts primary key.
+
+        `limit` caps the values returned per facet. Including TOTAL_FACET adds the number of videos as
+        [(TOTAL_VALUE, count)], counting videos without any facet value too.
+        """
+        facets = tuple(facets)
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(
+                    text("SELECT facet, value, count FROM facet_counts WHERE facet IN :facets "
+                         "ORDER BY facet, count DESC, value").bindparams(bindparam("facets", expanding=True)),
+                    {"facets": list(facets)},
+                ).all()
+        except Exception as e:
+            print(f"Error fetching facet counts: {e}")
+            return {}
+        result = {facet: [] for facet in facets}
+        for facet, value, count in rows:
+            if limit is None or len(result[facet]) < limit:
+                result[facet].append((value, count))
+        return result
+
+    def fetch_progress(self, video_id):
+        """Return a video's WatchProgress row, or None if it has never been played."""
+        try:
+            with self.session_scope() as session:
+                return session.get(WatchProgress, video_id)
+        except Exception as e:
+            print(f"Error fetching watch progress: {e}")
+            return None
+
+    def save_progress(self, rows):
+        """Upsert many watch_progress rows (dicts keyed by column name) in one transaction.
+
+        A row whose percent is unknown keeps the completion time already stored for that video; a
+        row with a percent and no completed_at (a rewatch that has not reached the end) clears it.
+        """
+        if not rows:
+            return 0
+        table = WatchProgress.__table__
+        statement = sqlite_insert(table)
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=["video_id"],
+            set_={
+                "position": excluded.position,
+                "duration": excluded.duration,
+                "percent": excluded.percent,
+                "updated_at": excluded.updated_at,
+                "completed_at": case(
+                    (excluded.percent.is_(None), func.coalesce(excluded.completed_at, table.c.completed_at)),
+                    else_=excluded.completed_at,
+                ),
+            },
+        )
+        with self.engine.begin() as connection:
+            connection.execute(statement, rows)
+        return len(rows)
+
+    def fetch_continue_watching(self, limit=20, min_percent=1.0):
+        """Started but unfinished videos, most recently watched first (walks ix_watch_progress_resume).
+
+        Videos of unknown duration have no percent; any position past the start counts for them.
+        """
+        try:
+            with self.session_scope() as session:
+                started = or_(
+                    WatchProgress.percent >= min_percent,
+                    and_(WatchProgress.percent.is_(None), WatchProgress.position > 0),
+                )
+                return (
+                    session.query(Video, WatchProgress)
+                    .join(WatchProgress, WatchProgress.video_id == Video.id)
+                    .filter(WatchProgress.completed_at.is_(None), started)
+                    .order_by(WatchProgress.completed_at, WatchProgress.updated_at.desc())
+                    .limit(limit)
+                    .all()
+                )
+        except Exception as e:
+            print(f"Error fetching videos to continue: {e}")
+            return []
+
+    def fetch_nearly_complete(self, min_percent=80.0, limit=20):
+        """Unfinished videos watched at least `min_percent`, furthest along first (walks ix_watch_progress_percent)."""
+        try:
+            with self.session_scope() as session:
+                return (
+                    session.query(Video, WatchProgress)
+                    .join(WatchProgress, WatchProgress.video_id == Video.id)
+                    .filter(WatchProgress.percent >= min_percent, WatchProgress.completed_at.is_(None))
+                    .order_by(WatchProgress.percent.desc())
+                    .limit(limit)
+                    .all()
+                )
+        except Exception as e:
+            print(f"Error fetching nearly complete videos: {e}")
+            return []
+
+    def get_videos_in_directory(self, directory, recursive=False):
+        """Fetch the indexed videos stored in a directory (and optionally its subdirectories)."""
+        try:
+            with self.session_scope() as session:
+                query = filter_video_query(session.query(Video), directory=directory, recursive=recursive)
+                return query.order_by(Video.file_name).all()
+        except Exception as e:
+            print(f"Error fetching videos in directory: {e}")
+            return []
+
+    def count_videos(self, selected_category="All", directory=None):
+        """Count the videos matching a category (and optionally a folder tree).
+
+        Without a folder this is one lookup in the facet_counts summary rather than a table scan.
+        """
+        if not directory and selected_category:
+            if selected_category == "All":
+                facet, value = TOTAL_FACET, TOTAL_VALUE
+            else:
+                facet, value = "category", selected_category
+            try:
+                with self.engine.connect() as connection:
+                    return connection.execute(
+                        text("SELECT count FROM facet_counts WHERE facet = :facet AND value = :value"),
+                        {"facet": facet, "value": value},
+                    ).scalar() or 0
+            except Exception as e:
+                print(f"Error counting videos: {e}")
+                return 0
+        try:
+            with self.session_scope() as session:
+                return filter_video_query(session.query(Video), selected_category, directory).count()
+        except Exception as e:
+            print(f"Error counting videos: {e}")
+            return 0
+
+    def get_records_in_directory(self, directory, recursive=False):
+        """Like get_videos_in_directory, but returns read-only VideoRecords built from a Core query."""
+        query = filter_video_query(select(*VideoRecord.columns()), directory=directory, recursive=recursive)
+        return self._fetch_records(query.order_by(Video.file_name), "videos in directory")
+
+    def fetch_records_page(self, after_id=0, limit=100, selected_category="All", directory=None):
+        """Like fetch_videos_page, but returns read-only VideoRecords built from a Core query."""
+        query = filter_video_query(select(*VideoRecord.columns()), selected_category, directory)
+        return self._fetch_records(query.where(Video.id > after_id).order_by(Video.id).limit(limit), "video page")
+
+    def _fetch_records(self, query, description):
+        try:
+            with self.engine.connect() as connection:
+                return list(map(VideoRecord._make, connection.execute(query)))
+        except Exception as e:
+            print(f"Error fetching {description}: {e}")
+            return []
+
+    def fetch_videos_page(self, after_id=0, limit=100, selected_category="All", directory=None):
+        """Fetch the next `limit` videos with an id greater than `after_id` (keyset pagination)."""
+        try:
+            with self.session_scope() as session:
+                query = filter_video_query(session.query(Video), selected_category, directory)
+                return query.filter(Video.id > after_id).order_by(Video.id).limit(limit).all()
+        except Exception as e:
+            print(f"Error fetching video page: {e}")
+            return []
+
+    def fetch_page_boundary(self, after_id, page_size, selected_category="All", directory=None):
+        """Return the id of the last video on the page that starts after `after_id`, or None past the end."""
+        try:
+            with self.session_scope() as session:
+                query = filter_video_query(session.query(Video.id), selected_category, directory)
+                row = query.filter(Video.id > after_id).order_by(Video.id).offset(page_size - 1).limit(1).first()
+                return row[0] if row else None
+        except Exception as e:
+            print(f"Error fetching page boundary: {e}")
+            return None
+
+    def fetch_videos_by_media(self, min_duration=None, max_duration=None, min_height=None,
+                              sort_by="duration", descending=False, limit=100):
+        """Filter and sort videos by probed duration/resolution using the column indexes."""
+        sort_columns = {"duration": Video.duration, "height": Video.height, "bit_rate": Video.bit_rate}
+        try:
+            with self.session_scope() as session:
+                query = session.query(Video)
+                if min_duration is not None:
+                    query = query.filter(Video.duration >= min_duration)
+                if max_duration is not None:
+                    query = query.filter(Video.duration <= max_duration)
+                if min_height is not None:
+                    query = query.filter(Video.height >= min_height)
+                sort_column = sort_columns[sort_by]
+                query = query.filter(sort_column.isnot(None))
+                order = sort_column.desc() if descending else sort_column
+                return query.order_by(order, Video.id).limit(limit).all()
+        except Exception as e:
+            print(f"Error fetching videos by media properties: {e}")
+            return []
+
+    def search(self, query, limit=50, prefix=False, as_you_type=False, ranked=True):
+        """Full-text search over name/artist/title/category/chord/file name, best matches first.
+
+        With `ranked=False` rows come back in id order, which lets SQLite stop after `limit` matches.
+        """
+        match = build_match_query(query, prefix, as_you_type)
+        if not match:
+            return []
+        try:
+            order = "ORDER BY videos_fts.rank " if ranked else ""
+            statement = text(
+                "SELECT videos.* FROM videos_fts JOIN videos ON videos.id = videos_fts.rowid "
+                f"WHERE videos_fts MATCH :match {order}LIMIT :limit"
+            )
+            with self.session_scope() as session:
+                return session.query(Video).from_statement(statement).params(match=match, limit=limit).all()
+        except Exception as e:
+            print(f"Error searching videos: {e}")
+            return []
+
+    def search_as_you_type(self, query, limit=10):
+        """Search while the user is still typing: the last word is matched as a prefix.
+
+        Results are ranked when the prefix narrows the library to a few thousand rows. Broader
+        prefixes (e.g. a single letter) return the first matches unranked, because ranking tens
+        of thousands of rows would take longer than a keystroke.
+        """
+        match = build_match_query(query, as_you_type=True)
+        if not match:
+            return []
+        try:
+            with self.engine.connect() as connection:
+                candidates = connection.execute(
+                    text("SELECT rowid FROM videos_fts WHERE videos_fts MATCH :match LIMIT :cap"),
+                    {"match": match, "cap": AS_YOU_TYPE_RANK_LIMIT + 1},
+                ).all()
+        except Exception as e:
+            print(f"Error searching videos: {e}")
+            return []
+        ranked = len(candidates) <= AS_YOU_TYPE_RANK_LIMIT
+        return self.search(query, limit=limit, as_you_type=True, ranked=ranked)
+
+    def add_videos(self, videos, batch_size=BULK_BATCH_SIZE):
+        """Insert many videos given as (file_name, metadata) pairs, one transaction per batch."""
+        start = time.perf_counter()
+        rows = 0
+        session = self.Session()  # Private session: bulk loads often run on a worker thread
+        try:
+            for chunk in chunks(videos, batch_size):
+                session.execute(insert(Video.__table__), [_video_row(f, m) for f, m in chunk])
+                session.commit()
+                rows += len(chunk)
+        except Exception as e:
+            session.rollback()
+            print(f"Error adding videos: {e}")
+        finally:
+            session.close()
+        return self._report("Inserted", rows, start)
+
+    def update_videos(self, updates, batch_size=BULK_BATCH_SIZE):
+        """Update many videos given as (video_id, metadata) pairs, one transaction per batch."""
+        start = time.perf_counter()
+        rows = 0
+        session = self.Session()  # Private session: bulk loads often run on a worker thread
+        try:
+            for chunk in chunks(updates, batch_size):
+                self._execute_updates(session, chunk)
+                session.commit()
+                rows += len(chunk)
+        except Exception as e:
+            session.rollback()
+            print(f"Error updating videos: {e}")
+        finally:
+            session.close()
+        return self._report("Updated", rows, start)
+
+    def upsert_videos(self, videos, batch_size=BULK_BATCH_SIZE):
+        """Insert or update many videos given as (file_name, metadata) pairs, matched on file_name."""
+        start = time.perf_counter()
+        rows = 0
+        session = self.Session()  # Private session: bulk loads often run on a worker thread
+        try:
+            for chunk in chunks(videos, batch_size):
+                names = [file_name for file_name, _ in chunk]
+                existing = dict(
+                    session.execute(select(Video.file_name, Video.id).where(Video.file_name.in_(names))).all()
+                )
+                to_update = [(existing[f], m) for f, m in chunk if f in existing]
+                to_insert = [_video_row(f, m) for f, m in chunk if f not in existing]
+                if to_update:
+                    self._execute_updates(session, to_update)
+                if to_insert:
+                    session.execute(insert(Video.__table__), to_insert)
+                session.commit()
+                rows += len(chunk)
+        except Exception as e:
+            session.rollback()
+            print(f"Error upserting videos: {e}")
+        finally:
+            session.close()
+        return self._report("Upserted", rows, start)
+
+    def _execute_updates(self, session, updates):
+        """Run executemany UPDATEs, grouping rows that set the same columns."""
+        table = Video.__table__
+        groups = {}
+        for video_id, metadata in updates:
+            values = {column: value for column, value in metadata.items() if column in VIDEO_COLUMNS}
+            if values:
+                groups.setdefault(tuple(sorted(values)), []).append(dict(values, _id=video_id))
+        for columns, params in groups.items():
+            statement = (
+                update(table)
+                .where(table.c.id == bindparam("_id"))
+                .values({column: bindparam(column) for column in columns})
+            )
+            session.execute(statement, params)
+
+    def _report(self, action, rows, start):
+        result = BulkResult(rows, time.perf_counter() - start)
+        print(f"{action} {result.rows} videos in {result.seconds:.2f}s ({result.rows_per_sec:.0f} rows/sec).")
+        return result
@@ -0,0 +1,207 @@
+import sys
+from sqlalchemy import inspect
+from sqlalchemy.sql import text
+
+# Columns of `videos` covered by the full-text index, with their bm25 weights
+SEARCH_COLUMNS = (("name", 10.0), ("artist", 6.0), ("title", 8.0), ("category", 4.0), ("chord", 2.0), ("file_name", 1.0))
+
+_search_columns = ", ".join(column for column, _ in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column, _ in SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column, _ in SEARCH_COLUMNS)
+
+# External-content FTS5 table kept in sync with `videos` by triggers
+SEARCH_SCHEMA = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+        {_search_columns}, content='videos', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3 4'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS videos_fts_insert AFTER INSERT ON videos BEGIN
+        INSERT INTO videos_fts (rowid, {_search_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS videos_fts_delete AFTER DELETE ON videos BEGIN
+        INSERT INTO videos_fts (videos_fts, rowid, {_search_columns}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS videos_fts_update AFTER UPDATE OF {_search_columns} ON videos BEGIN
+        INSERT INTO videos_fts (videos_fts, rowid, {_search_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO videos_fts (rowid, {_search_columns}) VALUES (new.id, {_new_values});
+    END""",
+)
+
+
+# Columns of `videos` whose distinct values are counted in facet_counts
+FACET_COLUMNS = ("category", "artist", "chord")
+
+# facet_counts row holding the number of videos, whatever their facet values
+TOTAL_FACET, TOTAL_VALUE = "total", "videos"
+
+
+def _count_facets(row, delta, columns=FACET_COLUMNS):
+    """Trigger statements adding `delta` (+1 or -1) to the facet counts of the `new`/`old` row."""
+    statements = []
+    for column in columns:
+        value = f"{row}.{column}"
+        if delta > 0:
+            statements.append(
+                f"INSERT OR IGNORE INTO facet_counts (facet, value, count) "
+                f"SELECT '{column}', {value}, 0 WHERE {value} IS NOT NULL AND {value} != '';"
+            )
+        statements.append(
+            f"UPDATE facet_counts SET count = count {'+' if delta > 0 else '-'} 1 "
+            f"WHERE facet = '{column}' AND value = {value};"
+        )
+        if delta < 0:
+            statements.append(f"DELETE FROM facet_counts WHERE facet = '{column}' AND value = {value} AND count <= 0;")
+    return statements
+
+
+# Per-value counts of FACET_COLUMNS, kept current by triggers so a sidebar never has to scan `videos`
+FACET_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS facet_counts (
+        facet TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (facet, value)
+    ) WITHOUT ROWID""",
+    "CREATE TRIGGER IF NOT EXISTS facet_counts_insert AFTER INSERT ON videos BEGIN\n    "
+    + "\n    ".join(_count_facets("new", 1)) + "\nEND",
+    "CREATE TRIGGER IF NOT EXISTS facet_counts_delete AFTER DELETE ON videos BEGIN\n    "
+    + "\n    ".join(_count_facets("old", -1)) + "\nEND",
+) + tuple(
+    # One update trigger per column, firing only when that column really changed
+    f"CREATE TRIGGER IF NOT EXISTS facet_counts_update_{column} AFTER UPDATE OF {column} ON videos "
+    f"WHEN old.{column} IS NOT new.{column} BEGIN\n    "
+    + "\n    ".join(_count_facets("old", -1, (column,)) + _count_facets("new", 1, (column,)))
+    + "\nEND"
+    for column in FACET_COLUMNS
+) + (
+    # Separate triggers, so databases whose facet triggers predate the total row get them too
+    "CREATE TRIGGER IF NOT EXISTS facet_counts_total_insert AFTER INSERT ON videos BEGIN\n    "
+    f"UPDATE facet_counts SET count = count + 1 WHERE facet = '{TOTAL_FACET}' AND value = '{TOTAL_VALUE}';\nEND",
+    "CREATE TRIGGER IF NOT EXISTS facet_counts_total_delete AFTER DELETE ON videos BEGIN\n    "
+    f"UPDATE facet_counts SET count = count - 1 WHERE facet = '{TOTAL_FACET}' AND value = '{TOTAL_VALUE}';\nEND",
+)
+
+
+def upgrade_schema(engine, metadata):
+    """Add columns and indexes that exist on the models but not yet in the database file."""
+    try:
+        inspector = inspect(engine)
+        existing_tables = set(inspector.get_table_names())
+        with engine.begin() as connection:
+            for table in metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    continue
+                existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing_columns:
+                        continue
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                    print(f"Added column {table.name}.{column.name}.")
+                existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name in existing_indexes:
+                        continue
+                    if index.unique and len(index.columns) == 1:
+                        # A unique index cannot be built over existing duplicates; merge them first
+                        merge_duplicates(connection, table.name, next(iter(index.columns)).name)
+                    index.create(connection)
+                    print(f"Created index {index.name}.")
+    except Exception as e:
+        print(f"Error upgrading the database schema: {e}")
+
+
+def ensure_search_index(engine):
+    """Create the FTS5 search table and its triggers, indexing existing rows the first time."""
+    if engine.dialect.name != "sqlite":
+        return
+    try:
+        with engine.begin() as connection:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'videos_fts'")
+            ).first()
+            for statement in SEARCH_SCHEMA:
+                connection.execute(text(statement))
+            if not exists:
+                connection.execute(text("INSERT INTO videos_fts (videos_fts) VALUES ('rebuild')"))
+                weights = ", ".join(str(weight) for _, weight in SEARCH_COLUMNS)
+                connection.execute(
+                    text("INSERT INTO videos_fts (videos_fts, rank) VALUES ('rank', :rank)"),
+                    {"rank": f"bm25({weights})"},
+                )
+                print("Built the full-text search index.")
+    except Exception as e:
+        print(f"Error creating the search index: {e}")
+
+
+def ensure_facet_counts(engine):
+    """Create the facet_counts summary table and its triggers, counting existing rows the first time."""
+    if engine.dialect.name != "sqlite":
+        return
+    try:
+        with engine.begin() as connection:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'facet_counts'")
+            ).first()
+            for statement in FACET_SCHEMA:
+                connection.execute(text(statement))
+            if not exists:
+                for column in FACET_COLUMNS:
+                    connection.execute(text(
+                        f"INSERT INTO facet_counts (facet, value, count) SELECT '{column}', {column}, COUNT(*) "
+                        f"FROM videos WHERE {column} IS NOT NULL AND {column} != '' GROUP BY {column}"
+                    ))
+                print("Built the facet counts.")
+            # Counted in the same transaction that creates its triggers, so it never drifts
+            connection.execute(text(
+                f"INSERT OR IGNORE INTO facet_counts (facet, value, count) "
+                f"SELECT '{TOTAL_FACET}', '{TOTAL_VALUE}', COUNT(*) FROM videos"
+            ))
+    except Exception as e:
+        print(f"Error creating the facet counts: {e}")
+
+
+def merge_duplicates(connection, table_name, column_name):
+    """Collapse rows sharing a value in `column_name` into the oldest row.
+
+    The oldest row keeps its id (so favorites keep pointing at it) and takes the newest non-null
+    value of every other column from its duplicates.
+    """
+    duplicate_values = connection.execute(text(
+        f'SELECT "{column_name}" FROM "{table_name}" WHERE "{column_name}" IS NOT NULL '
+        f'GROUP BY "{column_name}" HAVING COUNT(*) > 1'
+    )).scalars().all()
+    merged = 0
+    for value in duplicate_values:
+        rows = connection.execute(
+            text(f'SELECT * FROM "{table_name}" WHERE "{column_name}" = :value ORDER BY id'), {"value": value}
+        ).mappings().all()
+        keep, duplicates = rows[0], rows[1:]
+        values = {}
+        for row in duplicates:
+            values.update({key: val for key, val in row.items() if key != "id" and val is not None})
+        if values:
+            assignments = ", ".join(f'"{key}" = :{key}' for key in values)
+            connection.execute(text(f'UPDATE "{table_name}" SET {assignments} WHERE id = :id'), dict(values, id=keep["id"]))
+        duplicate_ids = [row["id"] for row in duplicates]
+        if table_name == "videos" and "favorites" in inspect(connection).get_table_names():
+            for duplicate_id in duplicate_ids:
+                # OR IGNORE: the kept video may already be a favorite; the leftover row is deleted below
+                connection.execute(
+                    text("UPDATE OR IGNORE favorites SET video_id = :keep WHERE video_id = :duplicate"),
+                    {"keep": keep["id"], "duplicate": duplicate_id},
+                )
+                connection.execute(text("DELETE FROM favorites WHERE video_id = :duplicate"), {"duplicate": duplicate_id})
+        for duplicate_id in duplicate_ids:
+            connection.execute(text(f'DELETE FROM "{table_name}" WHERE id = :id'), {"id": duplicate_id})
+        merged += len(duplicate_ids)
+    if merged:
+        print(f"Merged {merged} duplicate rows in {table_name}.{column_name}.")
+
+
+if __name__ == "__main__":
+    # Upgrade an existing database file in place: python -m database.migrations path/to/music_tracker.db
+    from database.database import Database
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "music_tracker.db"
+    Database(f"sqlite:///{db_path}", echo=False).close()
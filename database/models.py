@@ -0,0 +1,99 @@
+from collections import namedtuple
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, Index
+from sqlalchemy.orm import declarative_base, relationship, backref
+
+# Define the base class for declarative models, shared by every module that touches the database
+Base = declarative_base()
+
+# Define the Video model that corresponds to the "videos" table in the database
+class Video(Base):
+    __tablename__ = 'videos'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    file_name = Column(String, nullable=False, unique=True, index=True)
+    name = Column(String)
+    artist = Column(String, index=True)
+    title = Column(String)
+    category = Column(String, index=True)
+    chord = Column(String)
+    status = Column(String, default="unread", index=True)  # Add default status column
+    # File system state recorded by the library indexer
+    directory = Column(String, index=True)
+    file_size = Column(Integer)
+    file_mtime = Column(Integer)  # st_mtime_ns
+    inode = Column(Integer)
+    # Media properties read once by ffprobe; probed_size/probed_mtime record which file state they describe
+    duration = Column(Float, index=True)  # Seconds
+    width = Column(Integer)
+    height = Column(Integer, index=True)
+    video_codec = Column(String)
+    bit_rate = Column(Integer)
+    probed_size = Column(Integer)
+    probed_mtime = Column(Integer)
+    # Content identity for duplicate detection: a sampled-block fingerprint, and the full hash once
+    # a fingerprint collides; fingerprint_size/fingerprint_mtime record which file state they describe
+    fingerprint = Column(String, index=True)
+    content_hash = Column(String, index=True)
+    fingerprint_size = Column(Integer)
+    fingerprint_mtime = Column(Integer)
+
+    def __repr__(self):
+        return f"<Video(id={self.id}, name={self.name}, artist={self.artist}, status={self.status})>"
+
+# Read-only view of a video row for display paths: built from Core rows, with no ORM instrumentation
+class VideoRecord(namedtuple(
+    "VideoRecord",
+    "id file_name name artist title category chord status directory file_size file_mtime duration width height",
+)):
+    __slots__ = ()
+
+    @classmethod
+    def columns(cls):
+        """The videos table columns a VideoRecord is built from, in field order."""
+        return [Video.__table__.c[field] for field in cls._fields]
+
+# Define the Directory model that records the last seen mtime of every indexed folder
+class Directory(Base):
+    __tablename__ = 'directories'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    path = Column(String, nullable=False, unique=True)
+    parent = Column(String, index=True)
+    mtime = Column(Integer)  # st_mtime_ns
+
+    def __repr__(self):
+        return f"<Directory(path={self.path}, mtime={self.mtime})>"
+
+# Define the Favorites model that stores favorite videos (using a relation to the Video model)
+class Favorite(Base):
+    __tablename__ = 'favorites'
+    # A video is either a favorite or not; upgrade_schema merges old duplicates before creating this
+    __table_args__ = (Index("ux_favorites_video_id", "video_id", unique=True),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    video_id = Column(Integer, ForeignKey('videos.id', ondelete="CASCADE"), nullable=False)
+    # Deleting a video through the ORM deletes its favorite too (SQLite does not enforce ON DELETE by default)
+    video = relationship("Video", backref=backref("favorites", cascade="all, delete-orphan"))
+
+    def __repr__(self):
+        return f"<Favorite(id={self.id}, video_id={self.video_id})>"
+
+# Define the WatchProgress model: one compact row per video with its last position and completion time
+class WatchProgress(Base):
+    __tablename__ = 'watch_progress'
+    __table_args__ = (
+        # "Continue watching": unfinished videos, most recently watched first
+        Index("ix_watch_progress_resume", "completed_at", "updated_at"),
+        # "Nearly complete": unfinished videos by how much has been watched
+        Index("ix_watch_progress_percent", "completed_at", "percent"),
+    )
+
+    video_id = Column(Integer, ForeignKey('videos.id', ondelete="CASCADE"), primary_key=True)
+    position = Column(Float, nullable=False, default=0.0)  # Seconds
+    duration = Column(Float)  # Seconds, when known
+    percent = Column(Float)  # 0-100, when the duration is known
+    updated_at = Column(Float, nullable=False)  # Unix time of the last recorded position
+    completed_at = Column(Float)  # Unix time the video was last watched to the end
+
+    def __repr__(self):
+        return f"<WatchProgress(video_id={self.video_id}, position={self.position}, percent={self.percent})>"
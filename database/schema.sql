@@ -5,5 +5,63 @@ CREATE TABLE IF NOT EXISTS videos (
     artist TEXT,
     title TEXT,
     category TEXT,  
-    chord TEXT
+    chord TEXT,
+    status TEXT DEFAULT 'unread',
+    directory TEXT,
+    file_size INTEGER,
+    file_mtime INTEGER,
+    inode INTEGER,
+    duration REAL,
+    width INTEGER,
+    height INTEGER,
+    video_codec TEXT,
+    bit_rate INTEGER,
+    probed_size INTEGER,
+    probed_mtime INTEGER,
+    fingerprint TEXT,
+    content_hash TEXT,
+    fingerprint_size INTEGER,
+    fingerprint_mtime INTEGER
 );
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_videos_file_name ON videos (file_name);
+CREATE INDEX IF NOT EXISTS ix_videos_artist ON videos (artist);
+CREATE INDEX IF NOT EXISTS ix_videos_category ON videos (category);
+CREATE INDEX IF NOT EXISTS ix_videos_status ON videos (status);
+CREATE INDEX IF NOT EXISTS ix_videos_directory ON videos (directory);
+CREATE INDEX IF NOT EXISTS ix_videos_duration ON videos (duration);
+CREATE INDEX IF NOT EXISTS ix_videos_height ON videos (height);
+CREATE INDEX IF NOT EXISTS ix_videos_fingerprint ON videos (fingerprint);
+CREATE INDEX IF NOT EXISTS ix_videos_content_hash ON videos (content_hash);
+
+CREATE TABLE IF NOT EXISTS directories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    parent TEXT,
+    mtime INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS ix_directories_parent ON directories (parent);
+
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id INTEGER NOT NULL REFERENCES videos (id) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_favorites_video_id ON favorites (video_id);
+
+CREATE TABLE IF NOT EXISTS watch_progress (
+    video_id INTEGER PRIMARY KEY REFERENCES videos (id) ON DELETE CASCADE,
+    position FLOAT NOT NULL DEFAULT 0,
+    duration FLOAT,
+    percent FLOAT,
+    updated_at FLOAT NOT NULL,
+    completed_at FLOAT
+);
+
+CREATE INDEX IF NOT EXISTS ix_watch_progress_resume ON watch_progress (completed_at, updated_at);
+CREATE INDEX IF NOT EXISTS ix_watch_progress_percent ON watch_progress (completed_at, percent);
+
+-- The videos_fts full-text search table, the facet_counts summary table and their sync
+-- triggers are created by database/migrations.py (ensure_search_index, ensure_facet_counts),
+-- since trigger bodies contain semicolons.
@@ -0,0 +1,103 @@
+import threading
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
+from database.models import Base
+from database.migrations import upgrade_schema, ensure_search_index, ensure_facet_counts
+
+# Database used when a caller does not name one
+DEFAULT_DB_URL = 'sqlite:///music_tracker.db'
+
+# Pragmas applied to every new SQLite connection
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",        # Readers no longer block the writer
+    "PRAGMA synchronous=NORMAL",      # Safe with WAL, avoids an fsync per commit
+    "PRAGMA mmap_size=268435456",     # Serve reads from a 256 MB memory map
+)
+
+_engines = {}
+_session_factories = {}
+_scoped_sessions = {}
+_lock = threading.Lock()
+
+
+def configure_sqlite_engine(engine):
+    """Apply SQLITE_PRAGMAS whenever the engine opens a new SQLite connection."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def get_engine(db_url=DEFAULT_DB_URL, echo=False):
+    """Return the process-wide pooled engine for a database, creating and upgrading its schema once.
+
+    Statement logging is off unless some caller asks for it with `echo=True`.
+    """
+    with _lock:
+        engine = _engines.get(db_url)
+        if engine is None:
+            engine = create_engine(db_url, echo=echo)
+            configure_sqlite_engine(engine)
+            Base.metadata.create_all(engine)
+            # Bring tables created by older versions up to date with the models
+            upgrade_schema(engine, Base.metadata)
+            ensure_search_index(engine)
+            ensure_facet_counts(engine)
+            _engines[db_url] = engine
+        elif echo:
+            engine.echo = True
+        return engine
+
+
+def get_session_factory(db_url=DEFAULT_DB_URL):
+    """Return the shared sessionmaker for a database.
+
+    Objects stay readable after their session commits or closes (expire_on_commit=False), so
+    short-lived sessions can hand rows to the UI without a refresh query per object.
+    """
+    engine = get_engine(db_url)
+    with _lock:
+        if db_url not in _session_factories:
+            _session_factories[db_url] = sessionmaker(bind=engine, expire_on_commit=False)
+        return _session_factories[db_url]
+
+
+def get_scoped_session(db_url=DEFAULT_DB_URL):
+    """Return a thread-local session registry: every thread (Tk or scheduler worker) gets its own session."""
+    factory = get_session_factory(db_url)
+    with _lock:
+        if db_url not in _scoped_sessions:
+            _scoped_sessions[db_url] = scoped_session(factory)
+        return _scoped_sessions[db_url]
+
+
+@contextmanager
+def session_scope(db_url=DEFAULT_DB_URL):
+    """Run one unit of work in a fresh session: commit on success, roll back on error, always close."""
+    session = get_session_factory(db_url)()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def dispose_engines():
+    """Close every pooled connection, e.g. on application exit."""
+    with _lock:
+        for registry in _scoped_sessions.values():
+            registry.remove()
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _session_factories.clear()
+        _scoped_sessions.clear()
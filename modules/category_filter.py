@@ -1,9 +1,58 @@
+# Values listed per facet in the sidebar
+SIDEBAR_LIMIT = 25
+
 def filter_videos_by_category(videos, selected_category):
     """Filter videos based on the selected category."""
     if selected_category == "All" or not selected_category:
         return videos  # If "All" or no category selected, return all videos
     
-    # Filter videos based on category (assuming the category is at index 5 in the database)
-    filtered_videos = [video for video in videos if video[5] == selected_category]  # 5 is the index for category
+    # Filter videos based on their category attribute
+    filtered_videos = [video for video in videos if video.category == selected_category]
     
     return filtered_videos
+
+
+class FacetSidebar:
+    """A sidebar listing categories (and optionally artists/chords) with their video counts.
+
+    All counts come from the facet_counts summary table in one query, so building or refreshing the
+    sidebar costs the same however large the library is. Clicking an entry calls
+    `on_select(facet, value)`; the "All" entry passes value "All".
+    """
+
+    def __init__(self, parent, db, on_select, facets=("category",), limit=SIDEBAR_LIMIT):
+        self.db = db
+        self.on_select = on_select
+        self.facets = facets
+        self.limit = limit
+        import customtkinter as ctk
+
+        self.frame = ctk.CTkScrollableFrame(parent, width=180)
+        self.frame.pack(side="left", fill="y", padx=5, pady=5)
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the entries from the current counts."""
+        import customtkinter as ctk
+        from database.migrations import TOTAL_FACET
+
+        for widget in self.frame.winfo_children():
+            widget.destroy()
+
+        counts = self.db.fetch_facets(tuple(self.facets) + (TOTAL_FACET,), self.limit)
+        total = sum(count for _, count in counts.get(TOTAL_FACET, []))
+        for facet in self.facets:
+            ctk.CTkLabel(self.frame, text=facet.capitalize(), anchor="w").pack(fill="x", pady=(10, 2))
+            if facet == "category":
+                self._add_entry(facet, "All", total)
+            for value, count in counts.get(facet, []):
+                self._add_entry(facet, value, count)
+
+    def _add_entry(self, facet, value, count):
+        import customtkinter as ctk
+
+        button = ctk.CTkButton(
+            self.frame, text=f"{value} ({count})", anchor="w",
+            command=lambda: self.on_select(facet, value),
+        )
+        button.pack(fill="x", pady=1)
@@ -0,0 +1,261 @@
+import hashlib
+import mmap
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, or_, select
+
+from database.database import Video, filter_video_query
+from modules.instrumentation import timed
+from modules.thumbnails import thumbnail_key
+
+# Blocks hashed per file for the sampled fingerprint: 16 x 128 KiB = 2 MiB read per large file
+SAMPLE_BLOCK_SIZE = 128 * 1024
+SAMPLE_BLOCKS = 16
+
+# Chunk size for the full hash, which only runs when fingerprints collide
+FULL_HASH_CHUNK = 1024 * 1024
+
+# Hashing is I/O bound, so threads are enough
+DEDUP_WORKERS = min(8, os.cpu_count() or 2)
+
+# Probe results copied from one copy of a video to its duplicates
+SHARED_PROBE_COLUMNS = ("duration", "width", "height", "video_codec", "bit_rate")
+
+DuplicateGroup = namedtuple("DuplicateGroup", "content_hash file_size paths")
+
+
+def _new_digest(size):
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(size.to_bytes(8, "little"))
+    return digest
+
+
+def sampled_fingerprint(path):
+    """Fingerprint a file from its size and SAMPLE_BLOCKS evenly spaced blocks read through mmap.
+
+    Returns (fingerprint, complete). Files no larger than the sample are hashed whole, in which case
+    `complete` is True and the fingerprint equals full_hash(path).
+    """
+    with open(path, "rb") as video_file:
+        size = os.fstat(video_file.fileno()).st_size
+        digest = _new_digest(size)
+        if size == 0:
+            return digest.hexdigest(), True
+        with mmap.mmap(video_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if size <= SAMPLE_BLOCK_SIZE * SAMPLE_BLOCKS:
+                digest.update(mapped)
+                return digest.hexdigest(), True
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_RANDOM)  # Skip read-ahead: only the sampled pages are read
+            step = (size - SAMPLE_BLOCK_SIZE) // (SAMPLE_BLOCKS - 1)
+            for i in range(SAMPLE_BLOCKS):
+                offset = i * step
+                digest.update(mapped[offset:offset + SAMPLE_BLOCK_SIZE])
+    return digest.hexdigest(), False
+
+
+def full_hash(path):
+    """Hash a whole file; comparable with the fingerprints of files small enough to be hashed whole."""
+    with open(path, "rb") as video_file:
+        digest = _new_digest(os.fstat(video_file.fileno()).st_size)
+        buffer = bytearray(FULL_HASH_CHUNK)
+        view = memoryview(buffer)
+        while True:
+            read = video_file.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+@timed("dedup.fingerprint")
+def _fingerprint_row(row):
+    video_id, file_name, file_size, file_mtime = row
+    try:
+        fingerprint, complete = sampled_fingerprint(file_name)
+    except (OSError, ValueError) as e:
+        print(f"Error fingerprinting {file_name}: {e}")
+        fingerprint, complete = None, False
+    return video_id, {
+        "fingerprint": fingerprint,
+        "content_hash": fingerprint if complete else None,
+        "fingerprint_size": file_size,
+        "fingerprint_mtime": file_mtime,
+    }
+
+
+@timed("dedup.full_hash")
+def _hash_row(row):
+    video_id, file_name = row
+    try:
+        return video_id, {"content_hash": full_hash(file_name)}
+    except OSError as e:
+        print(f"Error hashing {file_name}: {e}")
+        return video_id, {}
+
+
+class DedupEngine:
+    """Find videos with identical content and let duplicates share probe data and thumbnails.
+
+    Every file gets a cheap sampled fingerprint, cached on its row together with the size and mtime
+    it describes, so unchanged files are never read again. Only files whose fingerprints collide
+    are hashed in full, and content_hash is what duplicates are grouped by.
+
+    Files are hashed on a private pool of `max_workers` threads, or on the workers of `scheduler`
+    (a TaskScheduler) when one is given, as the app does.
+    """
+
+    def __init__(self, db, max_workers=DEDUP_WORKERS, scheduler=None):
+        self.db = db
+        self.max_workers = max_workers
+        self.scheduler = scheduler
+
+    @timed("dedup")
+    def run(self, directory=None, thumbnail_engine=None, progress=None):
+        """Fingerprint, confirm collisions, share probe data (and thumbnails) and return the duplicate groups."""
+        start = time.perf_counter()
+        fingerprinted = self.fingerprint(directory, progress)
+        hashed = self.resolve_collisions()
+        groups = self.duplicate_groups(directory)
+        shared = self.share_probe_data(groups)
+        if thumbnail_engine is not None:
+            shared += self.share_thumbnails(groups, thumbnail_engine)
+        print(
+            f"Fingerprinted {fingerprinted} and fully hashed {hashed} videos in {time.perf_counter() - start:.2f}s; "
+            f"{len(groups)} duplicate groups, {shared} results shared."
+        )
+        return groups
+
+    def fingerprint(self, directory=None, progress=None):
+        """Fingerprint videos that are new or changed since they were last fingerprinted; returns how many.
+
+        `progress(done, total)` is called after each file.
+        """
+        with self.db.session_scope() as session:
+            query = session.query(Video.id, Video.file_name, Video.file_size, Video.file_mtime).filter(
+                Video.file_size.isnot(None),
+                or_(
+                    Video.fingerprint_size.is_(None),
+                    Video.fingerprint_size != Video.file_size,
+                    Video.fingerprint_mtime != Video.file_mtime,
+                ),
+            )
+            if directory:
+                query = filter_video_query(query, directory=directory)
+            pending = [tuple(row) for row in query]
+        if pending:
+            results = self._map(_fingerprint_row, pending, "fingerprint")
+            if progress:
+                results = _reporting(results, len(pending), progress)
+            self.db.update_videos(results)
+        return len(pending)
+
+    def resolve_collisions(self):
+        """Fully hash the videos whose fingerprint is shared with another video; returns how many."""
+        colliding = (
+            select(Video.fingerprint)
+            .where(Video.fingerprint.isnot(None))
+            .group_by(Video.fingerprint)
+            .having(func.count() > 1)
+        )
+        with self.db.engine.connect() as connection:
+            pending = connection.execute(
+                select(Video.id, Video.file_name)
+                .where(Video.fingerprint.in_(colliding), Video.content_hash.is_(None))
+            ).all()
+        if pending:
+            self.db.update_videos(self._map(_hash_row, [tuple(row) for row in pending], "full-hash"))
+        return len(pending)
+
+    def duplicate_groups(self, directory=None):
+        """Return a DuplicateGroup for every content hash shared by more than one video."""
+        query = select(Video.content_hash, Video.file_size, Video.file_name).where(
+            Video.content_hash.in_(
+                select(Video.content_hash)
+                .where(Video.content_hash.isnot(None))
+                .group_by(Video.content_hash)
+                .having(func.count() > 1)
+            )
+        )
+        if directory:
+            query = filter_video_query(query, directory=directory)
+        groups = {}
+        with self.db.engine.connect() as connection:
+            for content_hash, file_size, file_name in connection.execute(query.order_by(Video.content_hash, Video.id)):
+                groups.setdefault(content_hash, (file_size, []))[1].append(file_name)
+        return [
+            DuplicateGroup(content_hash, file_size, paths)
+            for content_hash, (file_size, paths) in groups.items()
+            if len(paths) > 1
+        ]
+
+    def share_probe_data(self, groups):
+        """Copy probe results from a probed copy to unprobed duplicates, so they are never probed; returns how many."""
+        columns = [Video.id, Video.file_name, Video.file_size, Video.file_mtime, Video.probed_size, Video.probed_mtime]
+        columns += [getattr(Video, column) for column in SHARED_PROBE_COLUMNS]
+        updates = []
+        with self.db.engine.connect() as connection:
+            for group in groups:
+                rows = connection.execute(select(*columns).where(Video.file_name.in_(group.paths))).all()
+                probed = [row for row in rows if _is_probed(row)]
+                if not probed:
+                    continue
+                source = {column: getattr(probed[0], column) for column in SHARED_PROBE_COLUMNS}
+                for row in rows:
+                    if not _is_probed(row):
+                        updates.append((row.id, dict(source, probed_size=row.file_size, probed_mtime=row.file_mtime)))
+        if updates:
+            self.db.update_videos(updates)
+        return len(updates)
+
+    def share_thumbnails(self, groups, thumbnail_engine):
+        """Copy an existing thumbnail to duplicates that have none yet; returns how many were copied."""
+        store = thumbnail_engine.store
+        copied = 0
+        for group in groups:
+            keys = {}
+            for path in group.paths:
+                try:
+                    keys[path] = thumbnail_key(path)
+                except OSError:
+                    continue
+            source = next((key for key in keys.values() if key in store), None)
+            if source is None:
+                continue
+            pixels = store.get(source)
+            for path, key in keys.items():
+                if key not in store:
+                    store.put(key, os.path.abspath(path), pixels)
+                    copied += 1
+        return copied
+
+    def report(self, groups):
+        """Print the duplicate groups and the space they waste."""
+        wasted = sum((group.file_size or 0) * (len(group.paths) - 1) for group in groups)
+        for group in groups:
+            print(f"{len(group.paths)} copies ({(group.file_size or 0) / 2**20:.1f} MB each):")
+            for path in group.paths:
+                print(f"    {path}")
+        print(f"{len(groups)} duplicate groups, {wasted / 2**30:.2f} GB reclaimable.")
+        return wasted
+
+    def _map(self, fn, rows, thread_name_prefix):
+        """Yield fn(row) for every row, in order, on the scheduler's workers or a private pool."""
+        if self.scheduler is not None:
+            yield from self.scheduler.map(fn, rows)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=thread_name_prefix) as executor:
+            yield from executor.map(fn, rows)
+
+
+def _reporting(results, total, progress):
+    for done, result in enumerate(results, 1):
+        yield result
+        progress(done, total)
+
+
+def _is_probed(row):
+    return row.probed_size == row.file_size and row.probed_mtime == row.file_mtime
@@ -1,89 +1,109 @@
-import os
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy import insert, delete
 from sqlalchemy.sql import text
+from database.database import BULK_BATCH_SIZE
+from database.util import chunks
+from database.models import Video, Favorite
+from database.session import DEFAULT_DB_URL, get_engine, get_session_factory, get_scoped_session, session_scope
 
-# Define the paths for schema and database files
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Path to database folder
-DB_PATH = os.path.join(BASE_DIR, "music_tracker.db")   # Path to SQLite database
-
-# Define the base class for declarative models
-Base = declarative_base()
-
-# Define the Video model that corresponds to the "videos" table in the database
-class Video(Base):
-    __tablename__ = 'videos'
-
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    file_name = Column(String, nullable=False)
-    name = Column(String)
-    artist = Column(String)
-    title = Column(String)
-    category = Column(String)
-    chord = Column(String)
-    status = Column(String, default="unread")  # Add default status column
-
-    def __repr__(self):
-        return f"<Video(id={self.id}, name={self.name}, artist={self.artist}, status={self.status})>"
+class FavoritesDatabase:
+    """Favorite videos, with an in-memory set of favorite ids for O(1) membership checks.
 
-# Define the Favorites model that stores favorite videos (using a relation to the Video model)
-class Favorite(Base):
-    __tablename__ = 'favorites'
+    The set is loaded with one query on first use and kept in step with every write made through
+    this object, so cards can ask is_favorite() while rendering without touching the database.
+    """
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    video_id = Column(Integer, ForeignKey('videos.id', ondelete="CASCADE"))
-    video = relationship("Video", backref="favorites")  # Create relationship with Video table
+    def __init__(self, db_url=DEFAULT_DB_URL, echo=False):
+        """Attach to the shared engine for `db_url` (the same one Database uses)."""
+        self.db_url = db_url
+        self.engine = get_engine(db_url, echo=echo)
+        self.Session = get_session_factory(db_url)
+        self.session = get_scoped_session(db_url)
+        self._favorite_ids = None
 
-    def __repr__(self):
-        return f"<Favorite(id={self.id}, video_id={self.video_id})>"
+    def favorite_ids(self):
+        """Return the ids of all favorite videos as a frozenset."""
+        return frozenset(self._ids())
 
-class FavoritesDatabase:
-    def __init__(self, db_url='sqlite:///music_tracker.db'):
-        """Initialize the database and ensure schema is applied."""
-        self.engine = create_engine(db_url, echo=True)
-        Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
-        self.session = self.Session()
+    def is_favorite(self, video_id):
+        """Check membership without a database round trip."""
+        return video_id in self._ids()
 
     def add_to_favorites(self, video_id):
         """Add a video to the favorites table."""
-        try:
-            favorite = Favorite(video_id=video_id)
-            self.session.add(favorite)
-            self.session.commit()
+        if self.add_many([video_id]):
             print(f"Video with ID {video_id} added to favorites.")
-        except Exception as e:
-            print(f"Error adding video to favorites: {e}")
 
     def remove_from_favorites(self, video_id):
         """Remove a video from the favorites table."""
+        if self.remove_many([video_id]):
+            print(f"Video with ID {video_id} removed from favorites.")
+        else:
+            print(f"Video with ID {video_id} not found in favorites.")
+
+    def toggle_favorite(self, video_id):
+        """Flip a video's favorite state; returns True if it is now a favorite."""
+        if self.is_favorite(video_id):
+            self.remove_many([video_id])
+            return False
+        self.add_many([video_id])
+        return True
+
+    def add_many(self, video_ids, batch_size=BULK_BATCH_SIZE):
+        """Add many videos in one transaction; ids that are already favorites are skipped. Returns the number added."""
+        new_ids = [video_id for video_id in dict.fromkeys(video_ids) if video_id not in self._ids()]
+        if not new_ids:
+            return 0
         try:
-            favorite = self.session.query(Favorite).filter_by(video_id=video_id).first()
-            if favorite:
-                self.session.delete(favorite)
-                self.session.commit()
-                print(f"Video with ID {video_id} removed from favorites.")
-            else:
-                print(f"Video with ID {video_id} not found in favorites.")
+            with self.engine.begin() as connection:
+                statement = insert(Favorite.__table__).prefix_with("OR IGNORE")
+                for chunk in chunks(new_ids, batch_size):
+                    connection.execute(statement, [{"video_id": video_id} for video_id in chunk])
         except Exception as e:
-            print(f"Error removing video from favorites: {e}")
+            print(f"Error adding videos to favorites: {e}")
+            return 0
+        self._favorite_ids.update(new_ids)
+        return len(new_ids)
+
+    def remove_many(self, video_ids, batch_size=BULK_BATCH_SIZE):
+        """Remove many videos in one transaction. Returns the number removed."""
+        old_ids = [video_id for video_id in dict.fromkeys(video_ids) if video_id in self._ids()]
+        if not old_ids:
+            return 0
+        try:
+            with self.engine.begin() as connection:
+                # Stay well below SQLite's bound-parameter limit
+                for chunk in chunks(old_ids, min(batch_size, 500)):
+                    connection.execute(delete(Favorite.__table__).where(Favorite.video_id.in_(chunk)))
+        except Exception as e:
+            print(f"Error removing videos from favorites: {e}")
+            return 0
+        self._favorite_ids.difference_update(old_ids)
+        return len(old_ids)
 
     def get_favorite_videos(self):
-        """Retrieve all favorite videos."""
+        """Retrieve all favorite videos with a single joined query, in the order they were added."""
         try:
-            favorites = self.session.query(Favorite).all()
-            favorite_videos = [favorite.video for favorite in favorites]
-            return favorite_videos
+            with session_scope(self.db_url) as session:
+                return (
+                    session.query(Video)
+                    .join(Favorite, Favorite.video_id == Video.id)
+                    .order_by(Favorite.id)
+                    .all()
+                )
         except Exception as e:
             print(f"Error fetching favorite videos: {e}")
             return []
 
+    def _ids(self):
+        if self._favorite_ids is None:
+            with self.engine.connect() as connection:
+                self._favorite_ids = set(connection.execute(text("SELECT video_id FROM favorites")).scalars())
+        return self._favorite_ids
+
     def close(self):
-        """Close the database session."""
-        if self.session:
-            self.session.close()
-            print("Favorites database session closed.")
+        """Release this thread's session; the shared engine stays up."""
+        self.session.remove()
+        print("Favorites database session closed.")
 
 # Example Usage
 if __name__ == "__main__":
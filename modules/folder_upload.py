@@ -75,27 +75,34 @@
         
 #         return None
 
-import cv2
 import os
-import customtkinter as ctk
 from tkinter import filedialog
-from PIL import Image, ImageTk
+from modules.task_scheduler import get_scheduler, PRIORITY_HIGH, PRIORITY_LOW
+from modules.frame_capture import get_grabber, strip_timestamps, FRAME_WIDTH, FRAME_HEIGHT, THUMBNAIL_TIMESTAMP
+from modules.media_probe import probe_file
+from modules.instrumentation import timed
 
 class VideoUploader:
-    def __init__(self, video_frame, selected_video):
+    def __init__(self, video_frame, selected_video, db=None):
         self.video_frame = video_frame
         self.selected_video = selected_video
         self.video_list = []
+        if db is None:
+            from database.database import Database
+            db = Database()
+        from modules.library_index import LibraryIndexer
+
+        self.db = db
+        self.indexer = LibraryIndexer(self.db)
+        self.scheduler = get_scheduler(video_frame)
 
     def upload_folder(self):
         """Open folder selection dialog and process video files."""
         folder_path = filedialog.askdirectory(title="Select a Folder")
         if folder_path:
-            self.video_list = self.scan_folder_for_videos(folder_path)
-            if self.video_list:
-                self.update_video_list()
-            else:
-                self.display_placeholder("No videos found in the selected folder.")
+            self.display_placeholder("Scanning folder...")
+            self.scheduler.submit(self.scan_folder_for_videos, folder_path, priority=PRIORITY_LOW,
+                                  callback=self.on_scan_complete)
         else:
             print("No folder selected.")
 
@@ -113,15 +120,22 @@ class VideoUploader:
 
     def scan_folder_for_videos(self, folder_path):
         """Scan the selected folder for video files."""
-        video_extensions = ('.mp4', '.avi', '.mov', '.mkv')  # Add other formats as needed
-        return [
-            os.path.join(folder_path, f) 
-            for f in os.listdir(folder_path) 
-            if f.lower().endswith(video_extensions)
-        ]
+        return self.indexer.list_videos(folder_path)
 
+    def on_scan_complete(self, video_list):
+        """Show the scanned videos (runs on the Tk thread)."""
+        self.video_list = video_list
+        if self.video_list:
+            self.update_video_list()
+        else:
+            self.display_placeholder("No videos found in the selected folder.")
+
+    @timed("widget.video_list")
     def update_video_list(self):
         """Update the video list display."""
+        # GUI and imaging packages are imported on first use so the window can paint sooner
+        import customtkinter as ctk
+
         for widget in self.video_frame.winfo_children():
             widget.destroy()  # Clear the video frame
 
@@ -146,8 +160,20 @@ class VideoUploader:
         print(f"Selected video: {video}")
 
     def display_thumbnail(self, video_path):
-        """Capture and display a thumbnail from the selected video."""
-        thumbnail = self.capture_thumbnail(video_path)
+        """Capture and display a thumbnail and a preview strip from the selected video."""
+        # Decoding runs on a worker; the PhotoImage is built on the Tk thread
+        self.scheduler.submit(self.capture_thumbnail, video_path, priority=PRIORITY_HIGH,
+                              callback=self.show_thumbnail)
+        video = self.db.get_video_by_filename(video_path)
+        duration = video.duration if video else None
+        self.scheduler.submit(self.capture_preview_strip, video_path, duration, priority=PRIORITY_HIGH,
+                              callback=self.show_preview_strip)
+
+    def show_thumbnail(self, thumbnail):
+        """Display a captured thumbnail (runs on the Tk thread)."""
+        import customtkinter as ctk
+        from PIL import ImageTk
+
         if thumbnail:
             img = ImageTk.PhotoImage(thumbnail)
             label = ctk.CTkLabel(self.video_frame, image=img, text="")
@@ -156,14 +182,54 @@ class VideoUploader:
         else:
             self.display_placeholder("Unable to generate thumbnail.")
 
+    def show_preview_strip(self, strip):
+        """Display a captured preview strip under the thumbnail (runs on the Tk thread)."""
+        import customtkinter as ctk
+        from PIL import ImageTk
+
+        if strip:
+            img = ImageTk.PhotoImage(strip)
+            label = ctk.CTkLabel(self.video_frame, image=img, text="")
+            label.image = img  # Keep a reference!
+            label.pack(pady=(0, 10))
+
     def capture_thumbnail(self, video_path):
-        """Capture a frame from the specified video file."""
+        """Capture a downscaled keyframe from the specified video file."""
+        grabber = get_grabber("thumbnail")
+        # Videos shorter than the usual position fall back to their first keyframe
+        thumbnail = grabber.grab_image(video_path, [THUMBNAIL_TIMESTAMP]) or grabber.grab_image(video_path, [0])
+        if thumbnail is None:
+            thumbnail = self.capture_thumbnail_cv2(video_path)
+        return thumbnail
+
+    def capture_preview_strip(self, video_path, duration=None):
+        """Capture evenly spaced keyframes side by side; `duration` (seconds) saves an ffprobe call."""
+        if not duration:
+            try:
+                duration = probe_file(video_path).get("duration")
+            except (ImportError, OSError) as e:
+                print(f"Error probing {video_path}: {e}")
+                return None
+        if not duration:
+            return None
+        return get_grabber("strip").grab_image(video_path, strip_timestamps(duration))
+
+    def capture_thumbnail_cv2(self, video_path):
+        """Fallback capture through OpenCV when the ffmpeg binary is unavailable."""
+        import cv2
+        from PIL import Image
+
         cap = cv2.VideoCapture(video_path)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 100)  # Capture frame at 100th position
+        cap.set(cv2.CAP_PROP_POS_MSEC, THUMBNAIL_TIMESTAMP * 1000)
         ret, frame = cap.read()
         cap.release()
 
         if ret:
+            # Shrink before converting so the colour conversion touches only the small frame
+            height, width = frame.shape[:2]
+            scale = min(FRAME_WIDTH / width, FRAME_HEIGHT / height)
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
             frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # Convert BGR to RGB
             return Image.fromarray(frame)
 
@@ -171,6 +237,8 @@ class VideoUploader:
 
     def display_placeholder(self, message):
         """Display a placeholder message in the video frame."""
+        import customtkinter as ctk
+
         for widget in self.video_frame.winfo_children():
             widget.destroy()  # Clear the video frame
         placeholder_label = ctk.CTkLabel(self.video_frame, text=message)
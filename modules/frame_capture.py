@@ -0,0 +1,102 @@
+import subprocess
+import threading
+
+# Size of a single captured frame, matching the grid thumbnails
+FRAME_WIDTH = 200
+FRAME_HEIGHT = 150
+
+# Size of each frame in a preview strip
+STRIP_FRAME_WIDTH = 100
+STRIP_FRAME_HEIGHT = 75
+STRIP_FRAMES = 8
+
+# Where in the video (seconds) every single-frame thumbnail is taken from
+THUMBNAIL_TIMESTAMP = 1.0
+
+
+class KeyframeGrabber:
+    """Capture downscaled keyframes with ffmpeg straight into a preallocated RGB buffer.
+
+    Each timestamp becomes an input seek (`-ss` before `-i`) with `-skip_frame nokey`, so ffmpeg
+    jumps to the nearest keyframe and decodes only that frame instead of everything since the
+    previous keyframe. Frames are scaled inside ffmpeg, stacked side by side and read with
+    `readinto`, so no full-resolution frame ever reaches Python. The buffer is reused between
+    calls; use one grabber per thread (see get_grabber).
+    """
+
+    def __init__(self, frame_width=FRAME_WIDTH, frame_height=FRAME_HEIGHT, max_frames=STRIP_FRAMES):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.max_frames = max_frames
+        self.buffer = bytearray(frame_width * frame_height * 3 * max_frames)
+
+    def grab(self, video_path, timestamps):
+        """Capture one frame per timestamp as a strip; returns a memoryview into the reused buffer, or None."""
+        timestamps = list(timestamps)[:self.max_frames]
+        if not timestamps:
+            return None
+        w, h = self.frame_width, self.frame_height
+        size = w * h * 3 * len(timestamps)
+
+        command = ["ffmpeg", "-v", "error", "-nostdin"]
+        for timestamp in timestamps:
+            command += ["-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{timestamp:.3f}", "-i", video_path]
+        scaled = ";".join(
+            f"[{i}:v:0]scale={w}:{h}:force_original_aspect_ratio=decrease,"
+            f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1[f{i}]"
+            for i in range(len(timestamps))
+        )
+        if len(timestamps) > 1:
+            labels = "".join(f"[f{i}]" for i in range(len(timestamps)))
+            graph = f"{scaled};{labels}hstack=inputs={len(timestamps)}[out]"
+        else:
+            graph = scaled.replace("[f0]", "[out]")
+        command += ["-filter_complex", graph, "-map", "[out]", "-frames:v", "1",
+                    "-pix_fmt", "rgb24", "-f", "rawvideo", "pipe:1"]
+
+        view = memoryview(self.buffer)[:size]
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print(f"Error starting ffmpeg: {e}")
+            return None
+        filled = 0
+        with process:
+            while filled < size:
+                read = process.stdout.readinto(view[filled:])
+                if not read:
+                    break
+                filled += read
+        return view if filled == size else None
+
+    def grab_image(self, video_path, timestamps):
+        """Like grab(), but returns a PIL image that owns its pixels (safe after the buffer is reused)."""
+        timestamps = list(timestamps)[:self.max_frames]
+        view = self.grab(video_path, timestamps)
+        if view is None:
+            return None
+        from PIL import Image
+
+        size = (self.frame_width * len(timestamps), self.frame_height)
+        return Image.frombuffer("RGB", size, view, "raw", "RGB", 0, 1).copy()
+
+
+def strip_timestamps(duration, frames=STRIP_FRAMES):
+    """Evenly spaced timestamps across a video, avoiding the very start and end."""
+    return [duration * (i + 0.5) / frames for i in range(frames)]
+
+
+_local = threading.local()
+
+
+def get_grabber(kind="thumbnail"):
+    """Return this thread's grabber for single thumbnails ("thumbnail") or preview strips ("strip")."""
+    grabbers = getattr(_local, "grabbers", None)
+    if grabbers is None:
+        grabbers = _local.grabbers = {}
+    if kind not in grabbers:
+        if kind == "strip":
+            grabbers[kind] = KeyframeGrabber(STRIP_FRAME_WIDTH, STRIP_FRAME_HEIGHT, STRIP_FRAMES)
+        else:
+            grabbers[kind] = KeyframeGrabber(FRAME_WIDTH, FRAME_HEIGHT, 1)
+    return grabbers[kind]
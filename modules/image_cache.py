@@ -0,0 +1,84 @@
+from collections import OrderedDict
+
+# Memory budget for decoded thumbnail images
+IMAGE_CACHE_MB = 64
+
+# Tk keeps photo images as 32-bit pixels
+BYTES_PER_PIXEL = 4
+
+
+class ImageCache:
+    """Least-recently-used cache of decoded PhotoImages, bounded by an estimate of their memory.
+
+    Keys should identify both the video and the version of its thumbnail, e.g.
+    (video id, file size, file mtime), so a changed file never shows a stale image. Evicting an image
+    that a label still displays is safe: the label keeps its own reference. Only used from the Tk
+    thread, so there is no locking.
+    """
+
+    def __init__(self, max_mb=IMAGE_CACHE_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._images = OrderedDict()  # key -> (image, size in bytes), least recently used first
+
+    def __len__(self):
+        return len(self._images)
+
+    def get(self, key):
+        """Return the cached image for a key, or None."""
+        entry = self._images.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._images.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, image):
+        """Cache an image, evicting the least recently used ones until it fits the budget."""
+        size = image.width() * image.height() * BYTES_PER_PIXEL
+        if size > self.max_bytes:
+            return
+        self.discard(key)
+        self._images[key] = (image, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._images.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def discard(self, key):
+        entry = self._images.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def clear(self):
+        self._images.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """Return the counters and current usage as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            "images": len(self._images),
+            "mb": round(self.bytes / (1024 * 1024), 1),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_cache = None
+
+
+def get_image_cache():
+    """Return the shared image cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ImageCache()
+    return _cache
@@ -0,0 +1,335 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+# Environment variables read by configure_from_environment()
+METRICS_PATH_ENV = "MUSIC_APP_METRICS"          # JSON-lines file for periodic metrics snapshots
+PROFILE_ENV = "MUSIC_APP_PROFILE"               # "cprofile" or "sample"
+SLOW_QUERY_ENV = "MUSIC_APP_SLOW_QUERY_MS"
+
+# Statements slower than this (ms) are printed and kept in the snapshots
+SLOW_QUERY_MS = 100
+
+# Recent slow statements kept for the snapshots
+SLOW_QUERY_KEEP = 20
+
+# Seconds between metrics snapshots
+METRICS_INTERVAL = 10
+
+# Seconds between stack samples in "sample" profiling mode
+SAMPLE_INTERVAL = 0.005
+
+# Where profiles are written at exit
+PROFILE_DIR = "profiles"
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """Timing spans and counters for the hot paths, collected only while enabled.
+
+    Disabled (the default), span() hands back a shared no-op context manager and count() returns
+    at once, so instrumented code pays next to nothing. Spans keep a count, total and maximum per
+    name rather than individual timings, so memory stays constant however long the app runs.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._spans = {}  # name -> [count, total seconds, max seconds]
+        self._counters = Counter()
+        self.slow_queries = deque(maxlen=SLOW_QUERY_KEEP)
+
+    def span(self, name):
+        """Context manager timing one occurrence of `name`."""
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def record(self, name, seconds):
+        """Add one timing to a span (for callers that measured it themselves)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                self._spans[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] += amount
+
+    def snapshot(self):
+        """Return everything collected so far as a JSON-serialisable dict."""
+        with self._lock:
+            spans = {
+                name: {
+                    "count": count, "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total * 1000 / count, 3), "max_ms": round(longest * 1000, 3),
+                }
+                for name, (count, total, longest) in self._spans.items()
+            }
+            counters = dict(self._counters)
+            slow_queries = list(self.slow_queries)
+        return {
+            "time": time.time(), "uptime": round(time.time() - self.started, 3),
+            "spans": spans, "counters": counters, "slow_queries": slow_queries,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+            self.slow_queries.clear()
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry."""
+    return _metrics
+
+
+def span(name):
+    """Time a block under `name` in the shared registry: `with span("scan"): ...`."""
+    return _metrics.span(name)
+
+
+def count(name, amount=1):
+    """Add to a counter in the shared registry."""
+    _metrics.count(name, amount)
+
+
+def timed(name):
+    """Decorator timing every call of a function as span `name`."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _metrics.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+_database_instrumented = False
+_instrument_lock = threading.Lock()
+
+
+def instrument_database(metrics=None, slow_query_ms=SLOW_QUERY_MS):
+    """Time every SQL statement and session commit through SQLAlchemy events, logging slow statements.
+
+    The listeners are attached to the Engine and Session classes, so they cover every engine the
+    app creates, including ones created before this call.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.orm import Session
+
+    metrics = metrics or _metrics
+    threshold = slow_query_ms / 1000
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        metrics.record("db.query", elapsed)
+        if executemany:
+            metrics.count("db.executemany_rows", len(parameters))
+        if elapsed >= threshold:
+            metrics.count("db.slow_query")
+            statement = " ".join(statement.split())
+            metrics.slow_queries.append({"ms": round(elapsed * 1000, 1), "statement": statement[:500]})
+            print(f"Slow query ({elapsed * 1000:.0f} ms): {statement[:200]}")
+
+    def before_commit(session):
+        session.info["commit_start"] = time.perf_counter()
+
+    def after_commit(session):
+        start = session.info.pop("commit_start", None)
+        if start is not None:
+            metrics.record("db.commit", time.perf_counter() - start)
+
+    def after_rollback(session):
+        session.info.pop("commit_start", None)
+        metrics.count("db.rollback")
+
+    global _database_instrumented
+    with _instrument_lock:
+        if _database_instrumented:
+            return
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(Session, "before_commit", before_commit)
+        event.listen(Session, "after_commit", after_commit)
+        event.listen(Session, "after_rollback", after_rollback)
+        _database_instrumented = True
+
+
+class MetricsWriter:
+    """Append a metrics snapshot to a JSON-lines file every `interval` seconds and once at exit."""
+
+    def __init__(self, path, metrics=None, interval=METRICS_INTERVAL):
+        self.path = path
+        self.metrics = metrics or _metrics
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def write(self):
+        try:
+            with open(self.path, "a", encoding="utf-8") as metrics_file:
+                metrics_file.write(json.dumps(self.metrics.snapshot()) + "\n")
+        except Exception as e:
+            print(f"Error writing metrics to {self.path}: {e}")
+
+    def stop(self):
+        """Stop the periodic writes and record a final snapshot."""
+        if not self._stop.is_set():
+            self._stop.set()
+            self.write()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+
+class SamplingProfiler:
+    """Sample the stacks of every thread at a fixed interval and write them as collapsed stacks.
+
+    Unlike cProfile, which only sees the thread that enabled it, this covers the scheduler
+    workers too and costs the profiled threads nothing but the GIL hand-offs. The output has one
+    "frame;frame;frame count" line per distinct stack, the input format of flame graph tools.
+    """
+
+    def __init__(self, path, interval=SAMPLE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        with open(self.path, "w", encoding="utf-8") as profile_file:
+            for stack, samples in self.stacks.most_common():
+                profile_file.write(f"{stack} {samples}\n")
+        print(f"Wrote {sum(self.stacks.values())} stack samples to {self.path}.")
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            threads = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = names.get(code)
+                    if label is None:
+                        label = names[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(threads.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def start_profiler(mode, profile_dir=PROFILE_DIR):
+    """Profile the rest of the run ("cprofile" or "sample"); the result is written at exit."""
+    os.makedirs(profile_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        path = os.path.join(profile_dir, f"profile-{stamp}.pstats")
+
+        def dump():
+            profiler.disable()
+            profiler.dump_stats(path)
+            print(f"Wrote cProfile stats to {path} (view with python -m pstats).")
+
+        profiler.enable()
+        atexit.register(dump)
+        return profiler
+    if mode == "sample":
+        profiler = SamplingProfiler(os.path.join(profile_dir, f"stacks-{stamp}.txt")).start()
+        atexit.register(profiler.stop)
+        return profiler
+    raise ValueError(f"Unknown profiling mode: {mode!r} (expected 'cprofile' or 'sample')")
+
+
+def enable_instrumentation(metrics_path=None, profile=None, slow_query_ms=SLOW_QUERY_MS,
+                           interval=METRICS_INTERVAL):
+    """Turn on spans, counters and SQL timing; optionally write snapshots and profile the run."""
+    _metrics.enabled = True
+    instrument_database(_metrics, slow_query_ms)
+    if metrics_path:
+        MetricsWriter(metrics_path, _metrics, interval).start()
+    if profile:
+        start_profiler(profile)
+    return _metrics
+
+
+def configure_from_environment():
+    """Enable instrumentation when MUSIC_APP_METRICS, MUSIC_APP_PROFILE or MUSIC_APP_SLOW_QUERY_MS is set."""
+    metrics_path = os.environ.get(METRICS_PATH_ENV)
+    profile = os.environ.get(PROFILE_ENV)
+    slow_query_ms = os.environ.get(SLOW_QUERY_ENV)
+    if not (metrics_path or profile or slow_query_ms):
+        return None
+    return enable_instrumentation(metrics_path, profile, float(slow_query_ms or SLOW_QUERY_MS))
@@ -0,0 +1,192 @@
+import os
+import time
+from collections import namedtuple
+
+from sqlalchemy import insert, select
+
+from database.database import BULK_BATCH_SIZE, delete_video_dependents
+from database.models import Video, Directory
+from modules.instrumentation import count, timed
+
+# Supported video file extensions
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.wmv')
+
+ScanResult = namedtuple("ScanResult", "added updated removed dirs_listed dirs_skipped seconds")
+
+
+def is_video_file(file_name):
+    """Return True if the file name has a supported video extension."""
+    return file_name.lower().endswith(VIDEO_EXTENSIONS)
+
+
+class LibraryIndexer:
+    """Keep the `videos` table in sync with a folder tree without re-walking unchanged directories.
+
+    Every indexed directory's mtime is stored in `directories`. A directory's mtime only changes
+    when entries are added, removed or renamed in it, so a rescan stats each known directory and
+    lists only the ones whose mtime moved. Files edited in place keep their directory's mtime;
+    pass `full=True` to re-list everything and pick those up as well.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    @timed("scan")
+    def scan(self, root_folder, full=False, recursive=True):
+        """Index `root_folder` (and, when `recursive`, its subfolders) and upsert the difference into the database.
+
+        A non-recursive scan leaves the folder's stored mtime alone, since its subfolders were not
+        indexed and a later recursive scan must still list it to find them.
+        """
+        start = time.perf_counter()
+        # A private session keeps scans safe to run on a background thread
+        session = self.db.Session()
+        root_folder = os.path.abspath(root_folder)
+        added = updated = removed = listed = skipped = 0
+
+        try:
+            known_dirs = {
+                directory.path: directory
+                for directory in session.query(Directory).all()
+                if directory.path == root_folder or (recursive and _is_within(directory.path, root_folder))
+            }
+            children = {}
+            for directory in known_dirs.values():
+                children.setdefault(directory.parent, []).append(directory.path)
+
+            new_rows = []  # Inserted with executemany at the end instead of one ORM object per file
+            seen = set()
+            stack = [root_folder]
+
+            while stack:
+                path = stack.pop()
+                try:
+                    dir_mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue  # Vanished since its parent was listed; pruned below
+
+                seen.add(path)
+                record = known_dirs.get(path)
+                if record is not None and record.mtime == dir_mtime and not full:
+                    # Nothing was added or removed here; descend using what we already know
+                    skipped += 1
+                    if recursive:
+                        stack.extend(children.get(path, ()))
+                    continue
+
+                listed += 1
+                subdirs, files = self._list_directory(path)
+                if recursive:
+                    stack.extend(subdirs)
+
+                a, u, r = self._sync_directory(session, path, files, new_rows)
+                added, updated, removed = added + a, updated + u, removed + r
+
+                if not recursive:
+                    continue
+                if record is None:
+                    record = Directory(path=path, parent=os.path.dirname(path))
+                    session.add(record)
+                record.mtime = dir_mtime
+
+            # Directories we knew about but did not reach have been deleted or moved
+            for path, record in known_dirs.items():
+                if path not in seen:
+                    delete_video_dependents(session, select(Video.id).where(Video.directory == path))
+                    removed += session.query(Video).filter(Video.directory == path).delete(synchronize_session=False)
+                    session.delete(record)
+
+            for offset in range(0, len(new_rows), BULK_BATCH_SIZE):
+                session.execute(insert(Video.__table__), new_rows[offset:offset + BULK_BATCH_SIZE])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error indexing {root_folder}: {e}")
+        finally:
+            session.close()
+
+        result = ScanResult(added, updated, removed, listed, skipped, time.perf_counter() - start)
+        count("scan.added", added)
+        count("scan.updated", updated)
+        count("scan.removed", removed)
+        count("scan.dirs_listed", listed)
+        print(
+            f"Indexed {root_folder}: +{added} ~{updated} -{removed} "
+            f"({listed} directories listed, {skipped} unchanged) in {result.seconds * 1000:.1f} ms"
+        )
+        return result
+
+    def list_videos(self, folder_path):
+        """Index a folder (not its subfolders) and return the paths of the videos directly inside it."""
+        self.scan(folder_path, recursive=False)
+        session = self.db.Session()
+        try:
+            query = session.query(Video.file_name).filter(Video.directory == os.path.abspath(folder_path))
+            return [file_name for (file_name,) in query.order_by(Video.file_name)]
+        finally:
+            session.close()
+
+    def _list_directory(self, path):
+        """Return the subdirectories and {video path: (size, mtime, inode)} of one directory."""
+        subdirs, files = [], {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif is_video_file(entry.name) and entry.is_file():
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"Error listing {path}: {e}")
+        return subdirs, files
+
+    def _sync_directory(self, session, path, files, new_rows):
+        """Apply the difference between a directory listing and its indexed rows; new files go to `new_rows`."""
+        added = updated = removed = 0
+        existing = {video.file_name: video for video in session.query(Video).filter(Video.directory == path)}
+
+        vanished = [video for file_name, video in existing.items() if file_name not in files]
+        if vanished:
+            delete_video_dependents(session, [video.id for video in vanished])
+        for file_name, video in existing.items():
+            state = files.get(file_name)
+            if state is None:
+                session.delete(video)
+                removed += 1
+            elif (video.file_size, video.file_mtime, video.inode) != state:
+                video.file_size, video.file_mtime, video.inode = state
+                updated += 1
+
+        new_files = [file_name for file_name in files if file_name not in existing]
+        # Rows saved before indexing existed (e.g. through add_video) are adopted rather than duplicated
+        adopted = {}
+        if new_files:
+            adopted = {
+                video.file_name: video
+                for video in session.query(Video).filter(Video.directory.is_(None), Video.file_name.in_(new_files))
+            }
+
+        for file_name in new_files:
+            size, mtime, inode = files[file_name]
+            video = adopted.get(file_name)
+            if video is not None:
+                video.directory = path
+                video.file_size, video.file_mtime, video.inode = size, mtime, inode
+                updated += 1
+            else:
+                new_rows.append({
+                    "file_name": file_name, "directory": path, "status": "unread",
+                    "file_size": size, "file_mtime": mtime, "inode": inode,
+                })
+                added += 1
+
+        return added, updated, removed
+
+
+def _is_within(path, root_folder):
+    """Return True if `path` is `root_folder` or lies below it."""
+    return path == root_folder or path.startswith(root_folder.rstrip(os.sep) + os.sep)
@@ -0,0 +1,122 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.instrumentation import span, timed
+
+# ffprobe runs in its own process, so threads are enough to keep several going
+PROBE_WORKERS = min(8, os.cpu_count() or 2)
+
+# Probed rows written per transaction
+PROBE_BATCH_SIZE = 500
+
+
+def probe_file(video_path):
+    """Read duration, resolution, codec and bit rate from a video with one ffprobe call.
+
+    Returns {} when ffprobe cannot read the file. A missing `ffmpeg` package (ImportError) or
+    ffprobe binary (FileNotFoundError) is raised instead, since no file can be probed then.
+    """
+    import ffmpeg
+
+    try:
+        with span("probe.file"):
+            info = ffmpeg.probe(video_path)
+    except FileNotFoundError:
+        raise
+    except Exception as e:
+        print(f"Error probing {video_path}: {e}")
+        return {}
+    video_stream = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), {})
+    media_format = info.get("format", {})
+    duration = media_format.get("duration") or video_stream.get("duration")
+    bit_rate = media_format.get("bit_rate") or video_stream.get("bit_rate")
+    return {
+        "duration": float(duration) if duration else None,
+        "width": video_stream.get("width"),
+        "height": video_stream.get("height"),
+        "video_codec": video_stream.get("codec_name"),
+        "bit_rate": int(bit_rate) if bit_rate else None,
+    }
+
+
+def _probe_row(row):
+    video_id, file_name, file_size, file_mtime = row
+    metadata = probe_file(file_name)
+    # Record the file state even when probing fails, so a broken file is not retried until it changes
+    metadata.update(probed_size=file_size, probed_mtime=file_mtime)
+    return video_id, metadata
+
+
+def _probe_rows(rows, max_workers, scheduler):
+    """Yield _probe_row(row) for every row, in order, on the scheduler's workers or a private pool."""
+    if scheduler is not None:
+        yield from scheduler.map(_probe_row, rows)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe") as executor:
+        yield from executor.map(_probe_row, rows)
+
+
+@timed("probe.library")
+def probe_library(db, directory=None, max_workers=PROBE_WORKERS, progress=None, scheduler=None):
+    """Probe every indexed video whose size or mtime changed since it was last probed.
+
+    Runs ffprobe on `max_workers` threads, or on the workers of `scheduler` (a TaskScheduler) when
+    given, and stores the results in batches; unchanged files are skipped entirely, and videos
+    known to have the same content (see modules.dedup) are probed once and share the result.
+    `progress(done, total)` is called after each file. Returns the number of files probed.
+
+    When ffprobe is unavailable the pass stops with ImportError/FileNotFoundError and the
+    remaining files keep their NULL probed state, so the next pass retries them.
+    """
+    from sqlalchemy import or_
+    from database.database import Video, filter_video_query
+
+    start = time.perf_counter()
+    session = db.Session()
+    try:
+        query = session.query(
+            Video.id, Video.file_name, Video.file_size, Video.file_mtime, Video.content_hash
+        ).filter(
+            Video.file_size.isnot(None),
+            or_(
+                Video.probed_size.is_(None),
+                Video.probed_size != Video.file_size,
+                Video.probed_mtime != Video.file_mtime,
+            ),
+        )
+        if directory:
+            query = filter_video_query(query, directory=directory)
+        pending = []
+        duplicates = {}  # video_id of the probed copy -> (video_id, file_size, file_mtime) of the others
+        representatives = {}
+        for video_id, file_name, file_size, file_mtime, content_hash in query:
+            if content_hash is not None and content_hash in representatives:
+                duplicates[representatives[content_hash]].append((video_id, file_size, file_mtime))
+                continue
+            if content_hash is not None:
+                representatives[content_hash] = video_id
+                duplicates[video_id] = []
+            pending.append((video_id, file_name, file_size, file_mtime))
+    finally:
+        session.close()
+
+    if not pending:
+        return 0
+
+    probed = []
+    for done, (video_id, metadata) in enumerate(_probe_rows(pending, max_workers, scheduler), 1):
+        probed.append((video_id, metadata))
+        for duplicate_id, file_size, file_mtime in duplicates.get(video_id, ()):
+            probed.append((duplicate_id, dict(metadata, probed_size=file_size, probed_mtime=file_mtime)))
+        if len(probed) >= PROBE_BATCH_SIZE:
+            db.update_videos(probed)
+            probed = []
+        if progress:
+            progress(done, len(pending))
+    if probed:
+        db.update_videos(probed)
+
+    shared = sum(map(len, duplicates.values()))
+    print(f"Probed {len(pending)} videos in {time.perf_counter() - start:.2f}s ({shared} duplicates shared results).")
+    return len(pending)
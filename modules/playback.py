@@ -0,0 +1,132 @@
+import subprocess
+import threading
+import time
+from collections import namedtuple
+
+# How often (ms) running players are checked for exit
+POLL_INTERVAL = 250
+
+PlaybackEvent = namedtuple(
+    "PlaybackEvent", "video_path player_name returncode started_at duration start_position", defaults=(0,)
+)
+
+# Command-line options that make a player start at a position (seconds); other players start at 0
+START_POSITION_ARGUMENTS = {
+    "vlc": ["--start-time={:.0f}"],
+    "mpv": ["--start={:.0f}"],
+    "mplayer": ["-ss", "{:.0f}"],
+}
+
+
+class PlaybackSupervisor:
+    """Launch external players without blocking, reap them as they exit and emit completion events.
+
+    With a Tk root attached, children are polled from `root.after` and listeners run on the Tk
+    thread. Without one (headless), a daemon thread does the polling and listeners run there.
+    """
+
+    def __init__(self):
+        self._processes = []  # (Popen, video_path, player_name, started_at, start_position)
+        self._listeners = {}
+        self._lock = threading.Lock()
+        self._root = None
+        self._polling = False
+
+    def attach(self, root):
+        """Poll and deliver events on the Tk thread of `root` from now on."""
+        self._root = root
+
+    def set_listener(self, name, callback):
+        """Register `callback(event)` under `name`, replacing any listener with the same name."""
+        self._listeners[name] = callback
+
+    def remove_listener(self, name):
+        self._listeners.pop(name, None)
+
+    def launch(self, video_path, player_path, player_name=None, start_position=0):
+        """Start a player for a video and return its Popen without waiting for it.
+
+        `start_position` (seconds) is passed to players that support it, to resume where the viewer
+        left off.
+        """
+        player_name = player_name or player_path
+        options = START_POSITION_ARGUMENTS.get(player_name) if start_position else None
+        if not options:
+            start_position = 0
+        arguments = [option.format(start_position) for option in options or []]
+        process = subprocess.Popen(
+            [player_path, *arguments, video_path],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        with self._lock:
+            self._processes.append((process, video_path, player_name, time.time(), start_position))
+        self._ensure_polling()
+        return process
+
+    def running(self):
+        """Return the (video_path, player_name) pairs of players that are still open."""
+        with self._lock:
+            return [(entry[1], entry[2]) for entry in self._processes]
+
+    def poll(self):
+        """Reap players that have exited and notify listeners; returns True while any are still running."""
+        finished = []
+        with self._lock:
+            still_running = []
+            for entry in self._processes:
+                returncode = entry[0].poll()
+                if returncode is None:
+                    still_running.append(entry)
+                else:
+                    finished.append((entry, returncode))
+            self._processes = still_running
+
+        for (process, video_path, player_name, started_at, start_position), returncode in finished:
+            event = PlaybackEvent(
+                video_path, player_name, returncode, started_at, time.time() - started_at, start_position
+            )
+            for callback in list(self._listeners.values()):
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Error in playback listener: {e}")
+        return bool(still_running)
+
+    def _ensure_polling(self):
+        with self._lock:
+            if self._polling:
+                return
+            self._polling = True
+        if self._root is not None:
+            self._root.after(POLL_INTERVAL, self._poll_from_tk)
+        else:
+            threading.Thread(target=self._poll_from_thread, name="playback-reaper", daemon=True).start()
+
+    def _poll_from_tk(self):
+        if self._continue_polling():
+            self._root.after(POLL_INTERVAL, self._poll_from_tk)
+
+    def _poll_from_thread(self):
+        while self._continue_polling():
+            time.sleep(POLL_INTERVAL / 1000)
+
+    def _continue_polling(self):
+        if self.poll():
+            return True
+        with self._lock:
+            # A launch may have slipped in after poll() released the lock
+            self._polling = bool(self._processes)
+            return self._polling
+
+
+_supervisor = None
+
+
+def get_playback_supervisor(root=None):
+    """Return the shared playback supervisor, attaching it to `root` (any Tk widget) when given."""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = PlaybackSupervisor()
+    if root is not None:
+        _supervisor.attach(root.winfo_toplevel())
+    return _supervisor
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+from modules.task_scheduler import get_scheduler, PRIORITY_LOW
+
+# Where resolved player locations are remembered between runs
+PLAYER_CACHE_PATH = os.path.join("cache", "media_players.json")
+
+# Media players we look for: executable names searched on PATH, then well-known install locations
+KNOWN_PLAYERS = {
+    "vlc": {
+        "executables": ["vlc"],
+        "paths": [
+            r"C:\Program Files\VideoLAN\VLC\vlc.exe",
+            r"C:\Program Files (x86)\VideoLAN\VLC\vlc.exe",
+            "/Applications/VLC.app/Contents/MacOS/VLC",
+            "/snap/bin/vlc",
+        ],
+    },
+    "mplayer": {"executables": ["mplayer"], "paths": []},
+    "mpv": {"executables": ["mpv"], "paths": ["/Applications/mpv.app/Contents/MacOS/mpv"]},
+    "wmplayer": {
+        "executables": ["wmplayer"],
+        "paths": [
+            r"C:\Program Files (x86)\Windows Media Player\wmplayer.exe",
+            r"C:\Program Files\Windows Media Player\wmplayer.exe",
+        ],
+    },
+    "quicktime": {"executables": [], "paths": ["/Applications/QuickTime Player.app/Contents/MacOS/QuickTime Player"]},
+    "potplayer": {
+        "executables": ["PotPlayerMini64", "PotPlayerMini"],
+        "paths": [
+            r"C:\Program Files\DAUM\PotPlayer\PotPlayerMini64.exe",
+            r"C:\Program Files (x86)\DAUM\PotPlayer\PotPlayerMini.exe",
+        ],
+    },
+    "gplayer": {"executables": ["gplayer"], "paths": []},
+    "realplayer": {"executables": ["realplay"], "paths": [r"C:\Program Files (x86)\Real\RealPlayer\realplay.exe"]},
+    "movies & tv": {"executables": [], "paths": [r"C:\Program Files\Microsoft Movies & TV\Video.UI.exe"]},
+}
+
+
+def resolve_players():
+    """Locate installed players without launching them; returns {player name: executable path}."""
+    players = {}
+    for name, spec in KNOWN_PLAYERS.items():
+        for executable in spec["executables"]:
+            path = shutil.which(executable)
+            if path:
+                players[name] = path
+                break
+        else:
+            for path in spec["paths"]:
+                if os.path.isfile(path):
+                    players[name] = path
+                    break
+    return players
+
+
+def environment_fingerprint():
+    """Hash PATH, the mtimes of its directories and the known install locations.
+
+    Installing or removing a player changes one of these, which invalidates the cache. Computing
+    it costs a few dozen stat calls.
+    """
+    parts = [os.environ.get("PATH", "")]
+    for directory in os.environ.get("PATH", "").split(os.pathsep):
+        try:
+            parts.append(f"{directory}:{os.stat(directory).st_mtime_ns}")
+        except OSError:
+            parts.append(f"{directory}:-")
+    for spec in KNOWN_PLAYERS.values():
+        parts.extend(f"{path}:{os.path.isfile(path)}" for path in spec["paths"])
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class PlayerRegistry:
+    """Installed media players, persisted to disk and re-validated in the background."""
+
+    def __init__(self, cache_path=PLAYER_CACHE_PATH):
+        self.cache_path = cache_path
+        self._players = None
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self._load_cache()
+
+    def players(self):
+        """Return {player name: executable path}, resolving synchronously only when nothing is cached."""
+        with self._lock:
+            players = self._players
+        if players is None:
+            return self.refresh()
+        self.refresh_async()
+        return dict(players)
+
+    def player_names(self):
+        return list(self.players())
+
+    def player_path(self, player_name):
+        """Return the executable for a player name (case-insensitive), or None if it is not installed."""
+        return self.players().get(player_name.lower())
+
+    def refresh(self, force=False):
+        """Re-resolve the players if the environment changed since they were cached."""
+        fingerprint = environment_fingerprint()
+        with self._lock:
+            if not force and self._players is not None and fingerprint == self._fingerprint:
+                return dict(self._players)
+        players = resolve_players()
+        with self._lock:
+            self._players, self._fingerprint = players, fingerprint
+        self._save_cache()
+        return dict(players)
+
+    def refresh_async(self, callback=None):
+        """Validate the cache on a worker thread; `callback(players)` gets the result."""
+        return get_scheduler().submit(self.refresh, priority=PRIORITY_LOW, callback=callback)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                cached = json.load(cache_file)
+            # Drop entries whose executable has been removed since the cache was written
+            self._players = {name: path for name, path in cached["players"].items() if os.path.isfile(path)}
+            self._fingerprint = cached["fingerprint"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            self._players = None
+
+    def _save_cache(self):
+        with self._lock:
+            cached = {"fingerprint": self._fingerprint, "players": self._players}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            partial_path = f"{self.cache_path}.{threading.get_ident()}.part"
+            with open(partial_path, "w") as cache_file:
+                json.dump(cached, cache_file, indent=2)
+            os.replace(partial_path, self.cache_path)
+        except OSError as e:
+            print(f"Error saving media player cache: {e}")
+
+
+_registry = None
+
+
+def get_player_registry():
+    """Return the shared player registry, loading the on-disk cache on first use."""
+    global _registry
+    if _registry is None:
+        _registry = PlayerRegistry()
+    return _registry
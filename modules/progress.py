@@ -0,0 +1,102 @@
+import time
+from typing import TYPE_CHECKING
+
+from modules.write_behind import WriteBehind
+
+if TYPE_CHECKING:
+    from database.database import Database
+
+# How long (ms) recorded positions are accumulated before they are written in one transaction
+PROGRESS_FLUSH_INTERVAL = 5000
+
+# Watching this much of a video counts as finishing it
+COMPLETE_PERCENT = 95.0
+
+# Resume a little before the saved position so the viewer can pick up the thread
+RESUME_REWIND_SECONDS = 5
+
+
+class ProgressTracker(WriteBehind):
+    """Per-video watch progress accumulated in memory and persisted in batches.
+
+    record() can be called as often as a player reports its position: it only updates a dict.
+    The latest position of every video touched since the last flush is upserted into
+    watch_progress in a single transaction every PROGRESS_FLUSH_INTERVAL ms and at exit, so
+    SQLite sees one write per video per interval however fast positions arrive.
+    """
+
+    error_counter = "progress.write_failed"
+
+    def __init__(self, db: "Database", root=None, flush_interval=PROGRESS_FLUSH_INTERVAL):
+        super().__init__(root, flush_interval)  # _pending: video_id -> row dict for watch_progress
+        self.db = db
+
+    def record(self, video_id, position, duration=None):
+        """Note the current playback position (seconds) of a video; returns its percent watched."""
+        now = time.time()
+        with self._lock:
+            previous = self._pending.get(video_id)
+            if duration is None and previous is not None:
+                duration = previous["duration"]
+            percent = min(100.0, 100.0 * position / duration) if duration else None
+            completed_at = previous["completed_at"] if previous is not None else None
+            if percent is not None and percent >= COMPLETE_PERCENT:
+                completed_at = completed_at or now
+            elif percent is not None:
+                completed_at = None  # Rewatching a finished video puts it back in "continue watching"
+            self._pending[video_id] = {
+                "video_id": video_id, "position": position, "duration": duration,
+                "percent": percent, "updated_at": now, "completed_at": completed_at,
+            }
+        self._schedule_flush()
+        return percent
+
+    def get(self, video_id):
+        """Return (position, percent, completed_at) for a video, including positions not yet flushed."""
+        with self._lock:
+            row = self._pending.get(video_id)
+        if row is not None:
+            return row["position"], row["percent"], row["completed_at"]
+        progress = self.db.fetch_progress(video_id)
+        if progress is None:
+            return None
+        return progress.position, progress.percent, progress.completed_at
+
+    def resume_position(self, video_path):
+        """Where to start a video: a few seconds before the saved position, or 0 if it was finished."""
+        video = self.db.get_video_by_filename(video_path)
+        progress = self.get(video.id) if video else None
+        if progress is None:
+            return 0
+        position, percent, _ = progress
+        if percent is not None and percent >= COMPLETE_PERCENT:
+            return 0
+        return max(0, position - RESUME_REWIND_SECONDS)
+
+    def on_playback_finished(self, event):
+        """Playback listener: external players do not report positions, so estimate one from wall time.
+
+        The player started at event.start_position and ran for event.duration seconds; the result
+        is capped at the probed length of the video.
+        """
+        video = self.db.get_video_by_filename(event.video_path)
+        if video is None:
+            return
+        position = event.start_position + event.duration
+        if video.duration:
+            position = min(position, video.duration)
+        self.record(video.id, position, video.duration)
+
+    def _write(self, pending):
+        return self.db.save_progress(list(pending.values()))
+
+
+def get_progress_tracker(db=None, root=None):
+    """Return the shared progress tracker (flushed at exit), attaching it to `root` when given."""
+    def create():
+        if db is None:
+            from database.database import Database
+            return ProgressTracker(Database(), root)
+        return ProgressTracker(db, root)
+
+    return ProgressTracker.shared(db, create, root)
@@ -0,0 +1,184 @@
+import itertools
+import os
+import queue
+import threading
+import time
+
+# Lower numbers run first
+PRIORITY_HIGH = 0      # Work the user is waiting on (visible thumbnails, clicks)
+PRIORITY_NORMAL = 10   # Database writes
+PRIORITY_LOW = 20      # Library scans and other bulk background work
+
+THREAD_WORKERS = min(8, os.cpu_count() or 2)
+
+# How often (ms) the Tk thread collects finished tasks, and how long (ms) it may spend per visit
+POLL_INTERVAL = 16
+FRAME_BUDGET = 8
+
+
+class Task:
+    """Handle for a scheduled call; cancel() drops it if it has not started and suppresses its callbacks."""
+
+    def __init__(self, priority, fn, args, kwargs, callback, errback, use_process):
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.callback = callback
+        self.errback = errback
+        self.use_process = use_process
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TaskScheduler:
+    """Run blocking work off the Tk thread and deliver results back to it through `root.after`.
+
+    Tasks are picked from a priority queue by a pool of worker threads. `use_process=True` hands the
+    call to a process pool instead (for CPU-bound, picklable functions); a worker thread waits on it
+    so the number of tasks in flight stays bounded. Callbacks run on the Tk thread once a root is
+    attached, or directly on the worker thread when running headless.
+    """
+
+    def __init__(self, max_workers=THREAD_WORKERS):
+        self._tasks = queue.PriorityQueue()
+        self._results = queue.Queue()
+        self._sequence = itertools.count()  # Keeps FIFO order within a priority
+        self._process_pool = None
+        self._process_lock = threading.Lock()
+        self._root = None
+        self._workers = [
+            threading.Thread(target=self._work, name=f"task-worker-{i}", daemon=True) for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, callback=None, errback=None, use_process=False, **kwargs):
+        """Schedule fn(*args, **kwargs) and return its Task."""
+        task = Task(priority, fn, args, kwargs, callback, errback, use_process)
+        self._tasks.put((priority, next(self._sequence), task))
+        return task
+
+    def map(self, fn, items, priority=PRIORITY_LOW):
+        """Yield fn(item) for every item, in order, computed on the worker threads.
+
+        Each item is its own task, so higher-priority work still gets through. The calling thread
+        runs any item no worker has started yet instead of waiting for it, which keeps this safe
+        to call from inside a task even when every worker is busy. An exception from fn is raised
+        when its result is reached; the remaining items are then cancelled.
+        """
+        items = list(items)
+        claimed = [False] * len(items)
+        finished = [threading.Event() for _ in items]
+        outcomes = [None] * len(items)
+        lock = threading.Lock()
+
+        def run(index):
+            with lock:
+                if claimed[index]:
+                    return
+                claimed[index] = True
+            try:
+                outcomes[index] = (fn(items[index]), None)
+            except Exception as e:
+                outcomes[index] = (None, e)
+            finished[index].set()
+
+        tasks = [self.submit(run, index, priority=priority) for index in range(len(items))]
+        try:
+            for index in range(len(items)):
+                run(index)  # Does nothing if a worker already took it
+                finished[index].wait()
+                result, error = outcomes[index]
+                if error is not None:
+                    raise error
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def attach(self, root):
+        """Deliver callbacks on the Tk thread of `root` from now on."""
+        if self._root is None:
+            self._root = root
+            root.after(POLL_INTERVAL, self._drain)
+
+    def shutdown(self):
+        """Stop the workers once the queue is empty and close the process pool."""
+        for _ in self._workers:
+            self._tasks.put((float("inf"), next(self._sequence), None))
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _work(self):
+        while True:
+            _, _, task = self._tasks.get()
+            if task is None:
+                return
+            if task.cancelled:
+                continue
+            try:
+                if task.use_process:
+                    result = self._processes().submit(task.fn, *task.args, **task.kwargs).result()
+                else:
+                    result = task.fn(*task.args, **task.kwargs)
+                error = None
+            except Exception as e:
+                result, error = None, e
+            task.done = True
+            if self._root is None:
+                self._deliver(task, result, error)
+            else:
+                self._results.put((task, result, error))
+
+    def _drain(self):
+        """Run finished tasks' callbacks on the Tk thread without holding it longer than a frame budget."""
+        deadline = time.perf_counter() + FRAME_BUDGET / 1000
+        while time.perf_counter() < deadline:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(task, result, error)
+        try:
+            self._root.after(POLL_INTERVAL, self._drain)
+        except Exception:
+            self._root = None  # The window was destroyed; deliver on worker threads from now on
+
+    def _deliver(self, task, result, error):
+        if task.cancelled:
+            return
+        try:
+            if error is not None:
+                if task.errback:
+                    task.errback(error)
+                else:
+                    print(f"Background task {getattr(task.fn, '__name__', task.fn)} failed: {error}")
+            elif task.callback:
+                task.callback(result)
+        except Exception as e:
+            print(f"Error in background task callback: {e}")
+
+    def _processes(self):
+        with self._process_lock:
+            if self._process_pool is None:
+                # multiprocessing is slow to import and most sessions never need it
+                from concurrent.futures import ProcessPoolExecutor
+                self._process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2)
+            return self._process_pool
+
+
+_scheduler = None
+
+
+def get_scheduler(root=None):
+    """Return the shared scheduler, attaching it to `root` (any Tk widget) when given."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TaskScheduler()
+    if root is not None:
+        _scheduler.attach(root.winfo_toplevel())
+    return _scheduler
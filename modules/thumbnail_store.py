@@ -0,0 +1,318 @@
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: the store is then only safe within one process
+    fcntl = None
+
+# Every thumbnail is stored pre-sized as raw RGB in a fixed-size slot
+SLOT_WIDTH = 200
+SLOT_HEIGHT = 150
+SLOT_BYTES = SLOT_WIDTH * SLOT_HEIGHT * 3
+
+# Slots per pack file (about 23 MB each); packs are created sparse and filled as needed
+SLOTS_PER_PACK = 256
+
+# Index file: a header followed by append-only records (op, key, slot, path length) + path bytes
+INDEX_MAGIC = b"THMBIDX1"
+INDEX_HEADER = struct.Struct("<8sHHI")
+INDEX_RECORD = struct.Struct("<B20sIH")
+OP_PUT = 1
+OP_DELETE = 0
+
+# Compact once more than this fraction of the index file is superseded records
+COMPACT_THRESHOLD = 0.5
+
+
+class ThumbnailStore:
+    """Pre-sized thumbnails packed into memory-mapped pack files, addressed through an offset index.
+
+    A thumbnail lives in slot N of the store: pack file N // SLOTS_PER_PACK at byte offset
+    (N % SLOTS_PER_PACK) * SLOT_BYTES. Reading one is a single slice of an already-mapped pack, with
+    no per-file open and no decode or resize. The index is an append-only log replayed on open;
+    pixels are written before their index record, so a crash can lose a thumbnail but never point
+    at a half-written one. Freed slots are reused; compact() moves thumbnails down into the holes,
+    truncates emptied packs and rewrites the log.
+
+    Several processes (the app and a `cli.py index` run) can share a store: every write takes an
+    exclusive flock on store.lock and first replays records other processes appended to the log,
+    so two processes never hand out the same slot. Reads catch up the same way, under a shared
+    lock, whenever the index file has changed since it was last read.
+    """
+
+    # Whether writes are serialised across processes, not just threads
+    locks_across_processes = fcntl is not None
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self._entries = {}  # key (20-byte digest) -> (slot, video path)
+        self._keys_by_path = {}  # video path -> key, so a changed file replaces its old thumbnail
+        self._free = set()  # freed slots below _next_slot
+        self._next_slot = 0
+        self._packs = {}  # pack number -> (file, mmap)
+        self._records = 0  # Records in the index log, live or superseded
+        self._index_identity = None  # (st_dev, st_ino) of the index file last read
+        self._index_position = 0  # Bytes of the index file applied so far
+        os.makedirs(store_dir, exist_ok=True)
+        self._index_path = os.path.join(store_dir, "index.bin")
+        self._lock_file = open(os.path.join(store_dir, "store.lock"), "a+b")
+        with self._locked():
+            self._load_index(repair=True)
+
+    def __contains__(self, key):
+        self._catch_up()
+        return key in self._entries
+
+    def __len__(self):
+        self._catch_up()
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the raw RGB bytes of a thumbnail (SLOT_WIDTH x SLOT_HEIGHT), or None."""
+        self._catch_up()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            pack, offset = self._locate(entry[0])
+            return pack[offset:offset + SLOT_BYTES]
+
+    def put(self, key, video_path, pixels):
+        """Store SLOT_BYTES of RGB pixels for a video, replacing any older thumbnail of the same path."""
+        if len(pixels) != SLOT_BYTES:
+            raise ValueError(f"Expected {SLOT_BYTES} bytes of RGB pixels, got {len(pixels)}")
+        with self._locked():
+            self._refresh()
+            if key in self._entries:
+                return
+            # Replaying the put frees the slot of any older thumbnail of the same path
+            slot = self._free.pop() if self._free else self._allocate()
+            pack, offset = self._locate(slot)
+            pack[offset:offset + SLOT_BYTES] = pixels
+            self._log(OP_PUT, key, slot, video_path)
+
+    def discard(self, key):
+        """Forget a thumbnail; its slot is reused by later puts."""
+        with self._locked():
+            self._refresh()
+            if key in self._entries:
+                self._remove(key)
+
+    def evict_missing(self):
+        """Drop thumbnails of videos that no longer exist on disk; returns how many were evicted."""
+        with self._lock:
+            paths = list(self._keys_by_path)
+        missing = [path for path in paths if not os.path.exists(path)]
+        with self._locked():
+            self._refresh()
+            for path in missing:
+                key = self._keys_by_path.get(path)
+                if key is not None:
+                    self._remove(key)
+        return len(missing)
+
+    def needs_compaction(self):
+        """Whether more than COMPACT_THRESHOLD of the index log is superseded records."""
+        with self._lock:
+            stale = self._records - len(self._entries)
+            return self._records > 0 and stale / self._records > COMPACT_THRESHOLD
+
+    def compact(self):
+        """Move thumbnails from the highest slots into free holes, drop empty packs and rewrite the index."""
+        with self._locked():
+            self._refresh()
+            free = sorted(self._free)
+            by_slot = sorted(((slot, key) for key, (slot, _) in self._entries.items()), reverse=True)
+            moved = 0
+            for slot, key in by_slot:
+                if not free or free[0] > slot:
+                    break
+                target = free.pop(0)
+                source_pack, source_offset = self._locate(slot)
+                target_pack, target_offset = self._locate(target)
+                target_pack[target_offset:target_offset + SLOT_BYTES] = source_pack[source_offset:source_offset + SLOT_BYTES]
+                self._entries[key] = (target, self._entries[key][1])
+                moved += 1
+
+            self._next_slot = max((slot for slot, _ in self._entries.values()), default=-1) + 1
+            self._free = set()
+            # Moved pixels must be on disk before the index points at them, and the index must be
+            # rewritten before any pack it used to reference disappears
+            for _, pack in self._packs.values():
+                pack.flush()
+            self._rewrite_index()
+
+            last_pack = (self._next_slot - 1) // SLOTS_PER_PACK if self._next_slot else -1
+            for number in [number for number in self._packs if number > last_pack]:
+                pack_file, pack = self._packs.pop(number)
+                pack.close()
+                pack_file.close()
+            for name in os.listdir(self.store_dir):
+                if name.startswith("pack_") and name.endswith(".bin") and int(name[5:-4]) > last_pack:
+                    os.remove(os.path.join(self.store_dir, name))
+            return moved
+
+    def flush(self):
+        with self._lock:
+            for _, pack in self._packs.values():
+                pack.flush()
+
+    def close(self):
+        """Unmap the packs and release store.lock; the store cannot be used afterwards."""
+        with self._lock:
+            self._close_packs()
+            self._lock_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def _locked(self, exclusive=True):
+        """Hold the thread lock and, across processes, a flock on store.lock."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """Before a read, apply other processes' writes if the index file changed since it was last read."""
+        try:
+            stat = os.stat(self._index_path)
+        except OSError:
+            return
+        if (stat.st_dev, stat.st_ino) != self._index_identity or stat.st_size != self._index_position:
+            with self._locked(exclusive=False):
+                self._refresh()
+
+    def _refresh(self):
+        """Apply records appended to the index by other processes, reloading it if it was rewritten."""
+        try:
+            stat = os.stat(self._index_path)
+        except OSError:
+            return
+        if (stat.st_dev, stat.st_ino) != self._index_identity:
+            self._load_index()  # Compacted elsewhere: slots moved and packs may be gone
+        elif stat.st_size > self._index_position:
+            with open(self._index_path, "rb") as index_file:
+                index_file.seek(self._index_position)
+                data = index_file.read()
+            self._index_position += self._replay(data, 0)
+
+    def _close_packs(self):
+        for pack_file, pack in self._packs.values():
+            pack.flush()
+            pack.close()
+            pack_file.close()
+        self._packs = {}
+
+    def _allocate(self):
+        slot = self._next_slot
+        self._next_slot += 1
+        return slot
+
+    def _locate(self, slot):
+        """Return the mapped pack holding a slot and the slot's byte offset in it."""
+        number, index = divmod(slot, SLOTS_PER_PACK)
+        if number not in self._packs:
+            path = os.path.join(self.store_dir, f"pack_{number:04d}.bin")
+            pack_file = open(path, "r+b" if os.path.exists(path) else "w+b")
+            pack_file.truncate(SLOTS_PER_PACK * SLOT_BYTES)  # Sparse until written
+            self._packs[number] = (pack_file, mmap.mmap(pack_file.fileno(), SLOTS_PER_PACK * SLOT_BYTES))
+        return self._packs[number][1], index * SLOT_BYTES
+
+    def _remove(self, key):
+        slot, _ = self._entries[key]
+        self._log(OP_DELETE, key, slot, "")
+
+    def _log(self, op, key, slot, video_path):
+        """Append a record to the index log (under the exclusive lock) and apply it."""
+        path_bytes = video_path.encode("utf-8")
+        with open(self._index_path, "ab") as index_file:
+            index_file.write(INDEX_RECORD.pack(op, key, slot, len(path_bytes)) + path_bytes)
+            self._index_position = index_file.tell()
+        self._apply(op, key, slot, video_path)
+
+    def _apply(self, op, key, slot, video_path):
+        """Apply one index record to the in-memory entries and free slots."""
+        self._records += 1
+        if op == OP_PUT:
+            old_key = self._keys_by_path.get(video_path)
+            if old_key is not None and old_key != key:
+                self._free.add(self._entries.pop(old_key)[0])
+            self._entries[key] = (slot, video_path)
+            self._keys_by_path[video_path] = key
+            self._free.discard(slot)
+            if slot >= self._next_slot:
+                self._free.update(range(self._next_slot, slot))
+                self._next_slot = slot + 1
+        elif key in self._entries and self._entries[key][0] == slot:
+            _, deleted_path = self._entries.pop(key)
+            self._free.add(slot)
+            if self._keys_by_path.get(deleted_path) == key:
+                del self._keys_by_path[deleted_path]
+
+    def _replay(self, data, position):
+        """Apply every complete record in `data` from `position`; returns where the last one ended."""
+        while position + INDEX_RECORD.size <= len(data):
+            op, key, slot, path_length = INDEX_RECORD.unpack_from(data, position)
+            end = position + INDEX_RECORD.size + path_length
+            if end > len(data):
+                break  # Torn final record from a crash
+            self._apply(op, key, slot, data[position + INDEX_RECORD.size:end].decode("utf-8"))
+            position = end
+        return position
+
+    def _load_index(self, repair=False):
+        """Replay the whole index log; with `repair` (exclusive lock held), also drop a torn tail or a
+        log written with other slot dimensions."""
+        self._entries, self._keys_by_path, self._free = {}, {}, set()
+        self._next_slot = self._records = 0
+        self._close_packs()
+        try:
+            with open(self._index_path, "rb") as index_file:
+                stat = os.fstat(index_file.fileno())
+                data = index_file.read()
+        except OSError:
+            stat, data = None, b""
+        if len(data) < INDEX_HEADER.size or INDEX_HEADER.unpack_from(data) != self._header():
+            if repair:
+                self._rewrite_index()
+            return
+
+        position = self._replay(data, INDEX_HEADER.size)
+        if position < len(data) and repair:
+            with open(self._index_path, "r+b") as index_file:
+                index_file.truncate(position)
+        self._index_identity = (stat.st_dev, stat.st_ino)
+        self._index_position = position
+
+    def _rewrite_index(self):
+        """Write a fresh log holding only live entries, replacing the old one atomically."""
+        partial_path = f"{self._index_path}.part"
+        with open(partial_path, "wb") as index_file:
+            index_file.write(INDEX_HEADER.pack(*self._header()))
+            for key, (slot, video_path) in self._entries.items():
+                path_bytes = video_path.encode("utf-8")
+                index_file.write(INDEX_RECORD.pack(OP_PUT, key, slot, len(path_bytes)) + path_bytes)
+            position = index_file.tell()
+        os.replace(partial_path, self._index_path)
+        stat = os.stat(self._index_path)
+        self._index_identity = (stat.st_dev, stat.st_ino)
+        self._index_position = position
+        self._records = len(self._entries)
+
+    @staticmethod
+    def _header():
+        return INDEX_MAGIC, SLOT_WIDTH, SLOT_HEIGHT, SLOTS_PER_PACK
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import threading
+
+from modules.frame_capture import get_grabber, THUMBNAIL_TIMESTAMP
+from modules.instrumentation import count, span
+from modules.task_scheduler import get_scheduler, PRIORITY_HIGH, PRIORITY_NORMAL
+from modules.thumbnail_store import ThumbnailStore
+
+# Directory holding the thumbnail pack files and their index
+THUMBNAIL_DIR = os.path.join("cache", "thumbnails")
+
+
+def thumbnail_key(video_path):
+    """Build a cache key (20-byte digest) from the video's absolute path, size and modification time."""
+    stat = os.stat(video_path)
+    raw_key = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(raw_key.encode("utf-8")).digest()
+
+
+def generate_thumbnail(video_path, thumbnail_path):
+    """Generate a thumbnail for the video."""
+    try:
+        # Check if the file exists
+        if not os.path.exists(video_path):
+            print(f"Video file not found at: {video_path}")
+            return None
+
+        os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+
+        import ffmpeg
+
+        (
+            ffmpeg
+            .input(video_path, ss=THUMBNAIL_TIMESTAMP)
+            .output(thumbnail_path, vframes=1)
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+        return thumbnail_path
+    except Exception:
+        count("thumbnail.failed")
+        return None
+
+
+class ThumbnailRequest:
+    """One caller waiting on a thumbnail; cancel() drops the callback, and the generation once nobody waits."""
+
+    def __init__(self, engine, video_path, callback):
+        self.engine = engine
+        self.video_path = video_path
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.engine._withdraw(self)
+
+
+class ThumbnailEngine:
+    """Generate thumbnails on the shared task scheduler and hand each one back as soon as it is ready.
+
+    Thumbnails are captured at their display size and kept in a ThumbnailStore; callers get the
+    store key back and read the pixels with load(). A video is only ever generated once at a time:
+    requests for a video already in flight wait on the same task.
+    """
+
+    def __init__(self, thumbnail_dir=THUMBNAIL_DIR, scheduler=None):
+        self.thumbnail_dir = thumbnail_dir
+        self.scheduler = scheduler or get_scheduler()
+        self.store = ThumbnailStore(thumbnail_dir)
+        self._pending = {}  # absolute video path -> (Task, [ThumbnailRequest]) while it is generated
+        self._lock = threading.Lock()
+
+    def lookup(self, video_path):
+        """Return the thumbnail key if it has already been generated."""
+        try:
+            key = thumbnail_key(video_path)
+        except OSError:
+            return None
+        return key if key in self.store else None
+
+    def ensure(self, video_path):
+        """Return the thumbnail key for a video, generating it synchronously if needed."""
+        try:
+            key = thumbnail_key(video_path)
+        except OSError:
+            return None
+        if key in self.store:
+            count("thumbnail.hit")
+            return key
+        count("thumbnail.miss")
+        with span("thumbnail.generate"):
+            grabber = get_grabber("thumbnail")
+            # Videos shorter than the usual position fall back to their first keyframe
+            pixels = grabber.grab(video_path, [THUMBNAIL_TIMESTAMP]) or grabber.grab(video_path, [0])
+            if pixels is None:
+                count("thumbnail.failed")
+                print(f"Error generating thumbnail for: {video_path}")
+                return None
+            self.store.put(key, os.path.abspath(video_path), pixels)
+        return key
+
+    def load(self, key):
+        """Return the raw RGB pixels (SLOT_WIDTH x SLOT_HEIGHT) of a thumbnail, or None."""
+        return self.store.get(key)
+
+    def prune(self):
+        """Evict thumbnails of deleted videos and compact the store; returns how many were evicted."""
+        evicted = self.store.evict_missing()
+        if self.store.needs_compaction():
+            self.store.compact()
+        return evicted
+
+    def request(self, video_path, callback, priority=PRIORITY_HIGH):
+        """Call `callback(key)` once the thumbnail exists (None on failure).
+
+        Cached thumbnails are returned immediately and None is returned; otherwise a ThumbnailRequest
+        is returned so the caller can cancel it, e.g. when its card scrolls out of view.
+        """
+        cached = self.lookup(video_path)
+        if cached:
+            callback(cached)
+            return None
+        path = os.path.abspath(video_path)
+        request = ThumbnailRequest(self, path, callback)
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending is None:
+                task = self.scheduler.submit(
+                    self.ensure, path, priority=priority,
+                    callback=lambda key: self._finish(path, key), errback=lambda error: self._finish(path, None),
+                )
+                pending = self._pending[path] = (task, [])
+            pending[1].append(request)
+        return request
+
+    def submit_many(self, video_paths, results, priority=PRIORITY_NORMAL):
+        """Queue thumbnails for many videos; each finished one is put on `results` as (video_path, key)."""
+        tasks = []
+        for video_path in video_paths:
+            callback = lambda key, video_path=video_path: results.put((video_path, key))
+            tasks.append(self.request(video_path, callback, priority))
+        return tasks
+
+    def _finish(self, path, key):
+        with self._lock:
+            _, requests = self._pending.pop(path, (None, []))
+        for request in requests:
+            if request.cancelled:
+                continue
+            try:
+                request.callback(key)
+            except Exception as e:
+                print(f"Error in thumbnail callback for {path}: {e}")
+
+    def _withdraw(self, request):
+        """Forget a cancelled request, cancelling its task when it was the last one waiting."""
+        with self._lock:
+            pending = self._pending.get(request.video_path)
+            if pending is None or request not in pending[1]:
+                return
+            task, requests = pending
+            requests.remove(request)
+            if not requests:
+                task.cancel()
+                del self._pending[request.video_path]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_thumbnail_engine():
+    """Return the process-wide thumbnail engine, creating it on first use (on any thread)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ThumbnailEngine()
+    return _engine
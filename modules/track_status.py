@@ -1,49 +1,121 @@
 import tkinter as tk
 from tkinter import messagebox
-from database.database import Database
+from typing import TYPE_CHECKING
+from modules.write_behind import WriteBehind
 
-class VideoStatus:
-    def __init__(self, db: Database):
+if TYPE_CHECKING:
+    from database.database import Database
+
+# Minimum time (s) a player must stay open for a clean exit to count as a completed play
+AUTO_MARK_MIN_SECONDS = 10
+
+# How long (ms) status changes are collected before they are written in one transaction
+STATUS_FLUSH_INTERVAL = 500
+
+class StatusTracker(WriteBehind):
+    """Read/unread statuses held in memory, with changes written behind in batches.
+
+    All statuses are loaded with one query on first use. set() updates the dict immediately, so the
+    UI can redraw straight away, and queues the change; changes to the same video coalesce, and
+    everything queued is written in a single transaction every STATUS_FLUSH_INTERVAL ms (on a
+    scheduler worker) and at interpreter exit.
+    """
+
+    error_counter = "status.write_failed"
+
+    def __init__(self, db: "Database", root=None, flush_interval=STATUS_FLUSH_INTERVAL):
+        super().__init__(root, flush_interval)
         self.db = db
+        self._statuses = None
 
-    def mark_as_read(self, video_path):
-        """Mark a video as read and update the database."""
-        try:
-            # Update the video's status in the database
+    def get(self, video_path):
+        """Return a video's status, or None if it is not in the database."""
+        statuses = self._load()
+        if video_path not in statuses:
+            # Indexed after the statuses were loaded, or not yet: unknown paths are not cached, so a
+            # video indexed later is found on the next call
             video = self.db.get_video_by_filename(video_path)
-            if video:
-                video.status = "read"  # Update status to "read"
-                self.db.commit()
-                messagebox.showinfo("Success", f"The video '{video_path}' has been marked as read.")
-            else:
-                messagebox.showerror("Error", f"Video '{video_path}' not found in the database.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error marking video as read: {str(e)}")
-
-    def mark_as_unread(self, video_path):
-        """Mark a video as unread and update the database."""
-        try:
-            # Update the video's status in the database
-            video = self.db.get_video_by_filename(video_path)
-            if video:
-                video.status = "unread"  # Update status to "unread"
-                self.db.commit()
-                messagebox.showinfo("Success", f"The video '{video_path}' has been marked as unread.")
-            else:
-                messagebox.showerror("Error", f"Video '{video_path}' not found in the database.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error marking video as unread: {str(e)}")
+            if video is None:
+                return None
+            with self._lock:
+                statuses.setdefault(video_path, video.status)
+        return statuses[video_path]
+
+    def set(self, video_path, status):
+        """Apply a status at once and queue it for writing; returns False if the video is unknown."""
+        if self.get(video_path) is None:
+            return False
+        with self._lock:
+            self._statuses[video_path] = status
+            self._pending[video_path] = status
+        self._schedule_flush()
+        return True
+
+    def toggle(self, video_path):
+        """Flip a video between read and unread; returns the new status (None if the video is unknown)."""
+        status = "unread" if self.get(video_path) == "read" else "read"
+        return status if self.set(video_path, status) else None
+
+    def _write(self, pending):
+        written = self.db.update_video_statuses(pending)
+        print(f"Wrote {written} video status changes.")
+        return written
+
+    def _load(self):
+        if self._statuses is None:
+            statuses = self.db.fetch_statuses()
+            with self._lock:
+                if self._statuses is None:
+                    self._statuses = statuses
+        return self._statuses
+
+
+def get_status_tracker(db, root=None):
+    """Return the shared status tracker (flushed at exit), attaching it to `root` when given."""
+    return StatusTracker.shared(db, lambda: StatusTracker(db, root), root)
+
+
+class VideoStatus:
+    def __init__(self, db: "Database", root=None):
+        self.db = db
+        self.tracker = get_status_tracker(db, root)
+
+    def mark_as_read(self, video_path, on_done=None, notify=True):
+        """Mark a video as read; the database write is batched by the status tracker."""
+        self._set_status(video_path, "read", on_done, notify)
+
+    def mark_as_unread(self, video_path, on_done=None, notify=True):
+        """Mark a video as unread; the database write is batched by the status tracker."""
+        self._set_status(video_path, "unread", on_done, notify)
+
+    def on_playback_finished(self, event):
+        """Playback listener: mark a video read when its player exits cleanly after a real viewing.
+
+        Players that hand the file to an already running instance exit almost immediately, so
+        short sessions are ignored.
+        """
+        if event.returncode == 0 and event.duration >= AUTO_MARK_MIN_SECONDS:
+            self.mark_as_read(event.video_path, notify=False)
+
+    def _set_status(self, video_path, status, on_done, notify=True):
+        """Apply the status optimistically and report at once; the write happens on the next flush."""
+        found = self.tracker.set(video_path, status)
+        if found and notify:
+            messagebox.showinfo("Success", f"The video '{video_path}' has been marked as {status}.")
+        elif not found:
+            messagebox.showerror("Error", f"Video '{video_path}' not found in the database.")
+        if on_done:
+            on_done(status if found else None)
 
     def get_video_status(self, video_path):
         """Get the status of a video."""
-        video = self.db.get_video_by_filename(video_path)
-        return video.status if video else None
+        return self.tracker.get(video_path)
 
 
 class VideoStatusUI:
-    def __init__(self, root, db: Database, video_list):
+    def __init__(self, root, db: "Database", video_list):
         self.db = db
-        self.video_status = VideoStatus(db)
+        self.video_status = VideoStatus(db, root)
         self.video_list = video_list
         self.root = root
         self._create_video_status_ui()
@@ -67,12 +139,13 @@ class VideoStatusUI:
 
     def toggle_video_status(self, video_path):
         """Toggle the status of the selected video between 'read' and 'unread'."""
+        def update_button(new_status):
+            # Called straight away; the database write follows on the tracker's next flush
+            if new_status:
+                self.status_buttons[video_path].config(text=f"{video_path} - {new_status}")
+
         current_status = self.video_status.get_video_status(video_path)
         if current_status == "read":
-            self.video_status.mark_as_unread(video_path)
+            self.video_status.mark_as_unread(video_path, on_done=update_button)
         else:
-            self.video_status.mark_as_read(video_path)
-
-        # Update the UI button text after the status change
-        new_status = self.video_status.get_video_status(video_path)
-        self.status_buttons[video_path].config(text=f"{video_path} - {new_status}")
+            self.video_status.mark_as_read(video_path, on_done=update_button)
@@ -1,42 +1,22 @@
-import os
-from PIL import Image, ImageTk
-import customtkinter as ctk
 import tkinter as tk
-from tkinter import messagebox, simpledialog
-from database.database import Database, Video
-import ffmpeg
+from tkinter import messagebox
+from modules.thumbnails import get_thumbnail_engine
+from modules.task_scheduler import get_scheduler, PRIORITY_LOW
+from modules.video_grid import VirtualVideoGrid
+from modules.instrumentation import span
 from modules.video_player import get_installed_media_players, open_video_with_player
 from modules.metadata_input import open_metadata_form
-from modules.category_filter import filter_videos_by_category  # Import the filter function
+from modules.playback import get_playback_supervisor
+from modules.progress import get_progress_tracker
+from modules.track_status import VideoStatus
 
 # Directory where the videos are stored
 VIDEO_FOLDER = 'path_to_uploaded_folder'  # Make sure this path is correct
 
-def generate_thumbnail(video_path, thumbnail_path):
-    """Generate a thumbnail for the video."""
-    print(f"Generating thumbnail for: {video_path}")  # Debug
-    try:
-        # Check if the file exists
-        if not os.path.exists(video_path):
-            print(f"Video file not found at: {video_path}")
-            return None
-        
-        if not os.path.exists(os.path.dirname(thumbnail_path)):
-            os.makedirs(os.path.dirname(thumbnail_path))
-        
-        # Using ffmpeg to generate the thumbnail at the 1-second mark
-        (
-            ffmpeg
-            .input(video_path, ss=1)  # Capture at 1-second mark
-            .output(thumbnail_path, vframes=1)
-            .overwrite_output()
-            .run(capture_stdout=True, capture_stderr=True)
-        )
-        print(f"Thumbnail saved at: {thumbnail_path}")  # Debug
-        return thumbnail_path
-    except Exception as e:
-        print(f"Error generating thumbnail: {e}")  # Debug
-        return None
+# The duplicate-detection and probe pass that follows a scan: at most one is queued or running,
+# and another only starts once a scan has found changes since the last one began
+_details_task = None
+_details_stale = True
 
 def on_video_click(video_path):
     """Prompt the user to either add metadata or play the video."""
@@ -52,8 +32,11 @@ def on_video_click(video_path):
 
 def open_media_player_selection(video_path):
     """Open a window for the user to select a media player."""
-    media_players = get_installed_media_players()
+    # Served from the player registry's cache, so this no longer blocks on detection
+    show_media_player_selection(video_path, get_installed_media_players())
 
+def show_media_player_selection(video_path, media_players):
+    """Show the media player chooser once detection has finished."""
     if media_players:
         # Create a new window to select a media player
         media_player_window = tk.Toplevel()
@@ -73,7 +56,7 @@ def open_media_player_selection(video_path):
         def on_player_select():
             selected_player = player_listbox.get(tk.ACTIVE)
             if selected_player:
-                open_video_with_player(video_path, selected_player)
+                open_video_with_player(video_path, selected_player, get_progress_tracker().resume_position(video_path))
                 media_player_window.destroy()
             else:
                 messagebox.showerror("No Selection", "Please select a media player.")
@@ -85,83 +68,99 @@ def open_media_player_selection(video_path):
         # Add a "Cancel" button to close the window
         cancel_button = tk.Button(media_player_window, text="Cancel", command=media_player_window.destroy)
         cancel_button.pack(pady=5)
-
-        media_player_window.mainloop()
     else:
         messagebox.showerror("No Media Players Found", "No installed media players were found.")
 
-def fetch_videos_from_folder():
-    """Fetch all videos from the uploaded folder."""
-    videos = []
-    for root, dirs, files in os.walk(VIDEO_FOLDER):
-        for file in files:
-            if file.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
-                video_path = os.path.join(root, file)
-                # If the video doesn't already exist in the database, add it
-                video = Video(file_name=video_path)
-                videos.append(video)
-    return videos
+def fetch_videos_from_folder(db):
+    """Fetch all videos from the uploaded folder, rescanning only directories that changed."""
+    from modules.library_index import LibraryIndexer
+
+    LibraryIndexer(db).scan(VIDEO_FOLDER)
+    return db.get_records_in_directory(VIDEO_FOLDER, recursive=True)
+
+def update_library_details(db):
+    """Find duplicate files, then read duration/resolution of new or changed ones (runs on a worker)."""
+    from modules.dedup import DedupEngine
+    from modules.media_probe import probe_library
+
+    # Duplicates are found first so each distinct video is probed only once
+    scheduler = get_scheduler()
+    try:
+        DedupEngine(db, scheduler=scheduler).run(VIDEO_FOLDER, get_thumbnail_engine())
+    except Exception as e:
+        print(f"Error finding duplicate videos: {e}")
+    probe_library(db, VIDEO_FOLDER, scheduler=scheduler)
+
+def schedule_library_details(db, scan_result=None):
+    """Queue update_library_details() after a scan that changed the library, unless a pass is in flight."""
+    global _details_task, _details_stale
+    if scan_result is not None and (scan_result.added or scan_result.updated):
+        _details_stale = True
+    if _details_task is not None or not _details_stale:
+        return _details_task
+
+    def finished(error=None):
+        global _details_task
+        if error is not None:
+            print(f"Error updating library details: {error}")
+        _details_task = None
+        schedule_library_details(db)  # Pick up changes found while this pass ran
+
+    _details_stale = False
+    _details_task = get_scheduler().submit(
+        update_library_details, db, priority=PRIORITY_LOW, callback=lambda _: finished(), errback=finished
+    )
+    return _details_task
 
 def display_videos(video_frame, db, selected_category="All"):
     """Retrieve and display videos in the dashboard with optional category filter."""
+    import customtkinter as ctk
+    from modules.library_index import LibraryIndexer  # Pulls in SQLAlchemy
+
     # Clear existing widgets
     for widget in video_frame.winfo_children():
         widget.destroy()
 
-    # Fetch videos from the database
-    videos = fetch_videos_from_folder()
-
-    # Apply category filter
-    videos = filter_videos_by_category(videos, selected_category)
-
-    if not videos:
-        placeholder_label = ctk.CTkLabel(video_frame, text="No videos to display.", anchor="center")
-        placeholder_label.pack(fill=tk.BOTH, expand=True)
-        return
-
-    print(f"Displaying {len(videos)} videos.")  # Debug: Print the number of videos
-
-    row, col = 0, 0
-    for video in videos:
-        print(f"Processing video: {video}")  # Debug: Print each video object
-
-        video_path = video.file_name  # Use the `file_name` attribute
-        video_name = os.path.basename(video_path)
-
-        # Generate or locate the thumbnail
-        thumbnail_path = f"temp_thumbnails/{video_name}.jpg"
-        if not os.path.exists(thumbnail_path):
-            thumbnail_path = generate_thumbnail(video_path, thumbnail_path)
-
-        # Load thumbnail and display
-        try:
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                img = Image.open(thumbnail_path)
-                img = img.resize((200, 150), Image.ANTIALIAS)  # Resize for consistency
-                img = ImageTk.PhotoImage(img)
-
-                # Create a frame for each video
-                video_card = ctk.CTkFrame(video_frame, width=220, height=200)
-                video_card.grid(row=row, column=col, padx=10, pady=10)
-
-                # Thumbnail image
-                thumbnail_label = ctk.CTkLabel(video_card, image=img, text="")  # Display thumbnail
-                thumbnail_label.image = img  # Prevent garbage collection
-                thumbnail_label.pack()
-
-                # Video name
-                video_label = ctk.CTkLabel(video_card, text=video.name or video_name, anchor="center")
-                video_label.pack()
-
-                # Add a click event to ask the user to either add metadata or play the video
-                video_card.bind("<Button-1>", lambda event, video_path=video_path: on_video_click(video_path))
-
-            else:
-                print(f"Thumbnail not found for video: {video_path}")  # Debug
-        except Exception as e:
-            print(f"Error displaying video: {e}")  # Debug
-
-        col += 1
-        if col > 3:  # Limit to 4 columns per row
-            col = 0
-            row += 1
+    # Players are launched without blocking; mark a video read once its player exits after a full play
+    video_status = VideoStatus(db, video_frame)
+    get_playback_supervisor(video_frame).set_listener("mark-read", video_status.on_playback_finished)
+    # Remember roughly where each viewing stopped, so the next one can resume there
+    progress = get_progress_tracker(db, video_frame)
+    get_playback_supervisor().set_listener("progress", progress.on_playback_finished)
+
+    # A newer call (e.g. another category change) supersedes a scan that is still running
+    previous_task = getattr(video_frame, "display_task", None)
+    if previous_task is not None:
+        previous_task.cancel()
+
+    loading_label = ctk.CTkLabel(video_frame, text="Scanning library...", anchor="center")
+    loading_label.pack(fill=tk.BOTH, expand=True)
+
+    def show_grid(scan_result):
+        if not video_frame.winfo_exists():
+            return
+        loading_label.destroy()
+        total = db.count_videos(selected_category, VIDEO_FOLDER)
+
+        if not total:
+            placeholder_label = ctk.CTkLabel(video_frame, text="No videos to display.", anchor="center")
+            placeholder_label.pack(fill=tk.BOTH, expand=True)
+            return
+
+        # Only the visible rows are built; the frame should be a plain (non-scrollable) container
+        with span("widget.grid"):
+            video_frame.video_grid = VirtualVideoGrid(
+                video_frame, db, selected_category, directory=VIDEO_FOLDER, on_click=on_video_click
+            )
+
+        # Duplicates and duration/resolution are worked out after the grid is up
+        schedule_library_details(db, scan_result)
+        if scan_result and scan_result.removed:
+            # Free the thumbnail slots of videos that disappeared from disk
+            get_scheduler().submit(get_thumbnail_engine().prune, priority=PRIORITY_LOW)
+
+    # Bring the index up to date in the background; the grid then pages through the database
+    video_frame.display_task = get_scheduler(video_frame).submit(
+        LibraryIndexer(db).scan, VIDEO_FOLDER, priority=PRIORITY_LOW, callback=show_grid
+    )
+    return video_frame.display_task
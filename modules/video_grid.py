@@ -0,0 +1,195 @@
+import os
+from collections import OrderedDict
+import tkinter as tk
+from modules.task_scheduler import get_scheduler
+from modules.thumbnails import get_thumbnail_engine
+from modules.thumbnail_store import SLOT_WIDTH, SLOT_HEIGHT
+from modules.image_cache import get_image_cache
+from modules.instrumentation import count, timed
+
+# Card geometry (pixels)
+CARD_WIDTH = 220
+CARD_HEIGHT = 200
+CARD_PADDING = 10
+COLUMNS = 4
+
+# Rows built above and below the viewport so short scrolls never show empty space
+OVERSCAN_ROWS = 2
+
+# Rows fetched per database round trip, and how many pages stay in memory
+PAGE_SIZE = 100
+MAX_CACHED_PAGES = 5
+
+
+class VirtualVideoGrid:
+    """A scrolling grid of video cards that only builds the rows currently in view.
+
+    Rows are read from the database in keyset-paginated pages (`WHERE id > ? LIMIT ?`). Only the
+    start id of each page and a handful of recently used pages are kept, so memory stays flat no
+    matter how large the library is.
+    """
+
+    def __init__(self, parent, db, selected_category="All", directory=None, on_click=None):
+        import customtkinter as ctk
+
+        self.db = db
+        self.selected_category = selected_category
+        self.directory = directory
+        self.on_click = on_click
+        self.engine = get_thumbnail_engine()
+        self.image_cache = get_image_cache()
+        get_scheduler(parent)  # Thumbnail callbacks must arrive on this window's Tk thread
+
+        self.row_height = CARD_HEIGHT + 2 * CARD_PADDING
+        self.column_width = CARD_WIDTH + 2 * CARD_PADDING
+        self.total = db.count_videos(selected_category, directory)
+
+        self.page_starts = {0: 0}  # page number -> after_id cursor, for every page located so far
+        self.pages = OrderedDict()  # page number -> VideoRecords, least recently used first
+        self.cards = {}  # grid index -> (canvas window id, card frame, thumbnail label, thumbnail task)
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0, width=COLUMNS * self.column_width)
+        self.scrollbar = ctk.CTkScrollbar(parent, command=self._on_scrollbar)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        rows = -(-self.total // COLUMNS)
+        self.canvas.configure(scrollregion=(0, 0, COLUMNS * self.column_width, rows * self.row_height))
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda event: self._scroll_units(-1))
+        self.canvas.bind("<Button-5>", lambda event: self._scroll_units(1))
+
+    @timed("widget.grid_refresh")
+    def refresh(self):
+        """Build cards for the visible rows plus overscan and destroy the ones scrolled away."""
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        first_row = max(0, int(top // self.row_height) - OVERSCAN_ROWS)
+        last_row = int((top + height) // self.row_height) + OVERSCAN_ROWS
+        wanted = range(first_row * COLUMNS, min(self.total, (last_row + 1) * COLUMNS))
+
+        for index in [index for index in self.cards if index not in wanted]:
+            window_id, card, _, thumbnail_task = self.cards.pop(index)
+            if thumbnail_task is not None:
+                thumbnail_task.cancel()  # Scrolled away before its thumbnail was ready
+            self.canvas.delete(window_id)
+            card.destroy()
+
+        for index in wanted:
+            if index in self.cards:
+                continue
+            video = self._video_at(index)
+            if video is None:
+                break
+            self._build_card(index, video)
+
+    @timed("widget.card")
+    def _build_card(self, index, video):
+        """Create one video card at its grid position."""
+        import customtkinter as ctk
+
+        video_path = video.file_name
+        row, col = divmod(index, COLUMNS)
+
+        video_card = ctk.CTkFrame(self.canvas, width=CARD_WIDTH, height=CARD_HEIGHT)
+        thumbnail_label = ctk.CTkLabel(video_card, text="Loading...", width=SLOT_WIDTH, height=SLOT_HEIGHT)
+        thumbnail_label.pack()
+        video_label = ctk.CTkLabel(video_card, text=video.name or os.path.basename(video_path), anchor="center")
+        video_label.pack()
+
+        if self.on_click:
+            for widget in (video_card, thumbnail_label, video_label):
+                widget.bind("<Button-1>", lambda event, video_path=video_path: self.on_click(video_path))
+        for widget in (video_card, thumbnail_label, video_label):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+
+        window_id = self.canvas.create_window(
+            col * self.column_width + CARD_PADDING, row * self.row_height + CARD_PADDING,
+            window=video_card, anchor="nw",
+        )
+        # The file's size and mtime version the thumbnail, so a changed video misses the cache
+        image_key = (video.id, video.file_size, video.file_mtime)
+        image = self.image_cache.get(image_key)
+        if image is not None:
+            thumbnail_label.configure(image=image, text="")
+            thumbnail_label.image = image  # Prevent garbage collection
+            thumbnail_task = None
+        else:
+            thumbnail_task = self.engine.request(
+                video_path, lambda key: self._show_thumbnail(thumbnail_label, key, image_key)
+            )
+        self.cards[index] = (window_id, video_card, thumbnail_label, thumbnail_task)
+
+    def _video_at(self, index):
+        """Return the video shown at a grid index, loading its page if needed."""
+        page_number, offset = divmod(index, PAGE_SIZE)
+        videos = self._load_page(page_number)
+        return videos[offset] if offset < len(videos) else None
+
+    def _load_page(self, page_number):
+        """Fetch a page by keyset cursor, keeping the most recently used pages cached."""
+        if page_number in self.pages:
+            self.pages.move_to_end(page_number)
+            return self.pages[page_number]
+
+        after_id = self._page_start(page_number)
+        if after_id is None:
+            return []
+        videos = self.db.fetch_records_page(after_id, PAGE_SIZE, self.selected_category, self.directory)
+        self.pages[page_number] = videos
+        while len(self.pages) > MAX_CACHED_PAGES:
+            self.pages.popitem(last=False)
+        return videos
+
+    def _page_start(self, page_number):
+        """Return the keyset cursor for a page.
+
+        An unseen page is located with one OFFSET query from the nearest known cursor before it, so
+        dragging the scrollbar deep into a large library costs a single index walk on the Tk thread
+        rather than one round trip per page in between.
+        """
+        if page_number not in self.page_starts:
+            known = max(page for page in self.page_starts if page < page_number)
+            boundary = self.db.fetch_page_boundary(
+                self.page_starts[known], (page_number - known) * PAGE_SIZE,
+                self.selected_category, self.directory,
+            )
+            if boundary is None:
+                return None
+            self.page_starts[page_number] = boundary
+        return self.page_starts[page_number]
+
+    def _show_thumbnail(self, thumbnail_label, key, image_key):
+        """Put a finished thumbnail into its card (runs on the Tk thread)."""
+        if not thumbnail_label.winfo_exists():
+            return
+        from PIL import Image, ImageTk
+
+        try:
+            pixels = self.engine.load(key) if key else None
+            if pixels:
+                # Stored at display size, so this is a slice of the mapped pack with no decode or resize
+                img = Image.frombuffer("RGB", (SLOT_WIDTH, SLOT_HEIGHT), pixels, "raw", "RGB", 0, 1)
+                img = ImageTk.PhotoImage(img)
+                self.image_cache.put(image_key, img)
+                thumbnail_label.configure(image=img, text="")  # Display thumbnail
+                thumbnail_label.image = img  # Prevent garbage collection
+            else:
+                thumbnail_label.configure(text="No preview")
+                count("grid.no_preview")
+        except Exception:
+            count("grid.thumbnail_errors")
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        self._scroll_units(-1 if event.delta > 0 else 1)
+
+    def _scroll_units(self, units):
+        self.canvas.yview_scroll(units, "units")
+        self.refresh()
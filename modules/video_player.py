@@ -48,51 +48,31 @@
 #     except Exception as e:
 #         messagebox.showerror("Error", f"Error opening video with {player_name}: {e}")
 import os
-import psutil
-import subprocess
 from tkinter import messagebox
 import tkinter as tk
+from modules.player_registry import get_player_registry
+from modules.playback import get_playback_supervisor
 
 
 def get_installed_media_players():
-    """Dynamically detect installed media players on the system."""
-    players = []
+    """Return the installed media players, looked up on PATH and known install locations.
 
-    # Common media players we want to check for
-    potential_players = [
-        "vlc", "mplayer", "mpv", "wmplayer", "quicktime", "potplayer", "gplayer", "realplayer", "movies & tv"
-    ]
+    Results come from the player registry's cache, which is re-validated in the background, so
+    nothing is launched and the call returns immediately after the first run.
+    """
+    return get_player_registry().player_names()
 
-    # Check for the installed media players by searching for known executables
-    for player in potential_players:
-        try:
-            # Try running the player to see if it's installed
-            subprocess.run([player, '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            players.append(player)  # Add to the list if found
-        except FileNotFoundError:
-            continue  # Skip if the executable is not found
 
-    if not players:
-        messagebox.showerror("No Media Players", "No compatible media players were found on your system.")
-
-    return players
-
-
-def open_video_with_player(video_path, player_name):
-    """Open the video using the selected media player."""
+def open_video_with_player(video_path, player_name, start_position=0):
+    """Open the video using the selected media player, resuming at `start_position` seconds where supported."""
     try:
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"The video file {video_path} could not be found.")
         
-        if player_name.lower() == "vlc":
-            subprocess.run([r"C:\Program Files\VideoLAN\VLC\vlc.exe", video_path])
-        elif player_name.lower() == "wmplayer":
-            subprocess.run([r"C:\Program Files (x86)\Windows Media Player\wmplayer.exe", video_path])
-        elif player_name.lower() == "movies & tv":
-            subprocess.run([r"C:\Program Files\Microsoft Movies & TV\Video.UI.exe", video_path])
-        else:
-            # Try the general method if the player path is known
-            subprocess.run([player_name, video_path])
+        # Use the executable the registry resolved, falling back to the name on PATH
+        player_path = get_player_registry().player_path(player_name) or player_name
+        # Returns as soon as the player has started; the supervisor reports when it exits
+        get_playback_supervisor().launch(video_path, player_path, player_name.lower(), start_position)
 
         print(f"Successfully opened {video_path} with {player_name}.")
     except Exception as e:
@@ -0,0 +1,100 @@
+import atexit
+import threading
+
+from modules.instrumentation import count
+from modules.task_scheduler import get_scheduler, PRIORITY_NORMAL
+
+# Consecutive failed flushes retried automatically, each after twice the previous delay
+MAX_FLUSH_RETRIES = 5
+
+_shared = {}  # (WriteBehind subclass, database) -> its process-wide instance
+_shared_lock = threading.Lock()
+
+
+class WriteBehind:
+    """Changes held in a dict and written in one batch every `flush_interval` ms and at exit.
+
+    Subclasses put changes into `_pending` (under `_lock`) keyed so that later changes to the same
+    item replace earlier ones, call `_schedule_flush()`, and implement `_write(pending)`. A flush
+    runs on a scheduler worker once attached to a Tk root, or on a timer thread without one; when
+    `_write` fails, the batch is queued again behind any newer changes and retried with backoff,
+    up to MAX_FLUSH_RETRIES times in a row. Past that it waits for the next change or exit.
+    """
+
+    # Instrumentation counter bumped whenever a batch cannot be written
+    error_counter = "write_behind.failed"
+
+    def __init__(self, root, flush_interval):
+        self.flush_interval = flush_interval
+        self.scheduler = get_scheduler(root)
+        self._root = root.winfo_toplevel() if root is not None else None
+        self._pending = {}
+        self._flush_scheduled = False
+        self._failures = 0  # Consecutive failed flushes
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, db, create, root=None):
+        """Return the process-wide instance of this class for `db` (flushed at exit), built by
+        `create()` on first use and attached to `root` when given."""
+        with _shared_lock:
+            instance = _shared.get((cls, db))
+            if instance is None:
+                instance = _shared[cls, db] = create()
+                atexit.register(instance.flush)
+                return instance
+        if root is not None:
+            instance.attach(root)
+        return instance
+
+    def attach(self, root):
+        """Schedule flushes with `root.after` from now on."""
+        self._root = root.winfo_toplevel()
+        self.scheduler = get_scheduler(root)
+
+    def flush(self):
+        """Write every queued change in one batch; returns the number of rows written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        if not pending:
+            return 0
+        try:
+            written = self._write(pending)
+        except Exception as e:
+            count(self.error_counter)
+            with self._lock:
+                self.last_error = e
+                self._failures += 1
+                for key, value in pending.items():
+                    self._pending.setdefault(key, value)  # Keep newer changes queued meanwhile
+                failures = self._failures
+            if failures <= MAX_FLUSH_RETRIES:
+                self._schedule_flush(self.flush_interval * 2 ** failures)
+            return 0
+        with self._lock:
+            self._failures = 0
+        return written
+
+    def _write(self, pending):
+        raise NotImplementedError
+
+    def _schedule_flush(self, delay=None):
+        """Flush after `delay` ms (default flush_interval); safe to call from any thread."""
+        if delay is None:
+            delay = self.flush_interval
+        with self._lock:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        if self._root is not None and threading.current_thread() is threading.main_thread():
+            self._root.after(delay, self._flush_in_background)
+        else:
+            # Tk may only be called from its own thread, so workers wait on a timer instead
+            timer = threading.Timer(delay / 1000, self.flush if self._root is None else self._flush_in_background)
+            timer.daemon = True
+            timer.start()
+
+    def _flush_in_background(self):
+        self.scheduler.submit(self.flush, priority=PRIORITY_NORMAL)
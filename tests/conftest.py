@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+from database.database import Database
+from database.session import dispose_engines
+
+
+@pytest.fixture
+def metadata():
+    """Metadata for one video, as the bulk and add_video paths take it."""
+    return {"name": "Lesson", "artist": "Artist", "title": "Title", "category": "Blues", "chord": "E"}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "library.db")
+
+
+@pytest.fixture
+def db(db_path):
+    database = Database(f"sqlite:///{db_path}")
+    yield database
+    dispose_engines()
+
+
+@pytest.fixture
+def sql(db_path):
+    """Run a statement on a plain sqlite3 connection (bypassing the app's engine) and return its rows."""
+    def run(statement, *params):
+        connection = sqlite3.connect(db_path)
+        try:
+            with connection:
+                return connection.execute(statement, params).fetchall()
+        finally:
+            connection.close()
+    return run
+
+
+@pytest.fixture
+def legacy_db(db_path):
+    """Write a videos table (and extra SQL) the way the app created it before the indexer and probes."""
+    def create(extra_sql=""):
+        connection = sqlite3.connect(db_path)
+        try:
+            connection.executescript(
+                "CREATE TABLE videos (id INTEGER PRIMARY KEY AUTOINCREMENT, file_name TEXT NOT NULL, name TEXT, "
+                "artist TEXT, title TEXT, category TEXT, chord TEXT, status TEXT);" + extra_sql
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        return db_path
+    return create
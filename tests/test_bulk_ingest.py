@@ -0,0 +1,26 @@
+def rows_by_name(db, column):
+    return {row.file_name: getattr(row, column) for row in db.iter_videos(columns=["file_name", column])}
+
+
+def test_add_videos_inserts_in_batches(db, metadata):
+    result = db.add_videos(((f"/videos/{index}.mp4", metadata) for index in range(25)), batch_size=10)
+    assert result.rows == 25
+    assert db.count_videos() == 25
+
+
+def test_upsert_inserts_new_and_updates_existing_rows_by_file_name(db, metadata):
+    db.add_videos([("/videos/a.mp4", metadata)])
+    result = db.upsert_videos([
+        ("/videos/a.mp4", {"artist": "Changed"}),
+        ("/videos/b.mp4", dict(metadata, artist="New")),
+    ])
+    assert result.rows == 2
+    assert rows_by_name(db, "artist") == {"/videos/a.mp4": "Changed", "/videos/b.mp4": "New"}
+    assert rows_by_name(db, "title") == {"/videos/a.mp4": "Title", "/videos/b.mp4": "Title"}
+
+
+def test_update_videos_ignores_unknown_columns(db, metadata):
+    db.add_videos([("/videos/a.mp4", metadata)])
+    (video_id,), = db.iter_videos(columns=["id"])
+    db.update_videos([(video_id, {"chord": "Am", "not_a_column": 1})])
+    assert rows_by_name(db, "chord") == {"/videos/a.mp4": "Am"}
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from modules.dedup import SAMPLE_BLOCK_SIZE, SAMPLE_BLOCKS, DedupEngine, full_hash, sampled_fingerprint
+from modules.library_index import LibraryIndexer
+
+# Larger than the sample, so only SAMPLE_BLOCKS blocks of it are read for the fingerprint
+LARGE_SIZE = 2 * SAMPLE_BLOCK_SIZE * SAMPLE_BLOCKS
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as video_file:
+        video_file.write(data)
+    return path
+
+
+def large_data(seed):
+    return bytes((seed + index) % 251 for index in range(256)) * (LARGE_SIZE // 256)
+
+
+def unsampled_change(data):
+    """Flip a byte between the first two sampled blocks, which the fingerprint never reads."""
+    changed = bytearray(data)
+    changed[SAMPLE_BLOCK_SIZE + 10] ^= 0xFF
+    return bytes(changed)
+
+
+def test_small_files_are_hashed_whole(tmp_path):
+    path = write(str(tmp_path / "small.mp4"), b"tiny video")
+    fingerprint, complete = sampled_fingerprint(path)
+    assert complete and fingerprint == full_hash(path)
+    assert sampled_fingerprint(write(str(tmp_path / "empty.mp4"), b""))[1]
+
+
+def test_large_files_are_sampled(tmp_path):
+    original = write(str(tmp_path / "original.mp4"), large_data(1))
+    edited = write(str(tmp_path / "edited.mp4"), unsampled_change(large_data(1)))
+    fingerprint, complete = sampled_fingerprint(original)
+    assert not complete
+    # Same size and sampled blocks: the fingerprints collide, and only the full hash tells them apart
+    assert sampled_fingerprint(edited) == (fingerprint, False)
+    assert full_hash(original) != full_hash(edited)
+    assert sampled_fingerprint(write(str(tmp_path / "other.mp4"), large_data(2)))[0] != fingerprint
+
+
+@pytest.fixture
+def library(db, tmp_path):
+    root = str(tmp_path / "library")
+    write(os.path.join(root, "a", "original.mp4"), large_data(1))
+    write(os.path.join(root, "b", "copy.mp4"), large_data(1))
+    write(os.path.join(root, "b", "edited.mp4"), unsampled_change(large_data(1)))
+    write(os.path.join(root, "a", "clip.mp4"), b"short clip")
+    write(os.path.join(root, "b", "clip copy.mp4"), b"short clip")
+    write(os.path.join(root, "b", "unique.mp4"), b"something else")
+    LibraryIndexer(db).scan(root)
+    return root
+
+
+def test_duplicates_are_grouped_by_content(db, library):
+    engine = DedupEngine(db, max_workers=2)
+    assert engine.fingerprint() == 6
+    assert engine.resolve_collisions() == 3  # original, copy and edited share a fingerprint
+    groups = {frozenset(os.path.relpath(path, library) for path in group.paths) for group in engine.duplicate_groups()}
+    assert groups == {
+        frozenset({os.path.join("a", "original.mp4"), os.path.join("b", "copy.mp4")}),
+        frozenset({os.path.join("a", "clip.mp4"), os.path.join("b", "clip copy.mp4")}),
+    }
+    # Fingerprints are cached against size and mtime, so a second pass reads nothing
+    assert engine.fingerprint() == 0 and engine.resolve_collisions() == 0
+    # Within one folder every group has a single copy, so none is reported
+    assert engine.duplicate_groups(os.path.join(library, "a")) == []
+
+
+def test_probe_data_is_shared_with_unprobed_duplicates(db, library):
+    engine = DedupEngine(db, max_workers=2)
+    engine.fingerprint()
+    engine.resolve_collisions()
+    rows = {row.file_name: row for row in db.iter_videos(columns=["id", "file_name", "file_size", "file_mtime"])}
+    original = rows[os.path.join(library, "a", "original.mp4")]
+    db.update_videos([(original.id, {"duration": 12.5, "width": 640, "height": 360, "probed_size": original.file_size,
+                                     "probed_mtime": original.file_mtime})])
+    assert engine.share_probe_data(engine.duplicate_groups()) == 1
+    copy = db.get_video_by_filename(os.path.join(library, "b", "copy.mp4"))
+    assert (copy.duration, copy.width, copy.height) == (12.5, 640, 360)
+    assert (copy.probed_size, copy.probed_mtime) == (copy.file_size, copy.file_mtime)
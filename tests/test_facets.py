@@ -0,0 +1,51 @@
+def facet_counts(sql):
+    return {(facet, value): count for facet, value, count in sql("SELECT facet, value, count FROM facet_counts")}
+
+
+def test_facet_triggers_follow_inserts_updates_and_deletes(db, sql, metadata):
+    db.add_videos([
+        ("/videos/a.mp4", dict(metadata, category="Blues")),
+        ("/videos/b.mp4", dict(metadata, category="Blues")),
+        ("/videos/c.mp4", dict(metadata, category=None)),
+    ])
+    counts = facet_counts(sql)
+    assert counts[("category", "Blues")] == 2
+    assert counts[("artist", "Artist")] == 3
+    assert counts[("total", "videos")] == 3
+
+    ids = {row.file_name: row.id for row in db.iter_videos(columns=["id", "file_name"])}
+    db.update_videos([(ids["/videos/a.mp4"], {"category": "Jazz"}), (ids["/videos/c.mp4"], {"category": "Jazz"})])
+    counts = facet_counts(sql)
+    assert counts[("category", "Blues")] == 1
+    assert counts[("category", "Jazz")] == 2
+
+    db.delete_video(ids["/videos/b.mp4"])
+    counts = facet_counts(sql)
+    assert ("category", "Blues") not in counts  # Values whose count drops to zero are removed
+    assert counts[("total", "videos")] == 2
+    assert db.fetch_facets(("category", "total")) == {"category": [("Jazz", 2)], "total": [("videos", 2)]}
+
+
+def test_facet_counts_are_built_for_an_existing_database(legacy_db, sql):
+    from database.database import Database
+
+    db_path = legacy_db(
+        "INSERT INTO videos (file_name, category) VALUES ('/videos/a.mp4', 'Rock'), ('/videos/b.mp4', 'Rock'), "
+        "('/videos/c.mp4', '');"
+    )
+    Database(f"sqlite:///{db_path}")
+    counts = facet_counts(sql)
+    assert counts[("category", "Rock")] == 2
+    assert counts[("total", "videos")] == 3
+    assert ("category", "") not in counts
+
+
+def test_counts_without_a_folder_come_from_the_summary(db, metadata):
+    db.add_videos([
+        ("/videos/one.mp4", dict(metadata, category="Blues")),
+        ("/videos/two.mp4", dict(metadata, category="Jazz")),
+        ("/videos/three.mp4", dict(metadata, category="Blues")),
+    ])
+    assert db.count_videos() == 3
+    assert db.count_videos("Blues") == 2
+    assert db.count_videos("Rock") == 0
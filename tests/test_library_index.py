@@ -0,0 +1,82 @@
+import os
+import shutil
+
+import pytest
+
+from modules.library_index import LibraryIndexer
+
+
+def touch(path, data=b"video"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as video_file:
+        video_file.write(data)
+
+
+def bump_mtime(path):
+    """Move a directory's mtime forward, as adding or removing an entry would on a coarse clock."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "library"
+    for name in ("a/one.mp4", "a/notes.txt", "a/deep/two.mkv", "b/three.avi"):
+        touch(str(root / name))
+    return str(root)
+
+
+def test_scan_indexes_video_files_in_every_subdirectory(db, library):
+    result = LibraryIndexer(db).scan(library)
+    assert (result.added, result.updated, result.removed) == (3, 0, 0)
+    assert result.dirs_listed == 4
+    rows = {row.file_name: row for row in db.iter_videos(columns=["file_name", "directory", "file_size"])}
+    assert set(rows) == {
+        os.path.join(library, "a", "one.mp4"), os.path.join(library, "a", "deep", "two.mkv"),
+        os.path.join(library, "b", "three.avi"),
+    }
+    assert rows[os.path.join(library, "a", "deep", "two.mkv")].directory == os.path.join(library, "a", "deep")
+    assert rows[os.path.join(library, "a", "one.mp4")].file_size == len(b"video")
+
+
+def test_rescan_lists_only_directories_whose_mtime_changed(db, library):
+    indexer = LibraryIndexer(db)
+    indexer.scan(library)
+    result = indexer.scan(library)
+    assert (result.added, result.updated, result.removed) == (0, 0, 0)
+    assert (result.dirs_listed, result.dirs_skipped) == (0, 4)
+
+    touch(os.path.join(library, "b", "four.mov"))
+    bump_mtime(os.path.join(library, "b"))
+    result = indexer.scan(library)
+    assert (result.added, result.dirs_listed, result.dirs_skipped) == (1, 1, 3)
+
+
+def test_edits_in_place_are_only_picked_up_by_a_full_scan(db, library):
+    indexer = LibraryIndexer(db)
+    indexer.scan(library)
+    touch(os.path.join(library, "a", "one.mp4"), b"a longer video")  # The directory's mtime stays put
+    assert indexer.scan(library).updated == 0
+    assert indexer.scan(library, full=True).updated == 1
+
+
+def test_removed_files_and_directories_are_pruned(db, library):
+    indexer = LibraryIndexer(db)
+    indexer.scan(library)
+    shutil.rmtree(os.path.join(library, "a"))
+    os.remove(os.path.join(library, "b", "three.avi"))
+    bump_mtime(library)
+    bump_mtime(os.path.join(library, "b"))
+    result = indexer.scan(library)
+    assert result.removed == 3
+    assert db.count_videos() == 0
+
+
+def test_list_videos_indexes_only_the_folder_itself(db, library):
+    indexer = LibraryIndexer(db)
+    folder = os.path.join(library, "a")
+    assert indexer.list_videos(folder) == [os.path.join(folder, "one.mp4")]
+    assert db.count_videos() == 1  # a/deep was not walked
+    # Listing a folder must not mark it as indexed, or a full scan would skip its subfolders
+    result = LibraryIndexer(db).scan(library)
+    assert (result.added, result.dirs_skipped) == (2, 0)
@@ -0,0 +1,24 @@
+from database.database import Database
+
+
+def test_upgrade_adds_missing_columns(legacy_db, sql):
+    db_path = legacy_db("INSERT INTO videos (file_name, name) VALUES ('/videos/a.mp4', 'Old');")
+    db = Database(f"sqlite:///{db_path}")
+    columns = {row[1] for row in sql("PRAGMA table_info(videos)")}
+    assert {"directory", "file_size", "duration", "fingerprint", "content_hash"} <= columns
+    assert db.count_videos() == 1
+
+
+def test_duplicates_are_merged_before_the_unique_index_is_built(legacy_db, sql):
+    db_path = legacy_db("""
+        CREATE TABLE favorites (id INTEGER PRIMARY KEY AUTOINCREMENT, video_id INTEGER NOT NULL);
+        INSERT INTO videos (file_name, name, artist) VALUES ('/videos/a.mp4', 'Old', NULL);
+        INSERT INTO videos (file_name, name, artist) VALUES ('/videos/a.mp4', NULL, 'Artist');
+        INSERT INTO favorites (video_id) VALUES (1), (2);
+    """)
+    Database(f"sqlite:///{db_path}")
+    # The oldest row survives with the newest non-null values, and favorites follow it
+    assert sql("SELECT id, name, artist FROM videos") == [(1, "Old", "Artist")]
+    assert sql("SELECT video_id FROM favorites") == [(1,)]
+    indexes = {row[1]: row[2] for row in sql("PRAGMA index_list(videos)")}
+    assert any(unique for name, unique in indexes.items() if "file_name" in name)
@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def ids(db, metadata):
+    """Ten Blues videos followed by three Jazz ones; returns every id in order."""
+    db.add_videos((f"/videos/blues_{index}.mp4", metadata) for index in range(10))
+    db.add_videos((f"/videos/jazz_{index}.mp4", dict(metadata, category="Jazz")) for index in range(3))
+    return [video_id for (video_id,) in db.iter_videos(columns=["id"])]
+
+
+def test_page_boundaries_walk_the_index(db, ids):
+    assert db.fetch_page_boundary(0, 5) == ids[4]
+    assert db.fetch_page_boundary(ids[4], 5) == ids[9]
+    # A last page shorter than the page size has no boundary, so paging stops there
+    assert db.fetch_page_boundary(ids[9], 5) is None
+    # Exactly one full page left
+    assert db.fetch_page_boundary(ids[7], 5) == ids[12]
+
+
+def test_a_far_page_is_located_in_one_query(db, ids):
+    # The grid jumps straight to page 2 of 4-row pages with one 8-row offset
+    assert db.fetch_page_boundary(0, 2 * 4) == db.fetch_page_boundary(db.fetch_page_boundary(0, 4), 4) == ids[7]
+
+
+def test_pages_start_after_the_cursor(db, ids):
+    assert [video.id for video in db.fetch_records_page(0, 5)] == ids[:5]
+    assert [video.id for video in db.fetch_records_page(ids[9], 5)] == ids[10:]
+    assert db.fetch_records_page(ids[-1], 5) == []
+
+
+def test_filters_apply_to_boundaries_and_pages(db, ids):
+    assert db.fetch_page_boundary(0, 3, "Jazz") == ids[12]
+    assert db.fetch_page_boundary(0, 4, "Jazz") is None
+    assert [video.id for video in db.fetch_records_page(0, 5, "Jazz")] == ids[10:]
+    assert db.fetch_records_page(0, 5, directory="/elsewhere") == []
@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture
+def video_ids(db, metadata):
+    db.add_videos((f"/videos/lesson_{index}.mp4", metadata) for index in range(4))
+    return [video_id for (video_id,) in db.iter_videos(columns=["id"])]
+
+
+def progress(video_id, position, percent, updated_at, duration=100.0, completed_at=None):
+    return {"video_id": video_id, "position": position, "duration": duration, "percent": percent,
+            "updated_at": updated_at, "completed_at": completed_at}
+
+
+def test_save_progress_upserts_and_resolves_completed_at(db, video_ids):
+    video_id = video_ids[0]
+    db.save_progress([progress(video_id, 99.0, 99.0, 1.0, completed_at=1.0)])
+    # Unknown percent: the stored completion time is kept
+    db.save_progress([progress(video_id, 5.0, None, 2.0, duration=None)])
+    assert db.fetch_progress(video_id).completed_at == 1.0
+    assert db.fetch_progress(video_id).position == 5.0
+    # A known percent below the threshold is a rewatch: completion is cleared
+    db.save_progress([progress(video_id, 10.0, 10.0, 3.0)])
+    assert db.fetch_progress(video_id).completed_at is None
+
+
+def test_continue_watching_includes_videos_of_unknown_duration(db, video_ids):
+    first, second, third, fourth = video_ids
+    db.save_progress([
+        progress(first, 30.0, 30.0, 1.0),
+        progress(second, 42.0, None, 3.0, duration=None),  # Started, duration never probed
+        progress(third, 0.0, None, 4.0, duration=None),  # Opened but never played
+        progress(fourth, 0.5, 0.5, 2.0),  # Below min_percent
+    ])
+    assert [video.id for video, _ in db.fetch_continue_watching()] == [second, first]
@@ -0,0 +1,50 @@
+import pytest
+
+from database.database import build_match_query
+
+
+def test_words_are_quoted_so_input_cannot_inject_fts_syntax():
+    assert build_match_query('blues OR "riff" NEAR(x') == '"blues" "OR" "riff" "NEAR" "x"'
+    assert build_match_query("") == ""
+    assert build_match_query(None) == ""
+
+
+def test_prefix_and_as_you_type_matching():
+    assert build_match_query("slow blu", prefix=True) == '"slow"* "blu"*'
+    assert build_match_query("slow blu", as_you_type=True) == '"slow" "blu"*'
+
+
+@pytest.fixture
+def library(db, metadata):
+    db.add_videos([
+        ("/videos/shuffle.mp4", dict(metadata, name="Texas shuffle", artist="Stevie Ray Vaughan", category="Blues")),
+        ("/videos/walking.mp4", dict(metadata, name="Walking bass", artist="Ray Brown", category="Jazz")),
+        ("/videos/riff.mp4", dict(metadata, name="Riff practice", artist="Someone", category="Rock")),
+    ])
+    return db
+
+
+def names(videos):
+    return sorted(video.name for video in videos)
+
+
+def test_search_matches_any_indexed_column(library):
+    assert names(library.search("shuffle")) == ["Texas shuffle"]
+    assert names(library.search("ray")) == ["Texas shuffle", "Walking bass"]
+    assert names(library.search("jazz")) == ["Walking bass"]
+    assert library.search("") == []
+
+
+def test_search_as_you_type_matches_the_last_word_as_a_prefix(library):
+    assert names(library.search_as_you_type("ray bro")) == ["Walking bass"]
+    assert names(library.search("pract")) == []
+    assert names(library.search("pract", prefix=True)) == ["Riff practice"]
+
+
+def test_search_index_follows_updates_and_deletes(library):
+    (video,) = library.search("riff")
+    library.update_videos([(video.id, {"name": "Scale practice"})])
+    assert names(library.search("scale")) == ["Scale practice"]
+    assert names(library.search("riff")) == ["Scale practice"]  # Still matched by its file name
+    library.delete_video(video.id)
+    assert library.search("scale") == []
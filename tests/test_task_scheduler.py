@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from modules.task_scheduler import PRIORITY_HIGH, PRIORITY_LOW, TaskScheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = TaskScheduler(max_workers=2)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def blocked(scheduler, count):
+    """Occupy `count` workers until the returned event is set."""
+    release = threading.Event()
+    started = [threading.Event() for _ in range(count)]
+    for event in started:
+        scheduler.submit(lambda event=event: (event.set(), release.wait(5)))
+    for event in started:
+        assert event.wait(5)
+    return release
+
+
+def test_callbacks_and_errbacks_run_headless(scheduler):
+    results = []
+    done = threading.Event()
+    scheduler.submit(lambda: 1 / 0, errback=lambda error: results.append(type(error)))
+    scheduler.submit(lambda x: x * 2, 21, callback=lambda result: (results.append(result), done.set()))
+    assert done.wait(5)
+    assert len(results) == 2 and set(results) == {42, ZeroDivisionError}
+
+
+def test_higher_priority_tasks_run_first_and_cancelled_ones_never_run(scheduler):
+    release = blocked(scheduler, 2)
+    order = []
+    done = threading.Event()
+    scheduler.submit(order.append, "low", priority=PRIORITY_LOW)
+    cancelled = scheduler.submit(order.append, "cancelled", priority=PRIORITY_HIGH)
+    scheduler.submit(order.append, "high", priority=PRIORITY_HIGH)
+    scheduler.submit(done.set, priority=PRIORITY_LOW)
+    cancelled.cancel()
+    release.set()
+    assert done.wait(5)
+    assert order[0] == "high" and "cancelled" not in order
+
+
+def test_map_yields_results_in_order(scheduler):
+    assert list(scheduler.map(lambda x: x * x, range(20))) == [x * x for x in range(20)]
+    assert list(scheduler.map(lambda x: x, [])) == []
+
+
+def test_map_runs_items_on_the_calling_thread_when_every_worker_is_busy(scheduler):
+    release = blocked(scheduler, 2)
+    try:
+        threads = set(scheduler.map(lambda _: threading.current_thread(), range(5)))
+    finally:
+        release.set()
+    assert threads == {threading.current_thread()}
+
+
+def test_nested_maps_inside_tasks_do_not_deadlock(scheduler):
+    results = []
+    done = threading.Barrier(3)
+
+    def outer():
+        return sum(scheduler.map(lambda x: sum(scheduler.map(lambda y: y, range(x))), range(10)))
+
+    for _ in range(2):
+        scheduler.submit(outer, callback=lambda total: (results.append(total), done.wait(5)))
+    done.wait(5)
+    assert results == [sum(sum(range(x)) for x in range(10))] * 2
+
+
+def test_map_raises_the_first_error_and_cancels_the_rest(scheduler):
+    release = blocked(scheduler, 2)
+    calls = []
+
+    def fail_at_three(x):
+        calls.append(x)
+        if x == 3:
+            raise ValueError(x)
+        return x
+
+    results = scheduler.map(fail_at_three, range(10))
+    assert [next(results) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(ValueError):
+        next(results)
+    release.set()
+    scheduler.shutdown()
+    for worker in scheduler._workers:
+        worker.join(5)
+    assert calls == [0, 1, 2, 3]  # Items after the failure were cancelled before a worker reached them
+
+
+def test_closing_a_map_early_cancels_its_pending_items(scheduler):
+    release = blocked(scheduler, 2)
+    calls = []
+    results = scheduler.map(calls.append, range(10))
+    next(results)
+    results.close()
+    release.set()
+    scheduler.shutdown()
+    for worker in scheduler._workers:
+        worker.join(5)
+    assert calls == [0]
@@ -0,0 +1,94 @@
+import hashlib
+import os
+
+from modules.thumbnail_store import INDEX_RECORD, SLOT_BYTES, SLOTS_PER_PACK, ThumbnailStore
+
+
+def key(number):
+    return hashlib.sha1(str(number).encode()).digest()
+
+
+def pixels(number):
+    return bytes([number % 256]) * SLOT_BYTES
+
+
+def slots(store):
+    return sorted(slot for slot, _ in store._entries.values())
+
+
+def test_slots_are_allocated_in_order_and_reused(tmp_path):
+    store = ThumbnailStore(str(tmp_path))
+    for number in range(3):
+        store.put(key(number), f"/videos/{number}.mp4", pixels(number))
+    assert slots(store) == [0, 1, 2]
+    store.discard(key(1))
+    store.put(key(3), "/videos/3.mp4", pixels(3))
+    assert slots(store) == [0, 1, 2]
+    assert store.get(key(3)) == pixels(3)
+    assert store.get(key(1)) is None
+
+
+def test_a_changed_file_replaces_its_old_thumbnail(tmp_path):
+    store = ThumbnailStore(str(tmp_path))
+    store.put(key(1), "/videos/a.mp4", pixels(1))
+    store.put(key(2), "/videos/a.mp4", pixels(2))
+    assert len(store) == 1
+    assert key(1) not in store
+    assert store.get(key(2)) == pixels(2)
+
+
+def test_reload_replays_the_log_and_drops_a_torn_record(tmp_path):
+    store = ThumbnailStore(str(tmp_path))
+    for number in range(SLOTS_PER_PACK + 2):  # Spill into a second pack
+        store.put(key(number), f"/videos/{number}.mp4", pixels(number))
+    store.discard(key(5))
+    store.close()
+    index_path = os.path.join(str(tmp_path), "index.bin")
+    with open(index_path, "ab") as index_file:
+        index_file.write(INDEX_RECORD.pack(1, key(999), 7, 40)[:10])  # A crash mid-append
+
+    reloaded = ThumbnailStore(str(tmp_path))
+    assert len(reloaded) == SLOTS_PER_PACK + 1
+    assert key(5) not in reloaded and key(999) not in reloaded
+    assert reloaded.get(key(SLOTS_PER_PACK + 1)) == pixels(SLOTS_PER_PACK + 1)
+    assert os.path.getsize(index_path) == reloaded._index_position
+    reloaded.put(key(1000), "/videos/1000.mp4", pixels(1000))
+    assert reloaded._entries[key(1000)][0] == 5  # The discarded slot is reused
+
+
+def test_two_stores_on_one_directory_never_share_a_slot(tmp_path):
+    first = ThumbnailStore(str(tmp_path))
+    second = ThumbnailStore(str(tmp_path))
+    for number in range(0, 20, 2):
+        first.put(key(number), f"/videos/{number}.mp4", pixels(number))
+        second.put(key(number + 1), f"/videos/{number + 1}.mp4", pixels(number + 1))
+    assert len(first) == len(second) == 20  # Reads catch up with the other store's writes
+    assert slots(first) == slots(second) == list(range(20))
+    assert all(first.get(key(number)) == pixels(number) for number in range(20))
+
+
+def test_a_store_reloads_after_another_compacts(tmp_path):
+    first = ThumbnailStore(str(tmp_path))
+    second = ThumbnailStore(str(tmp_path))
+    for number in range(10):
+        first.put(key(number), f"/videos/{number}.mp4", pixels(number))
+    first.discard(key(0))
+    assert not first.needs_compaction()  # A hole is reused by the next put; only a stale log compacts
+    for number in range(1, 5):
+        first.discard(key(number))
+    assert first.needs_compaction()
+    first.compact()
+    assert slots(first) == list(range(5))
+    assert len(second) == 5
+    assert all(second.get(key(number)) == pixels(number) for number in range(5, 10))
+    second.put(key(10), "/videos/10.mp4", pixels(10))
+    assert first.get(key(10)) == pixels(10)
+    assert sorted(slots(first)) == list(range(6))
+
+
+def test_closing_releases_the_lock_file(tmp_path):
+    with ThumbnailStore(str(tmp_path)) as store:
+        store.put(key(1), "/videos/1.mp4", pixels(1))
+    assert store._lock_file.closed and not store._packs
+    with ThumbnailStore(str(tmp_path)) as reopened:
+        assert reopened.get(key(1)) == pixels(1)
@@ -0,0 +1,104 @@
+import threading
+
+from modules.write_behind import MAX_FLUSH_RETRIES, WriteBehind
+
+
+class RecordingWriter(WriteBehind):
+    def __init__(self):
+        super().__init__(None, flush_interval=60000)  # Flushed by hand in these tests
+        self.batches = []
+        self.fail = False
+
+    def queue(self, key, value):
+        with self._lock:
+            self._pending[key] = value
+        self._schedule_flush()
+
+    def _write(self, pending):
+        if self.fail:
+            raise OSError("database is locked")
+        self.batches.append(dict(pending))
+        return len(pending)
+
+
+class FakeRoot:
+    def __init__(self):
+        self.after_calls = []
+
+    def after(self, delay, fn):
+        self.after_calls.append(delay)
+
+
+def test_changes_to_the_same_key_coalesce_into_one_write():
+    writer = RecordingWriter()
+    writer.queue("a", 1)
+    writer.queue("a", 2)
+    writer.queue("b", 3)
+    assert writer.flush() == 2
+    assert writer.batches == [{"a": 2, "b": 3}]
+    assert writer.flush() == 0
+
+
+def test_failed_batch_is_requeued_behind_newer_changes():
+    writer = RecordingWriter()
+    writer.queue("a", 1)
+    writer.queue("b", 1)
+    writer.fail = True
+    assert writer.flush() == 0
+    assert isinstance(writer.last_error, OSError)
+    writer.queue("a", 2)  # Changed again after the failed flush took the batch
+    writer.fail = False
+    assert writer.flush() == 2
+    assert writer.batches == [{"a": 2, "b": 1}]
+
+
+def test_retries_back_off_and_stop_after_the_cap():
+    class Retrying(RecordingWriter):
+        def _schedule_flush(self, delay=None):
+            if delay is not None:
+                self.retry_delays.append(delay)
+
+    writer = Retrying()
+    writer.retry_delays = []
+    writer.fail = True
+    writer.queue("a", 1)
+    for _ in range(MAX_FLUSH_RETRIES + 2):
+        writer.flush()
+    assert writer.retry_delays == [60000 * 2 ** attempt for attempt in range(1, MAX_FLUSH_RETRIES + 1)]
+    writer.fail = False
+    assert writer.flush() == 1 and writer._failures == 0
+
+
+def test_flushes_scheduled_off_the_tk_thread_never_touch_tk():
+    flushed = threading.Event()
+
+    class Signalling(RecordingWriter):
+        def _write(self, pending):
+            flushed.set()
+            return super()._write(pending)
+
+    writer = Signalling()
+    writer.flush_interval = 10
+    writer._root = root = FakeRoot()
+    worker = threading.Thread(target=writer.queue, args=("a", 1))
+    worker.start()
+    worker.join()
+    assert flushed.wait(5)
+    assert root.after_calls == [] and writer.batches == [{"a": 1}]
+    writer.queue("b", 1)  # From the Tk (main) thread root.after is used
+    assert root.after_calls == [10]
+
+
+def test_shared_returns_one_instance_per_class_and_database():
+    created = []
+
+    class Shared(RecordingWriter):
+        pass
+
+    def create():
+        created.append(Shared())
+        return created[-1]
+
+    assert Shared.shared("first.db", create) is Shared.shared("first.db", create)
+    assert Shared.shared("second.db", create) is not Shared.shared("first.db", create)
+    assert len(created) == 2